@@ -3,17 +3,34 @@ API endpoint for the XBRL mapping and tagging service.
 """
 import os
 import json
-from fastapi import FastAPI, HTTPException, Body, Request
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from typing import Dict, Any, Optional
+import asyncio
+import contextlib
+import hashlib
+from fastapi import FastAPI, HTTPException, Body, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.requests import ClientDisconnect
+from pydantic import BaseModel, Field
+from typing import Dict, Any, Literal, Optional, Union
 from dotenv import load_dotenv
 import logfire  # Add logfire import
 
 # Import your existing functionality
 from mapping.agent import financial_statement_agent, financial_deps
+from mapping.tools import get_term_match_cache_stats
+from mapping.dependencies import MAPPING_LOG_PATH, synonym_store
+from mapping.routing import partition_by_confidence, apply_local_fields, without_local_fields
+from mapping.derivation import derive_statement_totals
+from mapping.aliases import map_by_aliases
+from mapping.normalize import normalize_statement_values
+from mapping.streaming import StreamingCategorizer, ijson
+from mapping.synonyms import align_decisions
+from mapping.classifier import append_examples
 from tagging.agent import xbrl_tagging_agent
 from tagging.dependencies import sg_xbrl_deps
+from tagging.tools import get_tag_cache_stats
+from tagging.serialization import TagPayloads
+from mapping.system_prompts import FINANCIAL_STATEMENT_PROMPT, MAPPING_REQUEST_PREFIX, build_mapping_prompt
+from tagging.system_prompts import XBRL_DATA_TAGGING_PROMPT, TAGGING_REQUEST_PREFIX, build_tagging_prompt
 
 # Set environment variables directly
 # Load environment variables from .env file
@@ -28,6 +45,76 @@ if not os.environ.get("OPENAI_API_KEY"):
     logfire.error("Missing API key", key="OPENAI_API_KEY")
     raise ValueError("OPENAI_API_KEY environment variable is not set in .env file")
 
+# Metrics
+agent_runs_cancelled = logfire.metric_counter(
+    "agent_runs_cancelled",
+    unit="1",
+    description="Agent runs cancelled because the client disconnected"
+)
+
+agent_runs_deadline_exceeded = logfire.metric_counter(
+    "agent_runs_deadline_exceeded",
+    unit="1",
+    description="Agent runs cut short because the request deadline was reached"
+)
+
+llm_prompt_tokens = logfire.metric_counter(
+    "llm_prompt_tokens",
+    unit="1",
+    description="Prompt tokens sent to the model"
+)
+
+llm_cached_prompt_tokens = logfire.metric_counter(
+    "llm_cached_prompt_tokens",
+    unit="1",
+    description="Prompt tokens served from the provider's prompt cache"
+)
+
+# Fingerprints of the static prompt prefixes. If these change between deploys, cached
+# prefixes on the provider side are invalidated, so they are logged at startup.
+PROMPT_PREFIX_HASHES = {
+    "mapping": hashlib.sha256((FINANCIAL_STATEMENT_PROMPT + MAPPING_REQUEST_PREFIX).encode()).hexdigest()[:12],
+    "tagging": hashlib.sha256((XBRL_DATA_TAGGING_PROMPT + TAGGING_REQUEST_PREFIX).encode()).hexdigest()[:12]
+}
+logfire.info("Prompt prefixes loaded", **PROMPT_PREFIX_HASHES)
+logfire.info("Match confidence calibration loaded",
+             threshold=financial_deps.confidence_threshold,
+             **financial_deps.calibrator.describe())
+
+# How often to check whether the caller is still connected while an agent runs
+DISCONNECT_POLL_INTERVAL = 0.5
+
+# Header carrying the caller's time budget for the whole request, in seconds
+REQUEST_TIMEOUT_HEADER = "X-Request-Timeout"
+
+# Don't start an agent stage with less than this many seconds left before the deadline
+MIN_STAGE_BUDGET = 2.0
+
+# Non-standard status code (nginx convention) for requests abandoned by the client
+CLIENT_CLOSED_REQUEST = 499
+
+async def record_mapping_decisions(raw_data: Dict[str, Any], mapped_data: Dict[str, Any]) -> None:
+    """
+    Record the label -> field decisions of a completed mapping run.
+    
+    Decisions go to the synonym store, merged into the term dictionaries the next time the
+    service starts, and to the log the local label classifier is trained on. Callers pass
+    the document sent to the agent and the result without the locally mapped fields, so
+    only the agent's decisions are learned from.
+    Failures are logged and never fail the request.
+    """
+    try:
+        decisions = align_decisions(raw_data, mapped_data)
+        if decisions:
+            # File I/O stays off the event loop
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, synonym_store.record_decisions, decisions)
+            await loop.run_in_executor(None, synonym_store.save)
+            await loop.run_in_executor(None, append_examples, MAPPING_LOG_PATH, decisions)
+        logfire.debug("Mapping decisions recorded", count=len(decisions))
+    except Exception as e:
+        logfire.warning("Could not record mapping decisions", error=str(e))
+
 # Create FastAPI app
 app = FastAPI(
     title="XBRL Mapping and Tagging API",
@@ -76,6 +163,14 @@ class FinancialStatementData(BaseModel):
 class MappingResponse(BaseModel):
     """Response from the mapping operation"""
     mapped_data: Dict[str, Any]
+    checks: Dict[str, Any] = {}
+    
+class PartialMappingResponse(BaseModel):
+    """Mapping response whose required totals could not all be mapped or derived"""
+    status: Literal["partial_success"] = "partial_success"
+    mapped_data: Dict[str, Any]
+    checks: Dict[str, Any]
+    error: str
     
 class TaggingResponse(BaseModel):
     """Response from the tagging operation"""
@@ -87,24 +182,249 @@ class CombinedResponse(BaseModel):
     mapped_data: Dict[str, Any]
     tagged_data: Dict[str, Any]
     tags: Dict[str, Any]
+    checks: Dict[str, Any] = {}
+
+class CompactTaggingResponse(BaseModel):
+    """Tagging response in the compact tag format (format=compact)"""
+    tagged_data: Dict[str, Any] = Field(
+        ..., description="Tagged data referencing tags by element_id (validates as PartialXBRLWithTagIds)"
+    )
+    tag_definitions: Dict[str, Dict[str, Any]] = Field(
+        ..., description="Each referenced tag by element_id, without the attributes that have their FinancialTag default"
+    )
+
+class CompactCombinedResponse(CompactTaggingResponse):
+    """Combined mapping and tagging response in the compact tag format (format=compact)"""
+    mapped_data: Dict[str, Any]
+    checks: Dict[str, Any] = {}
+
+class TaggedJSONResponse(JSONResponse):
+    """JSON response rendered with the taxonomy's pre-encoded tags spliced in"""
+    
+    def __init__(self, content: Any, payloads: TagPayloads, compact: bool = False, **kwargs):
+        self.payloads = payloads
+        self.compact = compact
+        super().__init__(content, **kwargs)
+    
+    def render(self, content: Any) -> bytes:
+        return self.payloads.encode(content, compact=self.compact)
+
+# Tag response formats: "full" repeats each tag object wherever it is used, "compact" references
+# tags by element_id in tagged_data, defines each one once under "tag_definitions" and leaves
+# out the "tags" map (its paths and ids are those of tagged_data)
+TagFormat = Literal["full", "compact"]
+TAG_FORMAT_QUERY = Query("full", alias="format", description="Tag format of the response: 'full' or 'compact'")
+
+class UploadStreamingResponse(StreamingResponse):
+    """
+    Streamed response whose body is produced while the request body is still being read.
+    
+    StreamingResponse also listens for client disconnects on the receive channel, which
+    would swallow request body chunks; here the body reader sees the disconnect instead.
+    """
+    
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+def record_usage(result, stage: str) -> None:
+    """
+    Record token usage of a finished agent run, including provider-side cached tokens.
+    
+    Args:
+        result: The agent run result
+        stage: Name of the processing stage
+    """
+    try:
+        usage = result.usage()
+    except Exception:
+        return  # Older pydantic-ai versions / test doubles without usage information
+    
+    request_tokens = getattr(usage, "request_tokens", None) or 0
+    cached_tokens = (getattr(usage, "details", None) or {}).get("cached_tokens", 0)
+    
+    llm_prompt_tokens.add(request_tokens, {"stage": stage})
+    llm_cached_prompt_tokens.add(cached_tokens, {"stage": stage})
+    logfire.info(
+        "Agent token usage",
+        stage=stage,
+        requests=getattr(usage, "requests", None),
+        request_tokens=request_tokens,
+        cached_tokens=cached_tokens,
+        response_tokens=getattr(usage, "response_tokens", None),
+        cache_hit_ratio=cached_tokens / request_tokens if request_tokens else 0
+    )
+
+class ClientDisconnected(Exception):
+    """Raised when the caller goes away while an agent run is in flight"""
+    def __init__(self, stage: str):
+        super().__init__(f"Client disconnected during {stage}")
+        self.stage = stage
+
+class DeadlineExceeded(Exception):
+    """Raised when the request deadline leaves no time for (or interrupts) a stage"""
+    def __init__(self, stage: str):
+        super().__init__(f"Request deadline reached before {stage} completed")
+        self.stage = stage
+
+def get_request_deadline(request: Request) -> Optional[float]:
+    """
+    Read the caller's time budget from the X-Request-Timeout header.
+    
+    Args:
+        request: The incoming request
+        
+    Returns:
+        Absolute deadline on the event loop clock, or None if no budget was given
+        
+    Raises:
+        HTTPException: If the header is present but not a positive number of seconds
+    """
+    raw_timeout = request.headers.get(REQUEST_TIMEOUT_HEADER)
+    if raw_timeout is None:
+        return None
+    
+    try:
+        timeout = float(raw_timeout)
+    except ValueError:
+        timeout = 0
+    if timeout <= 0:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{REQUEST_TIMEOUT_HEADER} must be a positive number of seconds"
+        )
+    
+    return asyncio.get_running_loop().time() + timeout
+
+async def run_agent_stage(request: Request, agent, prompt: str, deps, stage: str,
+                          deadline: Optional[float] = None):
+    """
+    Run an agent while watching the client connection and the request deadline.
+    
+    If the client disconnects, or the deadline passes, before the run finishes, the
+    run task is cancelled, which also abandons pending tool calls, retries and model
+    requests. A stage is not started at all when less than MIN_STAGE_BUDGET seconds
+    remain, and the remaining budget is passed to the model client as its timeout.
+    
+    Args:
+        request: The incoming request, used to detect disconnects
+        agent: The pydantic-ai agent to run
+        prompt: The user prompt for the agent
+        deps: Dependencies to inject into the agent run
+        stage: Name of the processing stage (used in logs and metrics)
+        deadline: Absolute deadline on the event loop clock, if any
+        
+    Returns:
+        The agent run result
+        
+    Raises:
+        ClientDisconnected: If the client disconnected before the run completed
+        DeadlineExceeded: If the deadline was reached before the run completed
+    """
+    loop = asyncio.get_running_loop()
+    model_settings = None
+    if deadline is not None:
+        remaining = deadline - loop.time()
+        if remaining < MIN_STAGE_BUDGET:
+            logfire.warning("Skipping stage, request deadline too close", 
+                            stage=stage, remaining_s=remaining)
+            raise DeadlineExceeded(stage)
+        model_settings = {"timeout": remaining}
+    
+    run_task = asyncio.create_task(agent.run(prompt, deps=deps, model_settings=model_settings))
+    try:
+        while True:
+            poll_interval = DISCONNECT_POLL_INTERVAL
+            if deadline is not None:
+                poll_interval = max(0, min(poll_interval, deadline - loop.time()))
+            
+            done, _ = await asyncio.wait({run_task}, timeout=poll_interval)
+            if done:
+                result = run_task.result()
+                record_usage(result, stage)
+                return result
+            
+            if await request.is_disconnected():
+                logfire.warning("Client disconnected, cancelling agent run", stage=stage)
+                agent_runs_cancelled.add(1, {"stage": stage, "path": request.url.path})
+                raise ClientDisconnected(stage)
+            
+            if deadline is not None and loop.time() >= deadline:
+                logfire.warning("Request deadline reached, cancelling agent run", stage=stage)
+                agent_runs_deadline_exceeded.add(1, {"stage": stage, "path": request.url.path})
+                raise DeadlineExceeded(stage)
+    finally:
+        # Covers disconnects, deadlines and the handler itself being cancelled
+        if not run_task.done():
+            run_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await run_task
 
 # API endpoints
-@app.post("/api/map", response_model=MappingResponse)
-async def map_financial_data(data: FinancialStatementData):
+def mapping_response(mapped_data: Dict[str, Any], checks: Dict[str, Any]):
+    """
+    Response of the mapping endpoint.
+    
+    Required totals still null after derivation leave the mapped data short of a valid
+    PartialXBRL, so the result is returned as a 207 partial success naming them.
+    
+    Args:
+        mapped_data: Mapped data as a dictionary
+        checks: Derivation checks of the mapped data
+        
+    Returns:
+        The MappingResponse content, or a 207 JSONResponse if required totals are missing
+    """
+    if not checks["missing"]:
+        return {"mapped_data": mapped_data, "checks": checks}
+    return JSONResponse(
+        status_code=207,
+        content=PartialMappingResponse(
+            mapped_data=mapped_data,
+            checks=checks,
+            error=f"Required totals could not be mapped or derived: {', '.join(checks['missing'])}"
+        ).model_dump()
+    )
+
+@app.post("/api/map", response_model=MappingResponse, responses={
+    207: {"model": PartialMappingResponse, "description": "Required totals are missing from the mapped data"}
+})
+async def map_financial_data(data: FinancialStatementData, request: Request):
     """Map financial statement data to standard format"""
     try:
         logfire.info("Starting financial data mapping process")
+        deadline = get_request_deadline(request)
+        
+        # Formatted amounts ("(5,000)", "1.2m", "nil") become plain numbers in the declared unit
+        values, normalization = normalize_statement_values(data.data)
+        logfire.debug("Input values normalized", **normalization)
+        
+        # Structured uploads whose keys all resolve through the alias table need no agent
+        fast_path = map_by_aliases(values)
+        if fast_path is not None:
+            mapped_data_dict, checks = fast_path
+            logfire.info("Financial data mapped by alias table", issues=len(checks["issues"]))
+            return mapping_response(mapped_data_dict, checks)
+        
+        # High-confidence leaves are mapped locally; only the rest goes to the agent
+        resolved, pending = partition_by_confidence(values, financial_deps)
         
-        # Convert to JSON string and process
-        data_json = json.dumps(data.data, indent=4)
-        logfire.debug("Input data prepared", data_size=len(data_json))
+        # Static instructions first, filing data last (keeps the cacheable prefix stable)
+        prompt = build_mapping_prompt(pending, resolved)
+        logfire.debug("Input data prepared", data_size=len(prompt), locally_mapped=len(resolved))
         
-        result_mapping = await financial_statement_agent.run(
-            f'Please map this financial statement data: {data_json}',
-            deps=financial_deps
+        result_mapping = await run_agent_stage(
+            request,
+            financial_statement_agent,
+            prompt,
+            financial_deps,
+            stage="mapping",
+            deadline=deadline
         )
         
-        logfire.info("Financial data mapping completed successfully")
+        logfire.info("Financial data mapping completed successfully",
+                    term_match_cache=get_term_match_cache_stats())
         
         # Convert Pydantic model to dictionary - fix for the error
         if hasattr(result_mapping.data, 'model_dump'):  # Pydantic v2
@@ -116,47 +436,126 @@ async def map_financial_data(data: FinancialStatementData):
             mapped_data_dict = {k: v for k, v in result_mapping.data.__dict__.items() 
                                if not k.startswith('_')}
         
-        return {
-            "mapped_data": mapped_data_dict
-        }
+        apply_local_fields(mapped_data_dict, resolved)
+        # Totals, signs and the balance sheet equation are handled here rather than by the model
+        checks = derive_statement_totals(mapped_data_dict)
+        logfire.debug("Derived totals computed", derived=len(checks["derived"]),
+                      sign_normalized=len(checks["sign_normalized"]), issues=checks["issues"])
+        if checks["missing"]:
+            logfire.warning("Required totals missing after derivation", missing=checks["missing"])
+        await record_mapping_decisions(pending, without_local_fields(mapped_data_dict, resolved))
+        
+        return mapping_response(mapped_data_dict, checks)
+    except ClientDisconnected as e:
+        # Nobody is listening any more - skip error handling and partial results
+        logfire.info("Request abandoned by client", stage=e.stage)
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         logfire.exception("Error during financial data mapping", error=str(e))
         raise HTTPException(status_code=500, detail=f"Mapping error: {str(e)}")
 
-@app.post("/api/tag", response_model=TaggingResponse)
-async def tag_financial_data(data: FinancialStatementData):
+@app.post("/api/map/stream")
+async def stream_financial_data_categories(request: Request):
+    """
+    Categorize a very large raw statement document as it is uploaded.
+    
+    The request body is the raw JSON document (not wrapped in "data"). It is parsed
+    incrementally while it arrives, so memory use does not grow with the document size,
+    and the categorization of each section is returned as one NDJSON line as soon as the
+    section is complete, followed by a summary line.
+    
+    The body is read up to the first completed section before responding, so a document
+    that is invalid from the start gets a 400; errors found later end the stream with an
+    "error" line.
+    """
+    if ijson is None:
+        raise HTTPException(status_code=501, detail="Streaming extraction requires the 'ijson' package")
+    
+    categorizer = StreamingCategorizer(financial_deps)
+    body = request.stream()
+    logfire.info("Starting streaming categorization")
+    
+    first_sections = []
+    body_complete = True
+    try:
+        async for chunk in body:
+            first_sections = categorizer.feed(chunk)
+            if first_sections:
+                body_complete = False
+                break
+        if body_complete:
+            first_sections = categorizer.close()
+    except ijson.JSONError as e:
+        logfire.warning("Invalid streamed document", error=str(e), **categorizer.summary())
+        raise HTTPException(status_code=400, detail=f"Invalid JSON document: {str(e)}")
+    
+    async def ndjson_lines():
+        for section in first_sections:
+            yield json.dumps(section) + "\n"
+        if not body_complete:
+            try:
+                async for chunk in body:
+                    for section in categorizer.feed(chunk):
+                        yield json.dumps(section) + "\n"
+                for section in categorizer.close():
+                    yield json.dumps(section) + "\n"
+            except ijson.JSONError as e:
+                logfire.warning("Invalid streamed document", error=str(e), **categorizer.summary())
+                yield json.dumps({"error": f"Invalid JSON document: {str(e)}"}) + "\n"
+                return
+            except ClientDisconnect:
+                logfire.info("Streamed upload abandoned by client", **categorizer.summary())
+                return
+        logfire.info("Streaming categorization completed", **categorizer.summary())
+        yield json.dumps({"summary": categorizer.summary()}) + "\n"
+    
+    return UploadStreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+@app.post("/api/tag", response_model=Union[TaggingResponse, CompactTaggingResponse])
+async def tag_financial_data(data: FinancialStatementData, request: Request,
+                             tag_format: TagFormat = TAG_FORMAT_QUERY):
     """Apply XBRL tags to already mapped financial data"""
     try:
         logfire.info("Starting XBRL tagging process")
+        deadline = get_request_deadline(request)
         
-        # Convert to JSON string and include in the prompt
-        data_json = json.dumps(data.data, indent=4)
-        logfire.debug("Input data prepared for tagging", data_size=len(data_json))
+        # Static instructions first, mapped data last (keeps the cacheable prefix stable)
+        prompt = build_tagging_prompt(data.data)
+        logfire.debug("Input data prepared for tagging", data_size=len(prompt))
         
         # IMPORTANT: Only pass the prompt string and deps parameter - nothing else
-        tagged_result = await xbrl_tagging_agent.run(
-            f'Please apply appropriate XBRL tags to this financial data: {data_json}',
-            deps=sg_xbrl_deps
+        tagged_result = await run_agent_stage(
+            request,
+            xbrl_tagging_agent,
+            prompt,
+            sg_xbrl_deps,
+            stage="tagging",
+            deadline=deadline
         )
         
         # Fix: Call get_all_tags() on tagged_result.data, not on tagged_result
+        all_tags = tagged_result.data.get_all_tags()
         logfire.info("XBRL tagging completed successfully", 
-                    tags_count=len(tagged_result.data.get_all_tags()))
-        
-        # Convert tagged data to dictionary
-        if hasattr(tagged_result.data, 'model_dump'):  # Pydantic v2
-            tagged_data_dict = tagged_result.data.model_dump()
-        elif hasattr(tagged_result.data, 'dict'):      # Pydantic v1
-            tagged_data_dict = tagged_result.data.dict()
-        else:
-            # Fallback to manual conversion
-            tagged_data_dict = {k: v for k, v in tagged_result.data.__dict__.items() 
-                                if not k.startswith('_')}
+                    tags_count=len(all_tags),
+                    tag_cache=get_tag_cache_stats())
         
-        return {
-            "tagged_data": tagged_data_dict,
-            "tags": tagged_result.data.get_all_tags()
-        }
+        # The tagged model is encoded directly, with each tag's JSON encoded once per taxonomy
+        content = {"tagged_data": tagged_result.data}
+        if tag_format == "full":
+            content["tags"] = all_tags
+        return TaggedJSONResponse(content, payloads=sg_xbrl_deps.payloads, compact=tag_format == "compact")
+    except ClientDisconnected as e:
+        # Nobody is listening any more - skip error handling and partial results
+        logfire.info("Request abandoned by client", stage=e.stage)
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         # Enhanced error logging
         logfire.exception(
@@ -166,30 +565,55 @@ async def tag_financial_data(data: FinancialStatementData):
         )
         raise HTTPException(status_code=500, detail=f"Tagging error: {str(e)}")
 
-@app.post("/api/process", response_model=CombinedResponse)
-async def process_financial_data(data: FinancialStatementData):
+@app.post("/api/process", response_model=Union[CombinedResponse, CompactCombinedResponse])
+async def process_financial_data(data: FinancialStatementData, request: Request,
+                                 tag_format: TagFormat = TAG_FORMAT_QUERY):
     """Map and tag financial data in one request"""
     try:
         logfire.info("Starting combined mapping and tagging process")
+        deadline = get_request_deadline(request)
         
-        # Step 1: Map data
-        data_json = json.dumps(data.data, indent=4)
-        result_mapping = await financial_statement_agent.run(
-            f'Please map this financial statement data: {data_json}',
-            deps=financial_deps
-        )
+        # Step 1: Map data (by the alias table, or high-confidence leaves locally and the rest with the agent)
+        values, normalization = normalize_statement_values(data.data)
+        logfire.debug("Input values normalized", **normalization)
+        fast_path = map_by_aliases(values)
+        if fast_path is not None:
+            # Keys resolve through the alias table: no mapping agent needed
+            mapped_data_dict, checks = fast_path
+            logfire.info("Financial data mapped by alias table", issues=len(checks["issues"]))
+        else:
+            resolved, pending = partition_by_confidence(values, financial_deps)
+            logfire.debug("Input data partitioned", locally_mapped=len(resolved))
+            result_mapping = await run_agent_stage(
+                request,
+                financial_statement_agent,
+                build_mapping_prompt(pending, resolved),
+                financial_deps,
+                stage="mapping",
+                deadline=deadline
+            )
         
-        logfire.info("Financial data mapping completed")
+            logfire.info("Financial data mapping completed",
+                        term_match_cache=get_term_match_cache_stats())
 
-        # Convert the mapped data to JSON with simplification for large structures
-        if hasattr(result_mapping.data, 'model_dump'):
-            mapped_data_dict = result_mapping.data.model_dump()
-        elif hasattr(result_mapping.data, 'dict'):
-            mapped_data_dict = result_mapping.data.dict()
-        else:
-            # Fallback to manual conversion
-            mapped_data_dict = {k: v for k, v in result_mapping.data.__dict__.items() 
-                                if not k.startswith('_')}
+            # Convert the mapped data to JSON with simplification for large structures
+            if hasattr(result_mapping.data, 'model_dump'):
+                mapped_data_dict = result_mapping.data.model_dump()
+            elif hasattr(result_mapping.data, 'dict'):
+                mapped_data_dict = result_mapping.data.dict()
+            else:
+                # Fallback to manual conversion
+                mapped_data_dict = {k: v for k, v in result_mapping.data.__dict__.items() 
+                                    if not k.startswith('_')}
+        
+            apply_local_fields(mapped_data_dict, resolved)
+            # Totals, signs and the balance sheet equation are handled here rather than by the model
+            checks = derive_statement_totals(mapped_data_dict)
+            logfire.debug("Derived totals computed", derived=len(checks["derived"]),
+                          sign_normalized=len(checks["sign_normalized"]), issues=checks["issues"])
+            if checks["missing"]:
+                logfire.warning("Required totals missing after derivation", missing=checks["missing"])
+            await record_mapping_decisions(pending, without_local_fields(mapped_data_dict, resolved))
         
         # Simplify very large JSON structures if needed
         if len(json.dumps(mapped_data_dict)) > 50000:  # If JSON is very large
@@ -204,33 +628,49 @@ async def process_financial_data(data: FinancialStatementData):
                     simplified_data[section_name] = section
             mapped_data_dict = simplified_data
         
-        # Convert to JSON for the prompt
-        mapped_data_json = json.dumps(mapped_data_dict, indent=4)
-        
-        # Step 2: Tag mapped data - with explicit instruction to limit complexity
-        tagged_result = await xbrl_tagging_agent.run(
-            f'Please apply appropriate XBRL tags to this financial data. Focus on the most important elements first and limit complexity: {mapped_data_json}',
-            deps=sg_xbrl_deps
+        # Step 2: Tag mapped data - the shared tagging prefix asks the model to limit complexity
+        tagged_result = await run_agent_stage(
+            request,
+            xbrl_tagging_agent,
+            build_tagging_prompt(mapped_data_dict),
+            sg_xbrl_deps,
+            stage="tagging",
+            deadline=deadline
         )
         
+        all_tags = tagged_result.data.get_all_tags()
         logfire.info("XBRL tagging completed", 
-                    tags_count=len(tagged_result.data.get_all_tags()))
+                    tags_count=len(all_tags),
+                    tag_cache=get_tag_cache_stats())
         
-        # Convert tagged data to dictionary
-        if hasattr(tagged_result.data, 'model_dump'):  # Pydantic v2
-            tagged_data_dict = tagged_result.data.model_dump()
-        elif hasattr(tagged_result.data, 'dict'):      # Pydantic v1
-            tagged_data_dict = tagged_result.data.dict()
-        else:
-            # Fallback to manual conversion
-            tagged_data_dict = {k: v for k, v in tagged_result.data.__dict__.items() 
-                                if not k.startswith('_')}
+        # The tagged model is encoded directly, with each tag's JSON encoded once per taxonomy
+        content = {"mapped_data": mapped_data_dict, "tagged_data": tagged_result.data}
+        if tag_format == "full":
+            content["tags"] = all_tags
+        content["checks"] = checks
+        return TaggedJSONResponse(content, payloads=sg_xbrl_deps.payloads, compact=tag_format == "compact")
+    except ClientDisconnected as e:
+        # Nobody is listening any more - skip error handling and partial results
+        logfire.info("Request abandoned by client", stage=e.stage)
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    except DeadlineExceeded as e:
+        logfire.warning("Combined process stopped at request deadline", stage=e.stage)
         
-        return {
-            "mapped_data": mapped_data_dict,
-            "tagged_data": tagged_data_dict,
-            "tags": tagged_result.data.get_all_tags()
-        }
+        # Return whatever stages finished before the deadline
+        if 'mapped_data_dict' in locals():
+            return JSONResponse(
+                status_code=207,
+                content={
+                    "status": "partial_success",
+                    "completed_stages": ["mapping"],
+                    "mapped_data": mapped_data_dict,
+                    "checks": checks,
+                    "error": str(e)
+                }
+            )
+        raise HTTPException(status_code=504, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         # Enhanced error logging with more details
         error_type = type(e).__name__
@@ -246,11 +686,14 @@ async def process_financial_data(data: FinancialStatementData):
             error_type=error_type
         )
         
-        # Return partial results if available
-        if 'result_mapping' in locals():
+        # Return partial results if available - the mapping stage is complete once its checks exist,
+        # whether the alias table or the agent mapped the data
+        if 'mapped_data_dict' in locals() and 'checks' in locals():
             partial_response = {
                 "status": "partial_success",
-                "mapped_data": mapped_data_dict if 'mapped_data_dict' in locals() else {},
+                "completed_stages": ["mapping"],
+                "mapped_data": mapped_data_dict,
+                "checks": checks,
                 "error": error_details
             }
             # Return what we have with status code 207 Multi-Status
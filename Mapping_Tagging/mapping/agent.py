@@ -5,12 +5,14 @@ from pydantic_ai import Agent
 from pydantic_ai.models.openai import OpenAIModel
 import os
 
-from .models import PartialXBRL
+from .compact import CompactMappingResult
+from .derivation import MappingResult
 from .dependencies import FinancialTermDeps, financial_deps
 from .system_prompts import FINANCIAL_STATEMENT_PROMPT
 from .tools import (
     match_financial_term as mft,
     extract_and_categorize_financial_data as ecfd,
+    map_financial_document as mfd,
     MatchTermContext, 
     ExtractContext
 )
@@ -18,19 +20,26 @@ from .tools import (
 # Get OpenAI API key from environment
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
 
+# Let the agent answer with short field aliases (expanded by model_dump) to save output tokens
+COMPACT_MAPPING_OUTPUT = os.environ.get("COMPACT_MAPPING_OUTPUT", "true").lower() == "true"
+
 # Initialize the OpenAI model
 mapping_model = OpenAIModel(model_name="gpt-4o", api_key=OPENAI_API_KEY)
 
 # Define the agent with dependencies
 financial_statement_agent = Agent(
     model=mapping_model,
-    result_type=PartialXBRL,
+    result_type=CompactMappingResult if COMPACT_MAPPING_OUTPUT else MappingResult,
     system_prompt=FINANCIAL_STATEMENT_PROMPT,
     deps_type=FinancialTermDeps,
     retries=5
 )
 
 # Register tools with the agent
+@financial_statement_agent.tool
+def map_financial_document(context, data):
+    return mfd(context, data)
+
 @financial_statement_agent.tool
 def match_financial_term(context, term, statement_type="all"):
     return mft(context, term, statement_type)
@@ -0,0 +1,234 @@
+"""
+Compiled alias table for inputs that already use (near-)canonical PartialXBRL keys.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+import importlib.util
+import os
+import re
+from pydantic import BaseModel, ValidationError
+
+from .derivation import derive_statement_totals
+from .models import PartialXBRL
+
+# Django app module holding FIELD_MAPPING, the snake_case model field names of the filing
+# information; it has no Django imports, so it is loaded from its file
+FIELD_NAMES_PATH = os.environ.get(
+    "XBRL_FIELD_NAMES_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                 "xbrl_mapping", "field_names.py")
+)
+
+def load_field_name_aliases(path: str = FIELD_NAMES_PATH) -> Dict[str, List[str]]:
+    """
+    Snake_case aliases of the filing information fields, from xbrl_mapping's FIELD_MAPPING.
+    
+    Args:
+        path: Python file defining FIELD_MAPPING (schema field name -> snake_case name)
+    
+    Returns:
+        Alternative input keys per dotted schema path, empty if the file is not deployed
+    """
+    if not os.path.exists(path):
+        return {}
+    spec = importlib.util.spec_from_file_location("xbrl_mapping_field_names", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return {f"FilingInformation.{name}": [alias] for name, alias in module.FIELD_MAPPING.items()}
+
+# Alternative input keys per schema path used by our structured-upload clients (see the
+# sample data in main.py); the snake_case names of FIELD_MAPPING are added below
+FIELD_ALIASES: Dict[str, List[str]] = {
+    "FilingInformation.NameOfCompany": ["CompanyName"],
+    "FilingInformation.TypeOfXBRLFiling": ["FilingType"],
+    "FilingInformation.NatureOfFinancialStatementsCompanyLevelOrConsolidated": ["NatureOfFinancialStatements"],
+    "FilingInformation.TypeOfAccountingStandardUsedToPrepareFinancialStatements": ["AccountingStandardUsed"],
+    "FilingInformation.TypeOfStatementOfFinancialPosition": ["StatementOfFinancialPositionType"],
+    "FilingInformation.WhetherTheFinancialStatementsArePreparedOnGoingConcernBasis": ["IsGoingConcernBasis"],
+    "FilingInformation.WhetherThereAreAnyChangesToComparativeAmounts": ["AreComparativeAmountsChanged"],
+    "FilingInformation.DescriptionOfPresentationCurrency": ["PresentationCurrency"],
+    "FilingInformation.DescriptionOfFunctionalCurrency": ["FunctionalCurrency"],
+    "FilingInformation.LevelOfRoundingUsedInFinancialStatements": ["RoundingLevel"],
+    "FilingInformation.DescriptionOfNatureOfEntitysOperationsAndPrincipalActivities": ["NatureOfOperations"],
+    "FilingInformation.PrincipalPlaceOfBusinessIfDifferentFromRegisteredOffice": ["BusinessAddress"],
+    "FilingInformation.WhetherCompanyOrGroupIfConsolidatedAccountsArePreparedHasMoreThan50Employees": [
+        "HasMoreThan50Employees"
+    ],
+    "FilingInformation.NameOfParentEntity": ["ParentEntityName"],
+    "FilingInformation.NameOfUltimateParentOfGroup": ["UltimateParentEntityName"],
+    "FilingInformation.NameAndVersionOfSoftwareUsedToGenerateXBRLFile": ["SoftwareUsed"],
+    "FilingInformation.HowWasXBRLFilePrepared": ["XBRLPreparationMethod"],
+    "DirectorsStatement.WhetherInDirectorsOpinionFinancialStatementsAreDrawnUpSoAsToExhibitATrueAndFairView": [
+        "IsTrueAndFairView"
+    ],
+    "DirectorsStatement.WhetherThereAreReasonableGroundsToBelieveThatCompanyWillBeAbleToPayItsDebtsAsAndWhenTheyFallDueAtDateOfStatement": [
+        "CanPayDebtsWhenDue"
+    ],
+    "AuditReport.TypeOfAuditOpinionInIndependentAuditorsReport": ["AuditOpinionType"],
+    "AuditReport.AuditingStandardsUsedToConductTheAudit": ["AuditingStandardsUsed"],
+    "AuditReport.WhetherThereIsAnyMaterialUncertaintyRelatingToGoingConcern": ["IsGoingConcernUncertain"],
+    "AuditReport.WhetherInAuditorsOpinionAccountingAndOtherRecordsRequiredAreProperlyKept": ["AreRecordsProperlyKept"],
+    "StatementOfFinancialPosition.CurrentAssets.CurrentFinancialAssetsMeasuredAtFairValueThroughProfitOrLoss": [
+        "CurrentFinancialAssetsAtFVTPL"
+    ],
+    "StatementOfFinancialPosition.CurrentAssets.NoncurrentAssetsOrDisposalGroupsClassifiedAsHeldForSaleOrAsHeldForDistributionToOwners": [
+        "AssetsHeldForSale"
+    ],
+    "StatementOfFinancialPosition.NonCurrentAssets.NoncurrentFinancialAssetsMeasuredAtFairValueThroughProfitOrLoss": [
+        "NoncurrentFinancialAssetsAtFVTPL"
+    ],
+    "StatementOfFinancialPosition.NonCurrentAssets.IntangibleAssetsOtherThanGoodwill": ["OtherIntangibleAssets"],
+    "StatementOfFinancialPosition.CurrentLiabilities.CurrentFinancialLiabilitiesMeasuredAtFairValueThroughProfitOrLoss": [
+        "CurrentFinancialLiabilitiesAtFVTPL"
+    ],
+    "StatementOfFinancialPosition.CurrentLiabilities.LiabilitiesClassifiedAsHeldForSale": ["LiabilitiesHeldForSale"],
+    "StatementOfFinancialPosition.NonCurrentLiabilities.NoncurrentFinancialLiabilitiesMeasuredAtFairValueThroughProfitOrLoss": [
+        "NoncurrentFinancialLiabilitiesAtFVTPL"
+    ],
+    "StatementOfFinancialPosition.Equity.AccumulatedProfitsLosses": ["RetainedEarnings"],
+    "StatementOfFinancialPosition.Equity.ReservesOtherThanAccumulatedProfitsLosses": ["OtherReserves"],
+    "IncomeStatement.AmortisationExpense": ["AmortizationExpense"],
+    "IncomeStatement.ProfitLossFromDiscontinuedOperations": ["ProfitOrLossFromDiscontinuedOperations"],
+    "IncomeStatement.ProfitLoss": ["NetProfitOrLoss", "NetProfit", "ProfitForTheYear"],
+    "IncomeStatement.ProfitLossAttributableToOwnersOfCompany": ["ProfitOrLossAttributableToOwners"],
+    "IncomeStatement.ProfitLossAttributableToNoncontrollingInterests": [
+        "ProfitOrLossAttributableToNonControllingInterests"
+    ],
+    "IncomeStatement.OtherExpensesByNature": ["OtherExpenses"],
+    "IncomeStatement.OtherGainsLosses": ["OtherGainsOrLosses"],
+    "IncomeStatement.ShareOfProfitLossOfAssociatesAndJointVenturesAccountedForUsingEquityMethod": [
+        "ShareOfProfitOrLossOfAssociatesAndJointVentures"
+    ],
+    "IncomeStatement.ProfitLossBeforeTaxation": ["ProfitOrLossBeforeTax", "ProfitBeforeTax"],
+    "IncomeStatement.TaxExpenseBenefitContinuingOperations": ["TaxExpenseOrBenefit", "TaxExpense"],
+    "Notes.TradeAndOtherReceivables.TradeAndOtherReceivablesDueFromThirdParties": ["ReceivablesFromThirdParties"],
+    "Notes.TradeAndOtherReceivables.TradeAndOtherReceivablesDueFromRelatedParties": ["ReceivablesFromRelatedParties"],
+    "Notes.TradeAndOtherPayables.TradeAndOtherPayablesDueToThirdParties": ["PayablesToThirdParties"],
+    "Notes.TradeAndOtherPayables.TradeAndOtherPayablesDueToRelatedParties": ["PayablesToRelatedParties"],
+    "Notes.Revenue.RevenueFromPropertyTransferredAtPointInTime": ["RevenueFromPropertyAtPointInTime"],
+    "Notes.Revenue.RevenueFromGoodsTransferredAtPointInTime": ["RevenueFromGoodsAtPointInTime"],
+    "Notes.Revenue.RevenueFromServicesTransferredAtPointInTime": ["RevenueFromServicesAtPointInTime"],
+    "Notes.Revenue.RevenueFromPropertyTransferredOverTime": ["RevenueFromPropertyOverTime"],
+    "Notes.Revenue.RevenueFromConstructionContractsOverTime": ["RevenueFromConstructionContracts"],
+    "Notes.Revenue.RevenueFromServicesTransferredOverTime": ["RevenueFromServicesOverTime"]
+}
+for _path, _aliases in load_field_name_aliases().items():
+    FIELD_ALIASES.setdefault(_path, []).extend(_aliases)
+
+_NON_ALPHANUMERIC = re.compile(r"[^a-z0-9]")
+
+def alias_key(key: str) -> str:
+    """Lookup form of an input key: lowercase, without separators ("current_assets" -> "currentassets")"""
+    return _NON_ALPHANUMERIC.sub("", key.lower())
+
+def _sub_model(annotation: Any) -> Optional[Type[BaseModel]]:
+    """Model class of a nested section field, or None for a value field"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    return None
+
+class AliasTable:
+    """
+    Input key -> schema field lookup for every section of a schema, compiled once.
+    
+    Each section accepts its field names, the configured aliases and a "Total" prefix on
+    numeric fields, all compared in alias_key form. Field names take precedence over
+    aliases, and aliases over the generated "Total" variants.
+    """
+    
+    def __init__(self, model: Type[BaseModel] = PartialXBRL,
+                 aliases: Optional[Dict[str, Iterable[str]]] = None):
+        """
+        Compile the table.
+        
+        Args:
+            model: Root schema model
+            aliases: Alternative input keys per dotted schema path (defaults to FIELD_ALIASES)
+        """
+        self.model = model
+        # Section path -> alias_key -> (field name, section model or None)
+        self.sections: Dict[str, Dict[str, Tuple[str, Optional[Type[BaseModel]]]]] = {}
+        self._compile(model, "", FIELD_ALIASES if aliases is None else aliases)
+    
+    def _compile(self, model: Type[BaseModel], prefix: str, aliases: Dict[str, Iterable[str]]) -> None:
+        """Add the lookup of one section and its sub-sections"""
+        names: Dict[str, Tuple[str, Optional[Type[BaseModel]]]] = {}
+        configured, generated = {}, {}
+        for name, info in model.model_fields.items():
+            path = f"{prefix}.{name}" if prefix else name
+            sub_model = _sub_model(info.annotation)
+            entry = (name, sub_model)
+            names[alias_key(name)] = entry
+            for alias in aliases.get(path, ()):
+                configured.setdefault(alias_key(alias), entry)
+            if sub_model is None:
+                generated.setdefault("total" + alias_key(name), entry)
+            else:
+                self._compile(sub_model, path, aliases)
+        self.sections[prefix] = {**generated, **configured, **names}
+    
+    def resolve(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Rename every key of a document to its schema field.
+        
+        Args:
+            data: Raw document
+        
+        Returns:
+            The document with schema keys, or None if any key does not resolve, a section
+            holds a value (or the reverse), or two keys resolve to the same field
+        """
+        return self._resolve(data, "")
+    
+    def _resolve(self, data: Dict[str, Any], prefix: str) -> Optional[Dict[str, Any]]:
+        """Rename the keys of one section"""
+        lookup = self.sections[prefix]
+        resolved: Dict[str, Any] = {}
+        for key, value in data.items():
+            entry = lookup.get(alias_key(str(key)))
+            if entry is None:
+                return None
+            name, sub_model = entry
+            if name in resolved:
+                return None
+            if sub_model is None:
+                if isinstance(value, (dict, list)):
+                    return None
+                resolved[name] = value
+            else:
+                if not isinstance(value, dict):
+                    return None
+                section = self._resolve(value, f"{prefix}.{name}" if prefix else name)
+                if section is None:
+                    return None
+                resolved[name] = section
+        return resolved
+
+def map_by_aliases(data: Dict[str, Any], table: Optional[AliasTable] = None
+                   ) -> Optional[Tuple[Dict[str, Any], Dict[str, List[Any]]]]:
+    """
+    Map a document without the agent when all of its keys resolve through the alias table.
+    
+    The renamed document gets the same derived totals and sign conventions as agent output,
+    and must then validate against the table's schema.
+    
+    Args:
+        data: Raw (normalized) financial document
+        table: Alias table to use (defaults to the one compiled for PartialXBRL)
+    
+    Returns:
+        Tuple of (PartialXBRL as a dictionary, derivation checks), or None if the document
+        has to go to the agent
+    """
+    table = table or alias_table
+    mapped = table.resolve(data)
+    if mapped is None:
+        return None
+    checks = derive_statement_totals(mapped)
+    try:
+        validated = table.model.model_validate(mapped)
+    except ValidationError:
+        return None
+    return validated.model_dump(), checks
+
+# Compiled once at import; shared by all requests
+alias_table = AliasTable()
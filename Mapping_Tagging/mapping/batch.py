@@ -0,0 +1,185 @@
+"""
+Vectorized batch classification of financial labels for bulk backfills.
+"""
+from typing import Iterable, Union
+import re
+import threading
+import numpy as np
+import pandas as pd
+
+from .dependencies import FinancialTermDeps
+from .matcher import INCOME_SCOPES, POSITION_SCOPES
+
+# Distinct labels scored per matrix block, bounding the size of the keyword hit matrix
+CHUNK_SIZE = 50000
+
+# Words used by match_financial_term to guess a statement type when no keyword matched
+INCOME_GUESS_WORDS = ["revenue", "income", "sale", "expense", "cost", "profit", "loss", "tax"]
+POSITION_GUESS_WORDS = ["asset", "liability", "equity", "cash", "receivable", "payable", "property", "equipment"]
+
+class BatchTermClassifier:
+    """
+    Matrix form of the keyword stage of match_financial_term for classifying many labels at once.
+    
+    Labels are normalized with vectorized string operations and deduplicated, keyword hits
+    are found with one compiled pattern over the unique labels, and field scores come out
+    of a single (labels x keywords) @ (keywords x fields) product. Keyword scores, guesses
+    and tie-breaking are the same as match_financial_term.
+    
+    Unlike match_financial_term, labels no keyword matches are not passed to the fuzzy
+    n-gram fallback or the label classifier: they keep the common-word guess (statement
+    type with the label as field) or "unknown". Misspelled labels therefore come back as
+    guesses here while match_financial_term may report a "fuzzy" or "classifier" field.
+    """
+    
+    def __init__(self, deps: FinancialTermDeps):
+        """
+        Build the keyword and field matrices from the compiled term matcher.
+        
+        Args:
+            deps: Financial term dependencies to classify against
+        """
+        matcher = deps.matcher
+        self.version = deps.version
+        # Decoded once: a compiled (memory-mapped) matcher decodes its tables on access
+        self.keywords = list(matcher.keywords)
+        self.field_names = np.array([field for _, field in matcher.fields], dtype=object)
+        self.field_statements = np.array(
+            ["income_statement" if prefix == "income" else "financial_position" for prefix, _ in matcher.fields],
+            dtype=object
+        )
+        self.income_field_count = matcher.income_field_count
+        
+        # Points for a keyword contained in (but not equal to) a label
+        self.contained_points = np.array([3 if len(k) > 5 else 1 for k in self.keywords], dtype=np.float32)
+        self.keyword_index = pd.Series(np.arange(len(self.keywords)), index=self.keywords)
+        
+        # Longest keyword starting at every position of a label, in one scan; the others
+        # starting there are its prefixes, so each match stands for all of its keyword prefixes
+        alternation = "|".join(re.escape(k) for k in sorted(self.keywords, key=len, reverse=True))
+        self.keyword_pattern = re.compile(f"(?=({alternation}))")
+        keyword_ids = {keyword: keyword_id for keyword_id, keyword in enumerate(self.keywords)}
+        prefix_ids = [
+            [keyword_ids[keyword[:end]] for end in range(1, len(keyword) + 1) if keyword[:end] in keyword_ids]
+            for keyword in self.keywords
+        ]
+        self.prefix_counts = np.array([len(ids) for ids in prefix_ids], dtype=np.int64)
+        self.prefix_starts = np.concatenate([[0], np.cumsum(self.prefix_counts)[:-1]]).astype(np.int64)
+        self.prefix_ids = np.array([i for ids in prefix_ids for i in ids], dtype=np.int64)
+        
+        # How many times each keyword is listed for each field
+        self.keyword_fields = np.zeros((len(self.keywords), len(matcher.fields)), dtype=np.float32)
+        for keyword_id, counts in enumerate(matcher.keyword_fields):
+            for field_idx, count in counts.items():
+                self.keyword_fields[keyword_id, field_idx] = count
+    
+    def field_mask(self, statement_type: str) -> np.ndarray:
+        """Boolean mask of the fields in a statement scope"""
+        include_income = statement_type in INCOME_SCOPES
+        include_position = statement_type in POSITION_SCOPES
+        if not include_income and not include_position:
+            # Unknown scope: use all mappings
+            include_income = include_position = True
+        
+        mask = np.zeros(len(self.field_names), dtype=bool)
+        mask[:self.income_field_count] = include_income
+        mask[self.income_field_count:] = include_position
+        return mask
+    
+    def _score_chunk(self, uniques: pd.Series) -> np.ndarray:
+        """Score a chunk of distinct normalized labels against every field"""
+        points = np.zeros((len(uniques), len(self.keywords)), dtype=np.float32)
+        matches = uniques.reset_index(drop=True).str.findall(self.keyword_pattern).explode().dropna()
+        if len(matches):
+            # Expand every match into the ids of its keyword prefixes
+            matched_ids = self.keyword_index.loc[matches.to_numpy()].to_numpy()
+            counts = self.prefix_counts[matched_ids]
+            rows = np.repeat(matches.index.to_numpy(dtype=np.int64), counts)
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            points[rows, self.prefix_ids[np.repeat(self.prefix_starts[matched_ids], counts) + offsets]] = 1
+        points *= self.contained_points
+        
+        # Labels equal to a keyword get the exact-match points instead
+        exact = uniques.map(self.keyword_index)
+        exact_rows = np.flatnonzero(exact.notna().to_numpy())
+        points[exact_rows, exact.iloc[exact_rows].to_numpy(dtype=np.int64)] = 6
+        
+        return points @ self.keyword_fields
+    
+    def classify(self, labels: Union[pd.Series, Iterable[str]], statement_type: str = "all") -> pd.DataFrame:
+        """
+        Classify raw labels against the keyword dictionaries.
+        
+        Args:
+            labels: Raw labels, as a pandas Series or any iterable of strings
+            statement_type: Statement scope ("all", "income", "position", ...)
+        
+        Returns:
+            DataFrame aligned with the labels, with columns label, statement_type, field and match_score
+        """
+        labels = labels if isinstance(labels, pd.Series) else pd.Series(list(labels), dtype=object)
+        raw = labels.fillna("").astype(str)
+        normalized = raw.str.lower().str.strip()
+        
+        # Score each distinct label once
+        codes, uniques = pd.factorize(normalized)
+        uniques = pd.Series(uniques, dtype=object)
+        
+        scores = np.zeros((len(uniques), len(self.field_names)), dtype=np.float32)
+        for start in range(0, len(uniques), CHUNK_SIZE):
+            scores[start:start + CHUNK_SIZE] = self._score_chunk(uniques.iloc[start:start + CHUNK_SIZE])
+        scores[:, ~self.field_mask((statement_type or "all").lower())] = 0
+        
+        # argmax picks the first field on ties, like match_financial_term
+        best_field = scores.argmax(axis=1)
+        best_score = scores[np.arange(len(uniques)), best_field].astype(np.int64)
+        matched = best_score > 0
+        
+        unique_statements = np.where(matched, self.field_statements[best_field], "unknown").astype(object)
+        unique_fields = np.where(matched, self.field_names[best_field], "unknown").astype(object)
+        
+        # No matches found - guess the statement type from common words
+        guess_income = ~matched & uniques.str.contains("|".join(INCOME_GUESS_WORDS)).to_numpy(dtype=bool)
+        guess_position = (~matched & ~guess_income &
+                          uniques.str.contains("|".join(POSITION_GUESS_WORDS)).to_numpy(dtype=bool))
+        unique_statements[guess_income] = "income_statement"
+        unique_statements[guess_position] = "financial_position"
+        
+        statement_column = unique_statements[codes]
+        field_column = unique_fields[codes]
+        
+        # Guessed labels report the label as given, like match_financial_term
+        guessed = (guess_income | guess_position)[codes]
+        field_column[guessed] = raw.to_numpy(dtype=object)[guessed]
+        
+        return pd.DataFrame({
+            "label": raw.to_numpy(dtype=object),
+            "statement_type": statement_column,
+            "field": field_column,
+            "match_score": best_score[codes]
+        }, index=labels.index)
+
+# One compiled classifier per dictionary version
+_classifiers = {}
+_classifiers_lock = threading.Lock()
+
+def classify_terms(labels: Union[pd.Series, Iterable[str]], deps: FinancialTermDeps, statement_type: str = "all") -> pd.DataFrame:
+    """
+    Classify many raw labels at once, e.g. when backfilling historical statements.
+    Only the keyword dictionaries are used (see BatchTermClassifier for how results differ
+    from match_financial_term).
+    
+    Args:
+        labels: Raw labels, as a pandas Series or any iterable of strings
+        deps: Financial term dependencies to classify against
+        statement_type: Statement scope ("all", "income", "position", ...)
+    
+    Returns:
+        DataFrame aligned with the labels, with columns label, statement_type, field and match_score
+    """
+    with _classifiers_lock:
+        classifier = _classifiers.get(deps.version)
+        if classifier is None:
+            _classifiers.clear()
+            classifier = _classifiers[deps.version] = BatchTermClassifier(deps)
+    return classifier.classify(labels, statement_type)
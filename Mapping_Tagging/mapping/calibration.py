@@ -0,0 +1,137 @@
+"""
+Calibration of term match scores into confidence values.
+"""
+from bisect import bisect_right
+from typing import Iterable, Iterator, List, Sequence, Tuple
+import os
+
+from .classifier import load_examples
+
+# Confidence from which a leaf is mapped locally instead of being sent to the agent
+MATCH_CONFIDENCE_THRESHOLD = float(os.environ.get("MATCH_CONFIDENCE_THRESHOLD", "0.9"))
+
+# Fewer labelled decisions than this and the default table is kept
+MIN_CALIBRATION_EXAMPLES = 50
+
+# Share of the leaves confident enough to map locally that are sent to the agent anyway, so
+# the decision log also holds labelled examples of the matches the threshold accepts
+CALIBRATION_SAMPLE_RATE = float(os.environ.get("CALIBRATION_SAMPLE_RATE", "0.05"))
+
+# (lowest score, confidence) steps used until enough labelled mappings exist:
+# guesses are rarely right, short keyword hits are weak, exact or stacked hits are strong
+DEFAULT_CALIBRATION: Tuple[Tuple[int, float], ...] = (
+    (0, 0.05),
+    (1, 0.35),
+    (3, 0.6),
+    (6, 0.9),
+    (9, 0.97)
+)
+
+class ScoreCalibrator:
+    """
+    Monotone step function from match_financial_term scores to the probability that the
+    matched field is right.
+    """
+    
+    def __init__(self, steps: Sequence[Tuple[int, float]] = DEFAULT_CALIBRATION, examples: int = 0):
+        """
+        Create a calibrator from its steps.
+        
+        Args:
+            steps: (lowest score, confidence) pairs in increasing score order
+            examples: Number of labelled decisions the steps were fitted on (0 for the defaults)
+        """
+        self.scores: List[int] = [score for score, _ in steps]
+        self.confidences: List[float] = [confidence for _, confidence in steps]
+        self.examples = examples
+    
+    def confidence(self, score: int) -> float:
+        """
+        Calibrated confidence of a match score.
+        
+        Args:
+            score: Raw match_score
+        
+        Returns:
+            Probability in [0, 1] that a match with this score maps to the right field
+        """
+        idx = bisect_right(self.scores, score) - 1
+        return self.confidences[max(idx, 0)]
+    
+    @classmethod
+    def fit(cls, examples: Iterable[Tuple[str, str, str, str, int]], deps,
+            min_examples: int = MIN_CALIBRATION_EXAMPLES) -> "ScoreCalibrator":
+        """
+        Fit a calibrator on labelled historical mappings with isotonic regression.
+        
+        Every labelled leaf is scored the way the router scores it (routing.lookup_leaf:
+        within the statement scope of its section, the path tried when the label is unknown).
+        Correctness is then regressed on the score with the pool-adjacent-violators
+        algorithm, so confidence never drops as the score rises.
+        
+        Args:
+            examples: (label, section, statement_type, field, count) decisions, e.g. from
+                logged_decisions; they should include the sample of confident leaves the
+                router sends to the agent (CALIBRATION_SAMPLE_RATE)
+            deps: FinancialTermDeps whose matcher produces the scores
+            min_examples: Minimum total count needed to replace the default table
+        
+        Returns:
+            Fitted calibrator, or the default one if there is too little data
+        """
+        # Imported here: the router is built on the dependencies being calibrated
+        from .routing import lookup_leaf
+        
+        # Weighted hits and totals per distinct score
+        totals = {}
+        for label, section, statement_type, field_name, count in examples:
+            term_info = lookup_leaf(deps, label, section)
+            score = term_info["match_score"]
+            if score is None:
+                # Classifier predictions are not calibrated by score
+                continue
+            correct = term_info["statement_type"] == statement_type and term_info["field"] == field_name
+            hits, total = totals.get(score, (0, 0))
+            totals[score] = (hits + count * correct, total + count)
+        
+        if sum(total for _, total in totals.values()) < min_examples:
+            return cls()
+        
+        # Pool adjacent violators: blocks of [lowest score, hits, total]
+        blocks: List[List[float]] = []
+        for score in sorted(totals):
+            hits, total = totals[score]
+            blocks.append([score, hits, total])
+            while len(blocks) > 1 and blocks[-2][1] / blocks[-2][2] >= blocks[-1][1] / blocks[-1][2]:
+                _, hits, total = blocks.pop()
+                blocks[-1][1] += hits
+                blocks[-1][2] += total
+        
+        # Laplace smoothing keeps small blocks away from 0 and 1
+        steps = [(int(score), (hits + 1) / (total + 2)) for score, hits, total in blocks]
+        if steps[0][0] > 0:
+            # Scores below the lowest observed one get its confidence
+            steps.insert(0, (0, steps[0][1]))
+        return cls(steps, examples=int(sum(total for _, _, total in blocks)))
+    
+    def describe(self) -> dict:
+        """Steps and provenance of the calibration, for logging"""
+        return {
+            "steps": list(zip(self.scores, [round(c, 3) for c in self.confidences])),
+            "examples": self.examples
+        }
+
+def logged_decisions(path: str) -> Iterator[Tuple[str, str, str, str, int]]:
+    """
+    Calibration examples from the decision log (classifier.append_examples).
+    
+    Args:
+        path: JSONL decision log; a missing file yields nothing
+    
+    Yields:
+        (label, section, statement_type, field, 1) per logged decision
+    """
+    if not os.path.exists(path):
+        return
+    for example in load_examples(path):
+        yield example["label"], example.get("section", ""), example["statement_type"], example["field"], 1
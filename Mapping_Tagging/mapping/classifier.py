@@ -0,0 +1,424 @@
+"""
+Local label classifier distilled from logged mapping decisions.
+
+Past mapping runs are logged as (label, section, statement_type, field) lines in a JSONL file.
+A softmax linear model over hashed character n-gram and word features is trained on them,
+saved as versioned .npz files and consulted before the LLM for labels the keyword
+dictionaries can't place with confidence.
+
+Usage:
+    python -m mapping.classifier train --log mapping_log.jsonl --models-dir models
+    python -m mapping.classifier report --log mapping_log.jsonl --model models/label_classifier-v3.npz
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import argparse
+import datetime
+import glob
+import json
+import os
+import re
+import sys
+import time
+import zlib
+import numpy as np
+
+from .fuzzy import char_ngrams, normalize_label
+
+# Default locations of the decision log and of the trained models
+DEFAULT_MAPPING_LOG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "mapping_log.jsonl")
+DEFAULT_MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "models")
+
+# Size of the hashed feature space
+HASH_DIMENSIONS = 2 ** 15
+
+# Character n-gram lengths taken from the label
+CLASSIFIER_NGRAM_SIZES = (3, 4)
+
+# Predictions below this probability are left to the LLM
+CLASSIFIER_MIN_PROBABILITY = float(os.environ.get("CLASSIFIER_MIN_PROBABILITY", "0.9"))
+
+# Share of a label's feature weight the training data must have seen; below it the
+# classifier abstains instead of forcing the label into one of its known classes
+CLASSIFIER_MIN_COVERAGE = float(os.environ.get("CLASSIFIER_MIN_COVERAGE", "0.6"))
+
+# Statement scopes of the mapping tools, as class name prefixes
+STATEMENT_SCOPES = {"income": "income_statement.", "position": "financial_position."}
+
+# Section words that pin a balance sheet label to one group of fields
+SECTION_FIELD_PREFIXES = {
+    "current assets": "financial_position.currentAssets.",
+    "non current assets": "financial_position.nonCurrentAssets.",
+    "current liabilities": "financial_position.currentLiabilities.",
+    "non current liabilities": "financial_position.nonCurrentLiabilities.",
+    "equity": "financial_position.equity."
+}
+
+MODEL_FILE_PATTERN = "label_classifier-v{version}.npz"
+_MODEL_VERSION = re.compile(r"label_classifier-v(\d+)\.npz$")
+_CAMEL_BOUNDARY = re.compile(r"([a-z0-9])([A-Z])")
+
+def _split_camel(text: str) -> str:
+    """Split camelCase keys ("cashAndBankBalances") into words"""
+    return _CAMEL_BOUNDARY.sub(r"\1 \2", text)
+
+def extract_features(label: str, section: str = "") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hashed feature vector of a label in its section.
+    
+    Args:
+        label: Raw label
+        section: Dotted path of the section holding the label
+    
+    Returns:
+        Tuple of (feature indices, L2-normalized feature values)
+    """
+    text = normalize_label(_split_camel(label))
+    features = [gram for n in CLASSIFIER_NGRAM_SIZES for gram in char_ngrams(text, n)]
+    features += ["w:" + word for word in text.split()]
+    features += ["s:" + word for word in normalize_label(_split_camel(section)).split()]
+    
+    counts: Dict[int, float] = {}
+    for feature in features:
+        idx = zlib.crc32(feature.encode()) % HASH_DIMENSIONS
+        counts[idx] = counts.get(idx, 0.0) + 1.0
+    
+    indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+    return indices, values / max(float(np.linalg.norm(values)), 1e-12)
+
+def section_field_prefix(section: str) -> Optional[str]:
+    """
+    Field group a section restricts its labels to.
+    
+    Args:
+        section: Dotted path of the section holding a label
+    
+    Returns:
+        Class name prefix of the innermost balance sheet group named in the path, or None
+    """
+    for part in reversed(section.split(".")):
+        prefix = SECTION_FIELD_PREFIXES.get(normalize_label(_split_camel(part)))
+        if prefix:
+            return prefix
+    return None
+
+def load_examples(path: str) -> List[Dict[str, str]]:
+    """
+    Read logged mapping decisions.
+    
+    Args:
+        path: JSONL file with label, section, statement_type and field per line
+    
+    Returns:
+        List of decision dictionaries
+    """
+    examples = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                examples.append(json.loads(line))
+    return examples
+
+def append_examples(path: str, decisions: Iterable[Tuple[str, str, str, str]]) -> int:
+    """
+    Append mapping decisions to the log used for training.
+    
+    Args:
+        path: JSONL log file
+        decisions: (label, section, statement_type, field) tuples, e.g. from align_decisions
+    
+    Returns:
+        Number of lines written
+    """
+    lines = [
+        json.dumps({"label": label, "section": section, "statement_type": statement_type, "field": field})
+        for label, section, statement_type, field in decisions
+    ]
+    if lines:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+    return len(lines)
+
+class LabelClassifier:
+    """
+    Multinomial logistic regression over hashed label and section features.
+    
+    Classes are "statement_type.field" strings in term-table form, like the synonym store.
+    """
+    
+    def __init__(self, classes: List[str], weights: Optional[np.ndarray] = None,
+                 bias: Optional[np.ndarray] = None, metadata: Optional[Dict[str, Any]] = None):
+        """
+        Create a classifier.
+        
+        Args:
+            classes: Class names, in weight column order
+            weights: (HASH_DIMENSIONS x classes) weights (zeros if None)
+            bias: Per-class bias (zeros if None)
+            metadata: Training provenance stored with the model
+        """
+        self.classes = list(classes)
+        self.weights = weights if weights is not None else np.zeros((HASH_DIMENSIONS, len(classes)), dtype=np.float32)
+        self.bias = bias if bias is not None else np.zeros(len(classes), dtype=np.float32)
+        self.metadata = metadata or {}
+        # Feature rows that training never touched stay exactly zero
+        self.seen = np.any(self.weights != 0, axis=1)
+        self._scopes: Dict[Tuple[str, Optional[str]], np.ndarray] = {}
+    
+    @classmethod
+    def train(cls, examples: List[Dict[str, str]], epochs: int = 30, learning_rate: float = 10.0,
+              l2: float = 1e-6, batch_size: int = 64, seed: int = 0) -> "LabelClassifier":
+        """
+        Fit a classifier with mini-batch gradient descent on the cross-entropy loss.
+        
+        Args:
+            examples: Logged decisions (label, section, statement_type, field)
+            epochs: Passes over the data
+            learning_rate: Step size
+            l2: Weight decay
+            batch_size: Examples per gradient step
+            seed: Seed of the shuffling order
+        
+        Returns:
+            Trained classifier
+        """
+        classes = sorted({f"{e['statement_type']}.{e['field']}" for e in examples})
+        class_ids = {name: i for i, name in enumerate(classes)}
+        model = cls(classes, metadata={
+            "examples": len(examples),
+            "epochs": epochs,
+            "trained_at": datetime.datetime.now(datetime.timezone.utc).isoformat()
+        })
+        
+        features = [extract_features(e["label"], e.get("section", "")) for e in examples]
+        targets = np.array([class_ids[f"{e['statement_type']}.{e['field']}"] for e in examples], dtype=np.int64)
+        
+        rng = np.random.default_rng(seed)
+        for _ in range(epochs):
+            order = rng.permutation(len(examples))
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                indices = [features[i][0] for i in batch]
+                values = [features[i][1] for i in batch]
+                
+                probabilities = model._probabilities(indices, values)
+                probabilities[np.arange(len(batch)), targets[batch]] -= 1
+                gradient = probabilities / len(batch)
+                
+                # Sparse update: only the rows of the features present in the batch
+                rows = np.concatenate(indices)
+                updates = np.concatenate([v[:, None] * g for v, g in zip(values, gradient)])
+                model.weights *= 1 - learning_rate * l2
+                np.add.at(model.weights, rows, -learning_rate * updates)
+                model.bias -= learning_rate * gradient.sum(axis=0)
+        model.seen = np.any(model.weights != 0, axis=1)
+        return model
+    
+    def _probabilities(self, indices: List[np.ndarray], values: List[np.ndarray]) -> np.ndarray:
+        """Class probabilities of a batch of feature vectors"""
+        scores = np.stack([v @ self.weights[i] for i, v in zip(indices, values)]) + self.bias
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        return scores / scores.sum(axis=1, keepdims=True)
+    
+    def _scope(self, statement_type: str, section: str) -> np.ndarray:
+        """Mask of the classes a label in this statement scope and section may take"""
+        key = (statement_type, section_field_prefix(section))
+        mask = self._scopes.get(key)
+        if mask is None:
+            statement_prefix, field_prefix = STATEMENT_SCOPES.get(statement_type, ""), key[1]
+            mask = np.array([
+                name.startswith(statement_prefix) and (field_prefix is None or name.startswith(field_prefix))
+                for name in self.classes
+            ], dtype=bool)
+            self._scopes[key] = mask
+        return mask
+    
+    def predict(self, label: str, section: str = "",
+                statement_type: str = "all") -> Optional[Tuple[str, str, float]]:
+        """
+        Most likely field of a label.
+        
+        Only fields of the requested statement, and of the balance sheet group named in the
+        section, are considered. Probabilities are not renormalized over them, so a label the
+        model places outside the scope comes back with a low probability.
+        
+        Args:
+            label: Raw label
+            section: Dotted path of the section holding the label
+            statement_type: Statement scope ("income", "position", "all")
+        
+        Returns:
+            Tuple of (statement_type, field, probability), or None when the model abstains:
+            no field is in scope, or too little of the label was seen in training
+        """
+        indices, values = extract_features(label, section)
+        if float((values[self.seen[indices]] ** 2).sum()) < CLASSIFIER_MIN_COVERAGE:
+            return None
+        mask = self._scope((statement_type or "all").lower(), section)
+        if not mask.any():
+            return None
+        probabilities = np.where(mask, self._probabilities([indices], [values])[0], 0.0)
+        best = int(probabilities.argmax())
+        statement_type, field = self.classes[best].split(".", 1)
+        return statement_type, field, float(probabilities[best])
+    
+    def save(self, models_dir: str) -> str:
+        """
+        Save the model as the next version in a directory.
+        
+        Args:
+            models_dir: Directory holding the versioned model files
+        
+        Returns:
+            Path of the written file
+        """
+        os.makedirs(models_dir, exist_ok=True)
+        latest = latest_model_path(models_dir)
+        version = int(_MODEL_VERSION.search(latest).group(1)) + 1 if latest else 1
+        self.metadata["version"] = version
+        path = os.path.join(models_dir, MODEL_FILE_PATTERN.format(version=version))
+        np.savez_compressed(
+            path,
+            weights=self.weights,
+            bias=self.bias,
+            classes=np.array(self.classes),
+            metadata=np.array(json.dumps(self.metadata))
+        )
+        return path
+    
+    @classmethod
+    def load(cls, path: str) -> "LabelClassifier":
+        """Load a model file written by save()"""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                [str(c) for c in data["classes"]],
+                data["weights"],
+                data["bias"],
+                json.loads(str(data["metadata"]))
+            )
+
+def latest_model_path(models_dir: str) -> Optional[str]:
+    """Path of the highest model version in a directory, or None"""
+    versions = []
+    for path in glob.glob(os.path.join(models_dir, "label_classifier-v*.npz")):
+        match = _MODEL_VERSION.search(path)
+        if match:
+            versions.append((int(match.group(1)), path))
+    return max(versions)[1] if versions else None
+
+def load_latest(models_dir: str = DEFAULT_MODELS_DIR) -> Optional[LabelClassifier]:
+    """Load the newest model in a directory, or None if there is none"""
+    path = latest_model_path(models_dir)
+    return LabelClassifier.load(path) if path else None
+
+def evaluate(model: LabelClassifier, examples: List[Dict[str, str]],
+             min_probability: float = CLASSIFIER_MIN_PROBABILITY) -> Dict[str, Any]:
+    """
+    Offline accuracy and latency of a model.
+    
+    Args:
+        model: Classifier to evaluate
+        examples: Held-out logged decisions
+        min_probability: Probability from which predictions are used instead of the LLM
+    
+    Returns:
+        Dictionary with overall accuracy, coverage and accuracy above the threshold,
+        and per-label latency percentiles in microseconds. Abstentions count as misses
+    """
+    correct = covered = covered_correct = 0
+    latencies = []
+    for example in examples:
+        start = time.perf_counter()
+        prediction = model.predict(example["label"], example.get("section", ""))
+        latencies.append((time.perf_counter() - start) * 1e6)
+        if prediction is None:
+            continue
+        
+        statement_type, field, probability = prediction
+        hit = statement_type == example["statement_type"] and field == example["field"]
+        correct += hit
+        if probability >= min_probability:
+            covered += 1
+            covered_correct += hit
+    
+    total = max(len(examples), 1)
+    return {
+        "examples": len(examples),
+        "accuracy": correct / total,
+        "coverage": covered / total,
+        "accuracy_above_threshold": covered_correct / covered if covered else None,
+        "min_probability": min_probability,
+        "latency_us_p50": float(np.percentile(latencies, 50)) if latencies else None,
+        "latency_us_p95": float(np.percentile(latencies, 95)) if latencies else None
+    }
+
+def _held_out(example: Dict[str, str], holdout: float, seed: int) -> bool:
+    """
+    Whether an example belongs to the held-out set.
+    
+    The split hashes the normalized label, so every occurrence of a label lands on the same
+    side and the split of a log stays the same as it grows.
+    """
+    key = f"{seed}:{normalize_label(_split_camel(example['label']))}"
+    return zlib.crc32(key.encode()) % 10000 < holdout * 10000
+
+def _split_holdout(examples: List[Dict[str, str]], holdout: float, seed: int) -> Tuple[list, list]:
+    """Split examples into training and held-out sets, grouped by normalized label"""
+    train, held = [], []
+    for example in examples:
+        (held if _held_out(example, holdout, seed) else train).append(example)
+    return train, held
+
+def _unique_labels(examples: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """First example of every (normalized label, section) pair"""
+    unique = {}
+    for example in examples:
+        key = (normalize_label(_split_camel(example["label"])), example.get("section", ""))
+        unique.setdefault(key, example)
+    return list(unique.values())
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: train a new model version or report on an existing one"""
+    parser = argparse.ArgumentParser(description="Train and evaluate the local label classifier")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    train_parser = subparsers.add_parser("train", help="Train a new model version from the decision log")
+    train_parser.add_argument("--log", default=DEFAULT_MAPPING_LOG_PATH, help="JSONL decision log")
+    train_parser.add_argument("--models-dir", default=DEFAULT_MODELS_DIR, help="Directory of versioned models")
+    train_parser.add_argument("--epochs", type=int, default=30)
+    train_parser.add_argument("--learning-rate", type=float, default=10.0)
+    train_parser.add_argument("--holdout", type=float, default=0.2, help="Share of examples held out for the report")
+    train_parser.add_argument("--seed", type=int, default=0)
+    
+    report_parser = subparsers.add_parser("report", help="Accuracy and latency of a model on held-out logged decisions")
+    report_parser.add_argument("--log", default=DEFAULT_MAPPING_LOG_PATH, help="JSONL decision log")
+    report_parser.add_argument("--model", help="Model file (defaults to the latest version)")
+    report_parser.add_argument("--models-dir", default=DEFAULT_MODELS_DIR, help="Directory of versioned models")
+    
+    args = parser.parse_args(argv)
+    examples = load_examples(args.log)
+    
+    if args.command == "train":
+        train_examples, holdout_examples = _split_holdout(examples, args.holdout, args.seed)
+        model = LabelClassifier.train(train_examples, epochs=args.epochs, learning_rate=args.learning_rate, seed=args.seed)
+        model.metadata.update({"holdout": args.holdout, "seed": args.seed})
+        if holdout_examples:
+            model.metadata["holdout_report"] = evaluate(model, _unique_labels(holdout_examples))
+        path = model.save(args.models_dir)
+        print(json.dumps({"model": path, **model.metadata}, indent=2))
+        return 0
+    
+    path = args.model or latest_model_path(args.models_dir)
+    if not path:
+        print(f"No model found in {args.models_dir}", file=sys.stderr)
+        return 1
+    # Only labels the model was not trained on, each counted once
+    model = LabelClassifier.load(path)
+    holdout, seed = model.metadata.get("holdout", 0.2), model.metadata.get("seed", 0)
+    held_out = _unique_labels([e for e in examples if _held_out(e, holdout, seed)])
+    print(json.dumps({"model": path, **evaluate(model, held_out)}, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
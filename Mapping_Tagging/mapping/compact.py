@@ -0,0 +1,89 @@
+"""
+Mapping result schema with short field aliases, to cut the agent's output tokens.
+"""
+from copy import copy
+from typing import Any, Dict, Optional, Type
+import re
+from pydantic import BaseModel, create_model
+
+from .derivation import MappingResult
+
+_WORD = re.compile(r"[A-Z][a-z]*|[a-z]+|\d+")
+
+def short_alias(name: str) -> str:
+    """
+    Short form of a field name: the initials of its words, digits kept.
+    
+    "ShareOfProfitLossOfAssociatesAndJointVenturesAccountedForUsingEquityMethod" -> "soploaajvafuem"
+    """
+    return "".join(word if word.isdigit() else word[0] for word in _WORD.findall(name)).lower()
+
+def with_short_aliases(model: Type[BaseModel]) -> Type[BaseModel]:
+    """
+    Subclass of a schema model whose fields (and those of its sections) use short aliases.
+    
+    Aliases are derived from the field names, with a numeric suffix when two fields of a
+    section share initials, so they only change when the schema does. Instances validate
+    from alias keys (or field names) and model_dump() returns the full field names, so the
+    expansion back to the original schema is just a dump. Validators are inherited. Each
+    description is prefixed with the full field name, so the model still knows which field
+    an alias stands for.
+    
+    Args:
+        model: Schema model (e.g. MappingResult)
+    
+    Returns:
+        The aliased subclass
+    """
+    fields: Dict[str, Any] = {}
+    used = set()
+    for name, info in model.model_fields.items():
+        alias = short_alias(name)
+        suffix = 2
+        while alias in used:
+            alias = f"{short_alias(name)}{suffix}"
+            suffix += 1
+        used.add(alias)
+        
+        annotation = info.annotation
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            annotation = with_short_aliases(annotation)
+        aliased = copy(info)
+        aliased.alias = aliased.validation_alias = aliased.serialization_alias = alias
+        aliased.alias_priority = 2
+        aliased.description = f"{name}. {info.description}" if info.description else name
+        fields[name] = (annotation, aliased)
+    
+    compact = create_model(model.__name__, __base__=model, __module__=model.__module__, **fields)
+    compact.model_config["populate_by_name"] = True
+    compact.model_rebuild(force=True)
+    return compact
+
+def compact_aliases(data: Dict[str, Any], model: Optional[Type[BaseModel]] = None) -> Dict[str, Any]:
+    """
+    Translate a mapped document with full field names into its short-alias form.
+    
+    Args:
+        data: Document with full field names (e.g. a PartialXBRL model_dump)
+        model: Aliased schema (defaults to CompactMappingResult)
+    
+    Returns:
+        The same document keyed by aliases, as the agent would produce it
+    """
+    return (model or CompactMappingResult).model_validate(data).model_dump(by_alias=True)
+
+def expand_aliases(data: Dict[str, Any], model: Optional[Type[BaseModel]] = None) -> Dict[str, Any]:
+    """
+    Translate a short-alias document back to full field names.
+    
+    Args:
+        data: Document keyed by aliases (the agent's raw structured output)
+        model: Aliased schema (defaults to CompactMappingResult)
+    
+    Returns:
+        The document keyed by the PartialXBRL field names
+    """
+    return (model or CompactMappingResult).model_validate(data).model_dump()
+
+# Result schema of the mapping agent when COMPACT_MAPPING_OUTPUT is on
+CompactMappingResult = with_short_aliases(MappingResult)
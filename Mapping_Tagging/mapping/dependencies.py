@@ -1,23 +1,138 @@
 """
 Dependencies for the financial statement mapping agent.
 """
-from dataclasses import dataclass
-from typing import Dict, List
+from dataclasses import MISSING, dataclass, field, fields
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import os
+
+from .classifier import LabelClassifier, DEFAULT_MAPPING_LOG_PATH, DEFAULT_MODELS_DIR, load_latest
+from .calibration import ScoreCalibrator, MATCH_CONFIDENCE_THRESHOLD, logged_decisions
+from .fuzzy import FuzzyTermIndex
+from .matcher import TermMatcher
+from .synonyms import SynonymStore, DEFAULT_SYNONYM_STORE_PATH
+from .termdb import CompiledTermMatcher
+
+# Fields whose reassignment recompiles the matcher and bumps the dictionary version
+TERM_TABLE_FIELDS = ("income_statement_terms", "financial_position_terms")
 
 @dataclass
 class FinancialTermDeps:
     """Dependencies for financial term mapping"""
     income_statement_terms: Dict[str, List[str]]
     financial_position_terms: Dict[str, List[str]]
+    # Labels merged from the synonym store, with their frequency and confidence
+    learned_terms: Dict[str, Dict[str, Any]] = field(default_factory=dict, repr=False, compare=False)
+    # Maps match scores to confidence; leaves at or above the threshold are mapped locally
+    calibrator: ScoreCalibrator = field(default_factory=ScoreCalibrator, repr=False, compare=False)
+    confidence_threshold: float = field(default=MATCH_CONFIDENCE_THRESHOLD, compare=False)
+    # Classifier trained on past mapping runs, consulted for labels below the threshold
+    label_classifier: Optional[LabelClassifier] = field(default=None, repr=False, compare=False)
+    matcher: TermMatcher = field(init=False, repr=False, compare=False)
+    fuzzy_index: FuzzyTermIndex = field(init=False, repr=False, compare=False)
+    version: str = field(init=False, compare=False)
     
     def __post_init__(self):
-        """Ensure all terms are lowercase for case-insensitive matching"""
-        self.income_statement_terms = {
+        """Ensure all terms are lowercase for case-insensitive matching and compile the matcher"""
+        self.refresh()
+    
+    def __setattr__(self, name, value):
+        """Recompile whenever a term table is replaced"""
+        super().__setattr__(name, value)
+        if name in TERM_TABLE_FIELDS and "version" in self.__dict__:
+            self.refresh()
+    
+    def __getattr__(self, name):
+        """Build the attributes that are only needed by some lookups on first use"""
+        if name == "fuzzy_index":
+            value = FuzzyTermIndex(self.matcher)
+        elif name in TERM_TABLE_FIELDS and isinstance(self.__dict__.get("matcher"), CompiledTermMatcher):
+            # Decoded from the compiled dictionary only when something edits or exports them
+            income, position = self.__dict__["matcher"].term_tables()
+            self.__dict__.update(income_statement_terms=income, financial_position_terms=position)
+            return self.__dict__[name]
+        else:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        self.__dict__[name] = value
+        return value
+    
+    @classmethod
+    def from_compiled(cls, path: str) -> "FinancialTermDeps":
+        """
+        Load dependencies from a compiled term dictionary (python -m mapping.termdb build).
+        
+        The file is memory-mapped and only its header is read, so loading takes constant time
+        and the pages are shared by every process mapping the same file. The term tables are
+        decoded lazily, the first time they are accessed.
+        
+        Args:
+            path: Compiled dictionary file
+        
+        Returns:
+            FinancialTermDeps backed by the mapped dictionary
+        """
+        deps = cls.__new__(cls)
+        for f in fields(cls):
+            if f.default is not MISSING:
+                deps.__dict__[f.name] = f.default
+            elif f.default_factory is not MISSING:
+                deps.__dict__[f.name] = f.default_factory()
+        matcher = CompiledTermMatcher(path)
+        deps.__dict__.update(matcher=matcher, version=matcher.version)
+        return deps
+    
+    def refresh(self) -> None:
+        """
+        Normalize the term tables, recompile the matcher and recompute the dictionary version.
+        Call this after editing the term tables in place; replacing them triggers it automatically.
+        """
+        # Write through __dict__ so the normalization doesn't re-trigger __setattr__
+        self.__dict__["income_statement_terms"] = {
             k: [t.lower() for t in terms] for k, terms in self.income_statement_terms.items()
         }
-        self.financial_position_terms = {
+        self.__dict__["financial_position_terms"] = {
             k: [t.lower() for t in terms] for k, terms in self.financial_position_terms.items()
         }
+        self.__dict__["matcher"] = TermMatcher(self.income_statement_terms, self.financial_position_terms)
+        # The n-gram index is rebuilt from the new matcher on first use
+        self.__dict__.pop("fuzzy_index", None)
+        
+        # Content fingerprint: memoized matches are keyed by it, so any change invalidates them
+        tables = json.dumps([self.income_statement_terms, self.financial_position_terms])
+        self.__dict__["version"] = hashlib.sha1(tables.encode()).hexdigest()[:16]
+    
+    def best_match(self, term: str, statement_type: str = "all") -> Optional[Tuple[str, str, int]]:
+        """
+        Find the best field for a term by keyword matching.
+        
+        Args:
+            term: Lowercased, stripped term
+            statement_type: Statement scope ("all", "income", "position", ...)
+        
+        Returns:
+            Tuple of (statement prefix, field name, score), or None if nothing matched
+        """
+        return self.matcher.best_match(term, statement_type)
+    
+    def fuzzy_match(self, term: str, statement_type: str = "all") -> Optional[Tuple[str, str, float]]:
+        """
+        Find the nearest field for a term no keyword matched, by character n-gram similarity
+        (catches misspellings and reordered words). Only safe matches are returned; see
+        FuzzyTermIndex.match.
+        
+        Args:
+            term: Lowercased, stripped term
+            statement_type: Statement scope ("all", "income", "position", ...)
+        
+        Returns:
+            Tuple of (statement prefix, field name, similarity), or None
+        """
+        nearest = self.fuzzy_index.match(term, statement_type)
+        if nearest is None:
+            return None
+        prefix = "income" if nearest["statement_type"] == "income_statement" else "position"
+        return prefix, nearest["field"], nearest["similarity"]
 
 # Create term mappings
 position_terms = {
@@ -82,5 +197,25 @@ income_terms = {
     "ProfitLossAttributableToNoncontrollingInterests": ["non-controlling interests", "minority interest", "minority shareholders", "nci"]
 }
 
-# Create an instance of the dependencies
-financial_deps = FinancialTermDeps(income_terms, position_terms)
+# Create an instance of the dependencies, from the compiled dictionary when one is configured
+TERM_DB_PATH = os.environ.get("TERM_DB_PATH")
+if TERM_DB_PATH:
+    financial_deps = FinancialTermDeps.from_compiled(TERM_DB_PATH)
+else:
+    financial_deps = FinancialTermDeps(income_terms, position_terms)
+
+# Log of accepted mapping decisions with the section of each label; the label classifier is
+# trained and the calibrator fitted on it
+MAPPING_LOG_PATH = os.environ.get("MAPPING_LOG_PATH", DEFAULT_MAPPING_LOG_PATH)
+
+# Calibrate match scores on the logged decisions, then extend the dictionaries with the
+# synonyms learned from them (calibrating first keeps learned labels from scoring themselves)
+synonym_store = SynonymStore(os.environ.get("SYNONYM_STORE_PATH", DEFAULT_SYNONYM_STORE_PATH))
+financial_deps.calibrator = ScoreCalibrator.fit(logged_decisions(MAPPING_LOG_PATH), financial_deps)
+if not TERM_DB_PATH:
+    # Compiled dictionaries get their synonyms at build time (termdb build --with-synonyms)
+    # rather than being decoded and recompiled in every worker
+    synonym_store.merge_into(financial_deps)
+
+# Latest local label classifier, if one has been trained (python -m mapping.classifier train)
+financial_deps.label_classifier = load_latest(os.environ.get("LABEL_CLASSIFIER_DIR", DEFAULT_MODELS_DIR))
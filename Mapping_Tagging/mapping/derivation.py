@@ -0,0 +1,215 @@
+"""
+Local computation of derived totals, sign conventions and consistency checks on mapped statements.
+"""
+from typing import Any, Dict, List, Optional, Tuple, Type
+from pydantic import BaseModel, ConfigDict, Field, create_model
+
+from .models import PartialXBRL, StatementOfFinancialPosition
+
+# Differences up to this amount (in the declared rounding unit) are rounding, not errors
+ROUNDING_TOLERANCE = 1.0
+
+# Expense fields, reported as negative amounts
+EXPENSE_FIELDS = (
+    "IncomeStatement.EmployeeBenefitsExpense",
+    "IncomeStatement.DepreciationExpense",
+    "IncomeStatement.AmortisationExpense",
+    "IncomeStatement.RepairsAndMaintenanceExpense",
+    "IncomeStatement.SalesAndMarketingExpense",
+    "IncomeStatement.OtherExpensesByNature",
+    "IncomeStatement.FinanceCosts",
+    # Deducted from equity
+    "StatementOfFinancialPosition.Equity.TreasuryShares"
+)
+
+# Sections of the statement of financial position and the field holding their total
+POSITION_SECTION_TOTALS = {
+    "CurrentAssets": "CurrentAssets",
+    "NonCurrentAssets": "NoncurrentAssets",
+    "CurrentLiabilities": "CurrentLiabilities",
+    "NonCurrentLiabilities": "NoncurrentLiabilities",
+    "Equity": "Equity"
+}
+
+def _position_path(section: str, name: Optional[str] = None) -> str:
+    """Dotted path of a section (total) of the statement of financial position"""
+    return f"StatementOfFinancialPosition.{section}.{name or POSITION_SECTION_TOTALS[section]}"
+
+def _section_rule(section: str) -> Tuple[str, List[Tuple[str, float]], Tuple[str, ...]]:
+    """Derivation rule of a section total: the sum of every other field of the section"""
+    model = StatementOfFinancialPosition.model_fields[section].annotation
+    total = POSITION_SECTION_TOTALS[section]
+    components = [(_position_path(section, name), 1.0) for name in model.model_fields if name != total]
+    return _position_path(section), components, ()
+
+# Derivation rules in evaluation order: (total path, [(component path, weight)], components
+# that must be present). A total is derived from its components when it is missing, and
+# checked against them when it was mapped.
+DERIVATION_RULES = [_section_rule(section) for section in POSITION_SECTION_TOTALS] + [
+    ("StatementOfFinancialPosition.Assets",
+     [(_position_path("CurrentAssets"), 1.0), (_position_path("NonCurrentAssets"), 1.0)], ()),
+    ("StatementOfFinancialPosition.Liabilities",
+     [(_position_path("CurrentLiabilities"), 1.0), (_position_path("NonCurrentLiabilities"), 1.0)], ()),
+    ("IncomeStatement.ProfitLoss",
+     [("IncomeStatement.ProfitLossBeforeTaxation", 1.0),
+      ("IncomeStatement.TaxExpenseBenefitContinuingOperations", 1.0),
+      ("IncomeStatement.ProfitLossFromDiscontinuedOperations", 1.0)],
+     ("IncomeStatement.ProfitLossBeforeTaxation",)),
+    ("IncomeStatement.ProfitLossAttributableToOwnersOfCompany",
+     [("IncomeStatement.ProfitLoss", 1.0),
+      ("IncomeStatement.ProfitLossAttributableToNoncontrollingInterests", -1.0)],
+     ("IncomeStatement.ProfitLoss",))
+]
+
+# Totals the mapping agent may leave out
+DERIVED_FIELDS = frozenset(total for total, _, _ in DERIVATION_RULES)
+
+def _required(path: str) -> bool:
+    """Whether a dotted field path is required in PartialXBRL"""
+    model: Any = PartialXBRL
+    *sections, name = path.split(".")
+    for section in sections:
+        model = model.model_fields[section].annotation
+    return model.model_fields[name].is_required()
+
+# Derivable totals PartialXBRL requires: still missing after derivation, they are reported
+REQUIRED_TOTALS = tuple(sorted(path for path in DERIVED_FIELDS if _required(path)))
+
+# Components PartialXBRL requires, per total: a total derived without all of them is reported as partial
+REQUIRED_COMPONENTS = {
+    total: tuple(path for path, _ in components if _required(path))
+    for total, components, _ in DERIVATION_RULES
+}
+
+def _get(data: Dict[str, Any], path: str) -> Optional[float]:
+    """Numeric value at a dotted path, or None if missing or not a number"""
+    target: Any = data
+    for part in path.split("."):
+        if not isinstance(target, dict):
+            return None
+        target = target.get(part)
+    if isinstance(target, (int, float)) and not isinstance(target, bool):
+        return float(target)
+    return None
+
+def _set(data: Dict[str, Any], path: str, value: float) -> None:
+    """Write a value at a dotted path, creating missing sections"""
+    *sections, name = path.split(".")
+    target = data
+    for section in sections:
+        if not isinstance(target.get(section), dict):
+            target[section] = {}
+        target = target[section]
+    target[name] = value
+
+def _issue(check: str, path: str, expected: float, actual: float) -> Dict[str, Any]:
+    """Description of a failed consistency check"""
+    return {"check": check, "path": path, "expected": expected, "actual": actual,
+            "difference": round(actual - expected, 6)}
+
+def derive_statement_totals(mapped_data: Dict[str, Any],
+                            tolerance: float = ROUNDING_TOLERANCE) -> Dict[str, List[Any]]:
+    """
+    Normalize signs, fill in missing totals and check the statement arithmetic.
+    
+    Expenses (and treasury shares) are made negative. The sign of the tax line is fixed when
+    only the opposite sign makes profit before tax and profit after tax agree. Missing totals
+    are computed from their components; mapped totals are compared with them, as is the
+    balance sheet equation (Assets = Liabilities + Equity). Mismatches are reported, never
+    corrected. Totals derived while a required component was missing (e.g. Assets without
+    the non-current assets total) are listed as "partial" as well as "derived". Required
+    totals that were neither mapped nor derivable are listed as "missing": the data is then
+    not a valid PartialXBRL.
+    
+    Args:
+        mapped_data: PartialXBRL as a dictionary (model_dump output), updated in place
+        tolerance: Largest difference accepted as rounding
+    
+    Returns:
+        Dictionary with the "sign_normalized", "derived", "partial" and "missing" paths and
+        the failed checks ("issues")
+    """
+    report: Dict[str, List[Any]] = {"sign_normalized": [], "derived": [], "partial": [], "missing": [],
+                                    "issues": []}
+    
+    for path in EXPENSE_FIELDS:
+        value = _get(mapped_data, path)
+        if value is not None and value > 0:
+            _set(mapped_data, path, -value)
+            report["sign_normalized"].append(path)
+    
+    # Tax is an expense or a benefit; only the profit figures can tell which sign is meant
+    tax_path = "IncomeStatement.TaxExpenseBenefitContinuingOperations"
+    before_tax = _get(mapped_data, "IncomeStatement.ProfitLossBeforeTaxation")
+    tax = _get(mapped_data, tax_path)
+    profit = _get(mapped_data, "IncomeStatement.ProfitLoss")
+    if None not in (before_tax, tax, profit) and tax != 0:
+        discontinued = _get(mapped_data, "IncomeStatement.ProfitLossFromDiscontinuedOperations") or 0.0
+        if (abs(before_tax + tax + discontinued - profit) > tolerance
+                and abs(before_tax - tax + discontinued - profit) <= tolerance):
+            _set(mapped_data, tax_path, -tax)
+            report["sign_normalized"].append(tax_path)
+    
+    for total_path, components, required in DERIVATION_RULES:
+        values = [(_get(mapped_data, path), weight) for path, weight in components]
+        present = [(value, weight) for value, weight in values if value is not None]
+        if not present or any(_get(mapped_data, path) is None for path in required):
+            continue
+        expected = round(sum(value * weight for value, weight in present), 6)
+        actual = _get(mapped_data, total_path)
+        if actual is None:
+            _set(mapped_data, total_path, expected)
+            report["derived"].append(total_path)
+            if any(_get(mapped_data, path) is None for path in REQUIRED_COMPONENTS[total_path]):
+                report["partial"].append(total_path)
+        elif abs(actual - expected) > tolerance:
+            report["issues"].append(_issue("components", total_path, expected, actual))
+    
+    assets = _get(mapped_data, "StatementOfFinancialPosition.Assets")
+    liabilities = _get(mapped_data, "StatementOfFinancialPosition.Liabilities")
+    equity = _get(mapped_data, _position_path("Equity"))
+    if None not in (assets, liabilities, equity) and abs(assets - (liabilities + equity)) > tolerance:
+        report["issues"].append(
+            _issue("balance_sheet", "StatementOfFinancialPosition.Assets", liabilities + equity, assets)
+        )
+    
+    report["missing"] = [path for path in REQUIRED_TOTALS if _get(mapped_data, path) is None]
+    return report
+
+def with_optional_totals(model: Type[BaseModel], prefix: str = "") -> Type[BaseModel]:
+    """
+    Variant of a schema model in which the derivable totals are optional.
+    
+    Models without derivable totals are reused as they are, so their validators and JSON
+    schema names are unchanged.
+    
+    Args:
+        model: Schema model (e.g. PartialXBRL)
+        prefix: Dotted path of the model within PartialXBRL
+    
+    Returns:
+        The model itself, or a copy with DERIVED_FIELDS typed Optional[float] = None
+    """
+    fields: Dict[str, Any] = {}
+    changed = False
+    for name, info in model.model_fields.items():
+        path = f"{prefix}.{name}" if prefix else name
+        annotation = info.annotation
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            variant = with_optional_totals(annotation, path)
+            changed = changed or variant is not annotation
+            fields[name] = (variant, info)
+        elif path in DERIVED_FIELDS:
+            changed = True
+            fields[name] = (Optional[float], Field(
+                None, description=f"{info.description}. Computed from the components when omitted"
+            ))
+        else:
+            fields[name] = (annotation, info)
+    if not changed:
+        return model
+    return create_model(model.__name__, __config__=ConfigDict(**model.model_config),
+                        __doc__=model.__doc__, __module__=model.__module__, **fields)
+
+# Result schema of the mapping agent: PartialXBRL with the derivable totals optional
+MappingResult = with_optional_totals(PartialXBRL)
@@ -0,0 +1,254 @@
+"""
+Character n-gram similarity index for fuzzy matching of financial labels.
+"""
+from typing import Dict, FrozenSet, List, Optional
+import math
+import os
+import re
+import numpy as np
+
+from .matcher import INCOME_SCOPES, POSITION_SCOPES, TermMatcher
+
+# Length of the character n-grams
+NGRAM_SIZE = 3
+
+# Nearest fields below this cosine similarity are not reported as matches
+FUZZY_MIN_SIMILARITY = float(os.environ.get("FUZZY_MIN_SIMILARITY", "0.65"))
+
+# The nearest field must be this much more similar than the next one to be a match
+FUZZY_MIN_MARGIN = 0.1
+
+# Words giving a label a direction; a label and a keyword pointing in opposite
+# directions ("finance income" / "finance costs", "dividends paid" / "dividend income") never match
+INFLOW_WORDS = frozenset({
+    "income", "revenue", "revenues", "gain", "gains", "received", "receipts", "receivable", "receivables"
+})
+OUTFLOW_WORDS = frozenset({
+    "expense", "expenses", "expenditure", "cost", "costs", "loss", "losses", "paid", "payment", "payments",
+    "payable", "payables", "charge", "charges"
+})
+
+# Fuzzy matches score on a 0-5 scale, below an exact keyword match (6)
+FUZZY_SCORE_SCALE = 5
+
+# Label cleanup applied before n-grams are taken
+_REPLACEMENTS = (
+    (re.compile(r"&"), " and "),
+    (re.compile(r"[^a-z0-9 ]+"), " "),
+    (re.compile(r"\s+"), " ")
+)
+
+def normalize_label(label: str) -> str:
+    """Lowercase a label, spell out '&' and strip punctuation and repeated spaces"""
+    text = label.lower()
+    for pattern, replacement in _REPLACEMENTS:
+        text = pattern.sub(replacement, text)
+    return text.strip()
+
+def char_ngrams(text: str, n: int = NGRAM_SIZE) -> List[str]:
+    """Character n-grams of a normalized label, padded so word edges count"""
+    padded = f" {text} "
+    return [padded[i:i + n] for i in range(max(len(padded) - n + 1, 1))]
+
+_CAMEL_BOUNDARY = re.compile(r"([a-z0-9])([A-Z])")
+
+def polarity(text: str) -> FrozenSet[str]:
+    """Directions ("inflow", "outflow") named by the words of a label, keyword or field name"""
+    words = set(normalize_label(_CAMEL_BOUNDARY.sub(r"\1 \2", text)).split())
+    directions = set()
+    if words & INFLOW_WORDS:
+        directions.add("inflow")
+    if words & OUTFLOW_WORDS:
+        directions.add("outflow")
+    return frozenset(directions)
+
+def fuzzy_score(similarity: float) -> int:
+    """Integer match_score of a fuzzy match, comparable with the keyword scores"""
+    return max(1, int(similarity * FUZZY_SCORE_SCALE))
+
+class FuzzyTermIndex:
+    """
+    TF-IDF weighted character n-gram vectors of every keyword, for cosine nearest-field lookup.
+    
+    Keyword vectors are L2-normalized and stored sparsely, as one posting list per n-gram
+    (the keywords containing it and their weights) in CSR layout. A lookup only walks the
+    posting lists of the n-grams present in the label, so its cost depends on the label
+    length rather than on the vocabulary, and memory grows with the n-grams of the keywords
+    rather than with keywords x vocabulary.
+    """
+    
+    def __init__(self, matcher: TermMatcher):
+        """
+        Build the index over the keywords of a compiled term matcher.
+        
+        Args:
+            matcher: TermMatcher holding the keywords and the fields using them
+        """
+        self.fields = matcher.fields
+        self.income_field_count = matcher.income_field_count
+        self.keywords = matcher.keywords
+        self.keyword_fields = matcher.keyword_fields
+        
+        keyword_grams = [char_ngrams(normalize_label(keyword)) for keyword in self.keywords]
+        self.vocabulary: Dict[str, int] = {}
+        for grams in keyword_grams:
+            for gram in grams:
+                self.vocabulary.setdefault(gram, len(self.vocabulary))
+        
+        # Smoothed inverse document frequency; n-grams unseen in the keywords get the maximum
+        document_frequency = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for grams in keyword_grams:
+            for gram in set(grams):
+                document_frequency[self.vocabulary[gram]] += 1
+        keyword_count = len(self.keywords)
+        self.idf = np.log((1 + keyword_count) / (1 + document_frequency)) + 1
+        self.unseen_idf = math.log(1 + keyword_count) + 1
+        
+        # Normalized TF-IDF weight of each (n-gram, keyword) pair, grouped by n-gram
+        postings: List[List[tuple]] = [[] for _ in self.vocabulary]
+        for keyword_id, grams in enumerate(keyword_grams):
+            counts: Dict[int, int] = {}
+            for gram in grams:
+                column = self.vocabulary[gram]
+                counts[column] = counts.get(column, 0) + 1
+            weights = {column: count * float(self.idf[column]) for column, count in counts.items()}
+            norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+            for column, weight in weights.items():
+                postings[column].append((keyword_id, weight / norm))
+        
+        # CSR layout: the posting list of n-gram i is gram_keywords/gram_weights[gram_offsets[i]:gram_offsets[i + 1]]
+        self.gram_offsets = np.zeros(len(self.vocabulary) + 1, dtype=np.int64)
+        self.gram_offsets[1:] = np.cumsum([len(posting) for posting in postings])
+        self.gram_keywords = np.array(
+            [keyword_id for posting in postings for keyword_id, _ in posting], dtype=np.int32
+        )
+        self.gram_weights = np.array(
+            [weight for posting in postings for _, weight in posting], dtype=np.float32
+        )
+        
+        # Statement scopes each keyword belongs to
+        self.keyword_income = np.array(
+            [any(idx < self.income_field_count for idx in counts) for counts in self.keyword_fields], dtype=bool
+        )
+        self.keyword_position = np.array(
+            [any(idx >= self.income_field_count for idx in counts) for counts in self.keyword_fields], dtype=bool
+        )
+        
+        # Directions named by each keyword and field, checked against the label in match()
+        self.keyword_polarity = {keyword: polarity(keyword) for keyword in self.keywords}
+        self.field_polarity = {field_name: polarity(field_name) for _, field_name in self.fields}
+    
+    def similarities(self, label: str, statement_type: str = "all") -> np.ndarray:
+        """
+        Cosine similarity of a label with every keyword.
+        
+        Args:
+            label: Raw label
+            statement_type: Statement scope ("all", "income", "position", ...)
+        
+        Returns:
+            Array with one similarity per keyword; keywords outside the scope get -1
+        """
+        counts: Dict[str, int] = {}
+        for gram in char_ngrams(normalize_label(label)):
+            counts[gram] = counts.get(gram, 0) + 1
+        
+        columns, weights, norm = [], [], 0.0
+        for gram, count in counts.items():
+            column = self.vocabulary.get(gram)
+            weight = count * (self.unseen_idf if column is None else float(self.idf[column]))
+            norm += weight * weight
+            if column is not None:
+                columns.append(column)
+                weights.append(weight)
+        
+        sims = np.zeros(len(self.keywords), dtype=np.float32)
+        for column, weight in zip(columns, weights):
+            start, end = self.gram_offsets[column], self.gram_offsets[column + 1]
+            # A keyword appears at most once in a posting list, so the scatter-add has no collisions
+            sims[self.gram_keywords[start:end]] += np.float32(weight) * self.gram_weights[start:end]
+        if columns:
+            sims /= math.sqrt(norm)
+        
+        include_income = statement_type in INCOME_SCOPES
+        include_position = statement_type in POSITION_SCOPES
+        if include_income or include_position:
+            in_scope = (self.keyword_income & include_income) | (self.keyword_position & include_position)
+            sims[~in_scope] = -1
+        return sims
+    
+    def nearest(self, label: str, k: int = 5, statement_type: str = "all") -> List[Dict[str, object]]:
+        """
+        Nearest fields to a label by keyword similarity.
+        
+        Args:
+            label: Raw label
+            k: Number of fields to return
+            statement_type: Statement scope ("all", "income", "position", ...)
+        
+        Returns:
+            Up to k dictionaries with statement_type, field, keyword and similarity, best first
+        """
+        include_income = statement_type in INCOME_SCOPES
+        include_position = statement_type in POSITION_SCOPES
+        if not include_income and not include_position:
+            include_income = include_position = True
+        
+        sims = self.similarities(label, statement_type)
+        # Several keywords can point at one field, so look a little further than k
+        candidates = min(len(sims), k * 4)
+        if candidates == 0:
+            return []
+        top = np.argpartition(-sims, candidates - 1)[:candidates]
+        top = top[np.lexsort((top, -sims[top]))]
+        
+        results = []
+        seen = set()
+        for keyword_id in top:
+            similarity = float(sims[keyword_id])
+            if similarity <= 0:
+                break
+            for field_idx in sorted(self.keyword_fields[keyword_id]):
+                is_income = field_idx < self.income_field_count
+                if field_idx in seen or not (include_income if is_income else include_position):
+                    continue
+                seen.add(field_idx)
+                prefix, field_name = self.fields[field_idx]
+                results.append({
+                    "statement_type": "income_statement" if prefix == "income" else "financial_position",
+                    "field": field_name,
+                    "keyword": self.keywords[keyword_id],
+                    "similarity": round(similarity, 4)
+                })
+                if len(results) == k:
+                    return results
+        return results
+    
+    def match(self, label: str, statement_type: str = "all") -> Optional[Dict[str, object]]:
+        """
+        Nearest field to a label, if it is a safe match.
+        
+        The nearest field must reach FUZZY_MIN_SIMILARITY, beat the next field by
+        FUZZY_MIN_MARGIN, and not point in the opposite direction of the label (income
+        against expense, paid against received). Fields pointing the wrong way are skipped
+        before the margin is taken.
+        
+        Args:
+            label: Raw label
+            statement_type: Statement scope ("all", "income", "position", ...)
+        
+        Returns:
+            The nearest() entry of the matching field, or None
+        """
+        label_polarity = polarity(label)
+        ranked = []
+        for entry in self.nearest(label, 5, statement_type):
+            field_polarity = self.keyword_polarity[entry["keyword"]] | self.field_polarity[entry["field"]]
+            if label_polarity and field_polarity and not label_polarity & field_polarity:
+                continue
+            ranked.append(entry)
+        if not ranked or ranked[0]["similarity"] < FUZZY_MIN_SIMILARITY:
+            return None
+        if len(ranked) > 1 and ranked[0]["similarity"] - ranked[1]["similarity"] < FUZZY_MIN_MARGIN:
+            return None
+        return ranked[0]
@@ -0,0 +1,156 @@
+"""
+Multi-pattern term matcher for the financial statement mapping tools.
+"""
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+# Statement scopes accepted by match_financial_term's statement_type argument
+INCOME_SCOPES = ("all", "income", "profit", "loss")
+POSITION_SCOPES = ("all", "position", "balance", "financial_position")
+
+class TermMatcher:
+    """
+    Aho-Corasick automaton over every keyword in the term dictionaries.
+    
+    Scoring follows match_financial_term: for every field, each keyword contained in the
+    term adds 1 point (3 if the keyword is longer than 5 characters) and a keyword equal
+    to the whole term adds 6. All keywords are found in a single pass over the term,
+    so the cost of a lookup depends on the term length and the number of hits, not on the
+    size of the dictionary.
+    """
+    
+    def __init__(self, income_terms: Dict[str, List[str]], position_terms: Dict[str, List[str]]):
+        """
+        Compile the term dictionaries.
+        
+        Args:
+            income_terms: Lowercased keywords per income statement field
+            position_terms: Lowercased keywords per financial position field
+        """
+        # Fields in match priority order: income first, then position (ties go to the first)
+        self.fields: List[Tuple[str, str]] = (
+            [("income", field) for field in income_terms] +
+            [("position", field) for field in position_terms]
+        )
+        self.income_field_count = len(income_terms)
+        
+        # Unique keywords and, for each, the fields using it and how many times
+        self.keywords: List[str] = []
+        self.keyword_ids: Dict[str, int] = {}
+        self.keyword_fields: List[Dict[int, int]] = []
+        all_terms = list(income_terms.values()) + list(position_terms.values())
+        for field_idx, keywords in enumerate(all_terms):
+            for keyword in keywords:
+                if not keyword:
+                    continue
+                keyword_id = self.keyword_ids.get(keyword)
+                if keyword_id is None:
+                    keyword_id = self.keyword_ids[keyword] = len(self.keywords)
+                    self.keywords.append(keyword)
+                    self.keyword_fields.append({})
+                counts = self.keyword_fields[keyword_id]
+                counts[field_idx] = counts.get(field_idx, 0) + 1
+        
+        self._build_automaton()
+    
+    def _build_automaton(self) -> None:
+        """Build the goto, failure and output functions"""
+        self.goto: List[Dict[str, int]] = [{}]
+        self.outputs: List[List[int]] = [[]]
+        
+        for keyword_id, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.outputs.append([])
+                state = next_state
+            self.outputs[state].append(keyword_id)
+        
+        # Breadth-first pass for failure links; outputs are merged along them
+        self.fail: List[int] = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.fail[next_state]]
+    
+    def find_keywords(self, term: str) -> set:
+        """
+        Find every keyword contained in a term in one pass.
+        
+        Args:
+            term: Lowercased, stripped term
+        
+        Returns:
+            Set of matching keyword ids
+        """
+        found = set()
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        state = 0
+        for char in term:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
+    
+    def score(self, term: str, statement_type: str = "all") -> Dict[int, int]:
+        """
+        Score every field against a term.
+        
+        Args:
+            term: Lowercased, stripped term
+            statement_type: Statement scope ("all", "income", "position", ...)
+        
+        Returns:
+            Dictionary of field index to score, for fields with a positive score
+        """
+        include_income = statement_type in INCOME_SCOPES
+        include_position = statement_type in POSITION_SCOPES
+        if not include_income and not include_position:
+            # Unknown scope: use all mappings
+            include_income = include_position = True
+        
+        scores: Dict[int, int] = {}
+        for keyword_id in self.find_keywords(term):
+            keyword = self.keywords[keyword_id]
+            if keyword == term:
+                points = 6
+            else:
+                points = 3 if len(keyword) > 5 else 1
+            for field_idx, count in self.keyword_fields[keyword_id].items():
+                is_income = field_idx < self.income_field_count
+                if (is_income and include_income) or (not is_income and include_position):
+                    scores[field_idx] = scores.get(field_idx, 0) + points * count
+        return scores
+    
+    def best_match(self, term: str, statement_type: str = "all") -> Optional[Tuple[str, str, int]]:
+        """
+        Find the best scoring field for a term.
+        
+        Args:
+            term: Lowercased, stripped term
+            statement_type: Statement scope ("all", "income", "position", ...)
+        
+        Returns:
+            Tuple of (statement prefix, field name, score), or None if nothing matched
+        """
+        scores = self.score(term, statement_type)
+        if not scores:
+            return None
+        
+        # Highest score wins; on ties the field listed first in the dictionaries
+        field_idx = min(scores, key=lambda idx: (-scores[idx], idx))
+        prefix, field_name = self.fields[field_idx]
+        return prefix, field_name, scores[field_idx]
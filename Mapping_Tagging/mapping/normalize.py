@@ -0,0 +1,213 @@
+"""
+Vectorized normalization of raw statement values before mapping.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import re
+import numpy as np
+import pandas as pd
+
+from .models import AuditReport, DirectorsStatement, FilingInformation
+
+# Multipliers of the rounding levels in LevelOfRoundingUsedInFinancialStatements
+ROUNDING_MULTIPLIERS = {"units": 1.0, "thousands": 1e3, "millions": 1e6}
+
+# Keys that may declare the rounding level in raw data
+ROUNDING_KEYS = ("levelofroundingusedinfinancialstatements", "roundinglevel", "levelofrounding", "rounding")
+
+# Unit suffixes written after amounts
+SUFFIX_MULTIPLIERS = {
+    "k": 1e3, "thousand": 1e3, "'000": 1e3, "000s": 1e3,
+    "m": 1e6, "mn": 1e6, "mil": 1e6, "million": 1e6,
+    "b": 1e9, "bn": 1e9, "billion": 1e9
+}
+
+# Placeholders meaning "nothing to report", parsed as zero. Words such as "none" are not
+# included: they are as likely to be text ("Name of parent: None") as an empty amount
+ZERO_MARKERS = ("-", "–", "—", "nil")
+
+# The unicode minus sign (U+2212) is read as an ASCII "-", both as a sign and as a zero marker
+UNICODE_MINUS = "\u2212"
+
+# Currency codes and dollar prefixes (S$, US$) accepted before amounts; any other word
+# before a number ("no 5", "note 12") means the value is not an amount
+CURRENCY_CODES = (
+    "sgd", "usd", "eur", "gbp", "jpy", "cny", "rmb", "hkd", "myr", "rm", "aud", "nzd", "cad",
+    "chf", "inr", "idr", "thb", "php", "krw", "twd", "vnd"
+)
+DOLLAR_PREFIXES = ("s", "us", "hk", "a", "nz", "c")
+
+# An amount: optional parentheses or sign, optional currency code or symbol,
+# digits with thousand separators, optional unit suffix
+AMOUNT_PATTERN = (
+    r"^(?P<open>\()?\s*(?P<sign>-)?\s*"
+    r"(?:(?:" + "|".join(CURRENCY_CODES) + r")\s?)?(?:(?:" + "|".join(DOLLAR_PREFIXES) + r")?[$€£¥])?\s*"
+    r"(?P<number>\d{1,3}(?:[, ]\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?|\.\d+)\s*"
+    r"(?P<suffix>" + "|".join(sorted((re.escape(s) for s in SUFFIX_MULTIPLIERS), key=len, reverse=True)) + r")?"
+    r"\s*(?P<close>\))?$"
+)
+
+# Text fields of the schema and keys that hold identifiers, dates or versions, never amounts
+TEXT_KEYS = {
+    name.lower()
+    for model in (FilingInformation, DirectorsStatement, AuditReport)
+    for name in model.model_fields
+}
+# Only whole identifier keys or their typical endings: amount labels such as "Profit for the
+# year" or "Loss for the period" must still be parsed
+TEXT_KEY_PATTERN = re.compile(
+    r"^(?:fy|year|financial[ _]?year|period|reporting[ _]?period|uen|id)$"
+    r"|^date|date$|version$|code$|number$|^name|name$",
+    re.IGNORECASE
+)
+
+def _collect_leaves(data: Dict[str, Any]) -> Tuple[List[Tuple[Any, Any]], List[Any], List[str]]:
+    """
+    References to every scalar leaf of a document.
+    
+    Returns:
+        Tuple of ((container, key or index) per leaf, leaf values, leaf keys)
+    """
+    refs, values, keys = [], [], []
+    stack = [(data, None)]
+    while stack:
+        container, parent_key = stack.pop()
+        entries = container.items() if isinstance(container, dict) else enumerate(container)
+        for key, value in entries:
+            if isinstance(value, (dict, list)):
+                stack.append((value, key if isinstance(container, dict) else parent_key))
+            else:
+                refs.append((container, key))
+                values.append(value)
+                keys.append(str(key) if isinstance(container, dict) else str(parent_key))
+    return refs, values, keys
+
+def find_rounding_level(data: Dict[str, Any]) -> Optional[str]:
+    """
+    Declared rounding level of a raw document.
+    
+    Args:
+        data: Raw financial document
+    
+    Returns:
+        "units", "thousands" or "millions", or None if the document doesn't declare one
+    """
+    _, values, keys = _collect_leaves(data)
+    return detect_rounding_level(keys, values)
+
+def detect_rounding_level(keys: List[str], values: List[Any]) -> Optional[str]:
+    """Rounding level declared by the first rounding key among leaf keys and values"""
+    for key, value in zip(keys, values):
+        if isinstance(value, str) and key.lower() in ROUNDING_KEYS:
+            text = value.strip().lower()
+            if text in ROUNDING_MULTIPLIERS:
+                return text
+            if "thousand" in text or "'000" in text:
+                return "thousands"
+            if "million" in text:
+                return "millions"
+            if "unit" in text or "dollar" in text:
+                return "units"
+    return None
+
+def parse_amounts(values: pd.Series, unit_multiplier: float = 1.0) -> pd.DataFrame:
+    """
+    Parse raw amounts in one vectorized pass.
+    
+    Numbers pass through; strings like "1,234", "(5,000)", "-", "nil" and "1.2m" are parsed.
+    Amounts with a unit suffix are converted into the declared rounding unit, so "1.2m" in a
+    statement rounded to thousands becomes 1200.
+    
+    Args:
+        values: Raw leaf values (any types)
+        unit_multiplier: Multiplier of the declared rounding level (1, 1e3 or 1e6)
+    
+    Returns:
+        DataFrame aligned with the values, with columns "value" (float, NaN if not an amount),
+        "parsed" (a string was converted), "zero_marker" and "suffix_scaled"
+    """
+    is_number = values.map(lambda v: isinstance(v, (int, float)) and not isinstance(v, bool)).to_numpy(dtype=bool)
+    is_text = values.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+    
+    result = np.full(len(values), np.nan)
+    result[is_number] = values[is_number].astype(float).to_numpy()
+    
+    text = values[is_text].astype(str).str.strip().str.lower().str.replace(UNICODE_MINUS, "-", regex=False)
+    zero_marker = text.isin(ZERO_MARKERS).to_numpy(dtype=bool)
+    
+    parts = text.str.extract(AMOUNT_PATTERN)
+    # Parentheses must be balanced to mean a negative amount
+    balanced = parts["open"].notna() == parts["close"].notna()
+    number = pd.to_numeric(parts["number"].str.replace(r"[, ]", "", regex=True), errors="coerce")
+    negative = parts["open"].notna() | parts["sign"].notna()
+    suffix = parts["suffix"].map(SUFFIX_MULTIPLIERS)
+    amount = number.where(balanced) * np.where(negative, -1.0, 1.0) * (suffix / unit_multiplier).fillna(1.0)
+    
+    text_values = amount.to_numpy(dtype=float, copy=True)
+    text_values[zero_marker] = 0.0
+    result[is_text] = text_values
+    
+    parsed = np.zeros(len(values), dtype=bool)
+    parsed[is_text] = ~np.isnan(text_values)
+    scaled = np.zeros(len(values), dtype=bool)
+    scaled[is_text] = suffix.notna().to_numpy(dtype=bool) & ~np.isnan(text_values)
+    zeros = np.zeros(len(values), dtype=bool)
+    zeros[is_text] = zero_marker
+    
+    return pd.DataFrame({"value": result, "parsed": parsed, "zero_marker": zeros, "suffix_scaled": scaled},
+                        index=values.index)
+
+def normalize_statement_values(data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Replace formatted amounts in a raw document with plain numbers.
+    
+    Text fields (filing information, statements, opinions) and identifier keys (see
+    TEXT_KEY_PATTERN) are left untouched.
+    
+    Args:
+        data: Raw financial document (not modified)
+    
+    Returns:
+        Tuple of (normalized copy of the document, summary with the rounding level and counts)
+    """
+    normalized = _copy_containers(data)
+    refs, values, keys = _collect_leaves(normalized)
+    rounding = detect_rounding_level(keys, values)
+    summary = {"rounding_level": rounding, "leaves": len(values), "parsed": 0, "zero_markers": 0, "suffix_scaled": 0}
+    if not values:
+        return normalized, summary
+    
+    amount_keys = np.array(
+        [key.lower() not in TEXT_KEYS and not TEXT_KEY_PATTERN.search(key) for key in keys], dtype=bool
+    )
+    parsed = parse_amounts(pd.Series(values, dtype=object), ROUNDING_MULTIPLIERS.get(rounding, 1.0))
+    replace = parsed["parsed"].to_numpy(dtype=bool) & amount_keys
+    
+    parsed_values = parsed["value"].to_numpy()
+    for idx in np.flatnonzero(replace).tolist():
+        container, key = refs[idx]
+        value = float(parsed_values[idx])
+        container[key] = int(value) if value.is_integer() else value
+    
+    summary["parsed"] = int(replace.sum())
+    summary["zero_markers"] = int((parsed["zero_marker"].to_numpy(dtype=bool) & replace).sum())
+    summary["suffix_scaled"] = int((parsed["suffix_scaled"].to_numpy(dtype=bool) & replace).sum())
+    return normalized, summary
+
+def _copy_containers(data: Any) -> Any:
+    """Copy the dicts and lists of a document, sharing the scalar leaves"""
+    if not isinstance(data, (dict, list)):
+        return data
+    root = dict(data) if isinstance(data, dict) else list(data)
+    # Each container is copied shallowly, then its child containers are replaced by copies
+    stack = [root]
+    while stack:
+        container = stack.pop()
+        entries = container.items() if isinstance(container, dict) else enumerate(container)
+        for key, value in entries:
+            if isinstance(value, dict):
+                container[key] = dict(value)
+                stack.append(container[key])
+            elif isinstance(value, list):
+                container[key] = list(value)
+                stack.append(container[key])
+    return root
@@ -0,0 +1,195 @@
+"""
+Confidence-based routing of raw leaves between local mapping and the mapping agent.
+"""
+from typing import Any, Dict, Optional, Tuple
+import random
+
+from .calibration import CALIBRATION_SAMPLE_RATE
+from .classifier import section_field_prefix
+from .dependencies import FinancialTermDeps
+from .models import PartialXBRL
+from .synonyms import POSITION_SECTION_PREFIXES
+from .tools import lookup_term
+
+# Term-table prefix -> PartialXBRL section of the statement of financial position
+POSITION_PREFIX_SECTIONS = {prefix: section for section, prefix in POSITION_SECTION_PREFIXES.items()}
+
+def model_path(statement_type: str, field: str) -> Optional[str]:
+    """
+    Translate a term-table field into a dotted PartialXBRL path.
+    
+    Args:
+        statement_type: "income_statement" or "financial_position"
+        field: Term-table field name (e.g. "currentAssets.CashAndBankBalances")
+    
+    Returns:
+        Dotted path (e.g. "StatementOfFinancialPosition.CurrentAssets.CashAndBankBalances"),
+        or None if the field is not part of the PartialXBRL schema
+    """
+    if statement_type == "income_statement":
+        parts = ["IncomeStatement", field]
+    elif statement_type == "financial_position":
+        prefix, _, name = field.rpartition(".")
+        if prefix and prefix not in POSITION_PREFIX_SECTIONS:
+            return None
+        parts = ["StatementOfFinancialPosition"] + ([POSITION_PREFIX_SECTIONS[prefix]] if prefix else []) + [name]
+    else:
+        return None
+    
+    # Only accept paths that exist in the schema
+    model = PartialXBRL
+    for part in parts:
+        field_info = getattr(model, "model_fields", {}).get(part)
+        if field_info is None:
+            return None
+        model = field_info.annotation
+    return ".".join(parts)
+
+def section_scope(section: str) -> Tuple[str, Optional[str]]:
+    """
+    Statement scope and field group implied by the section holding a leaf.
+    
+    Args:
+        section: Dotted path of the section (e.g. "statementOfFinancialPosition.nonCurrentAssets")
+    
+    Returns:
+        Tuple of (statement scope for lookup_term, prefix that "statement_type.field" must
+        start with, or None when the section doesn't constrain the field)
+    """
+    group = section_field_prefix(section)
+    if group:
+        return "position", group
+    root = section.split(".", 1)[0]
+    if root == "incomeStatement":
+        return "income", "income_statement."
+    if root == "statementOfFinancialPosition":
+        return "position", "financial_position."
+    return "all", None
+
+def lookup_leaf(deps: FinancialTermDeps, key: str, section: str) -> Dict[str, Any]:
+    """
+    Match a numeric leaf the way the router scores it.
+    
+    The label is looked up within the statement scope of its section; the full path is
+    tried when the label is unknown. The calibrator is fitted on the same lookups.
+    
+    Args:
+        deps: Financial term dependencies
+        key: Label of the leaf
+        section: Dotted path of the section holding the leaf
+    
+    Returns:
+        lookup_term result
+    """
+    scope, _ = section_scope(section)
+    term_info = lookup_term(deps, str(key), scope, section=section)
+    if term_info["statement_type"] == "unknown":
+        path = f"{section}.{key}" if section else str(key)
+        term_info = lookup_term(deps, path.replace(".", "_"), scope, section=section)
+    return term_info
+
+def partition_by_confidence(data: Dict[str, Any], deps: FinancialTermDeps,
+                            sample_rate: float = CALIBRATION_SAMPLE_RATE) -> Tuple[Dict[str, float], Dict[str, Any]]:
+    """
+    Split a raw document into leaves mapped locally and leaves left to the agent.
+    
+    A numeric leaf is mapped locally when its label (or, failing that, its path) matches a
+    schema field with a calibrated confidence (or label classifier probability) of at least
+    deps.confidence_threshold, the field belongs to the statement and balance sheet group of
+    the leaf's section, and no other leaf maps to the same field. Everything else (text,
+    lists, low-confidence, out-of-section and conflicting leaves) stays in the document sent
+    to the agent. A random sample of the confident leaves is sent to the agent as well, so
+    the decision log the calibrator is fitted on covers the matches the threshold accepts.
+    
+    Args:
+        data: Raw financial document
+        deps: Financial term dependencies with the calibrator and threshold
+        sample_rate: Share of the confident leaves sent to the agent anyway
+    
+    Returns:
+        Tuple of (dotted PartialXBRL path -> value, remaining document)
+    """
+    # First pass: confident candidates per schema path
+    candidates: Dict[str, list] = {}
+    stack = [(data, "")]
+    while stack:
+        container, parent_path = stack.pop()
+        for key, value in container.items():
+            path = f"{parent_path}.{key}" if parent_path else str(key)
+            if isinstance(value, dict):
+                stack.append((value, path))
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                _, group = section_scope(parent_path)
+                term_info = lookup_leaf(deps, key, parent_path)
+                if term_info["confidence"] < deps.confidence_threshold:
+                    continue
+                # A trade receivable under non-current assets is not the current field
+                if group and not f"{term_info['statement_type']}.{term_info['field']}".startswith(group):
+                    continue
+                target = model_path(term_info["statement_type"], term_info["field"])
+                if target:
+                    # Sampled leaves still claim their field, so no other leaf takes it locally
+                    sampled = random.random() < sample_rate
+                    candidates.setdefault(target, []).append((path, float(value), sampled))
+    
+    # Fields claimed by more than one leaf are ambiguous and stay with the agent
+    resolved = {}
+    resolved_paths = set()
+    for target, leaves in candidates.items():
+        if len(leaves) == 1 and not leaves[0][2]:
+            path, value, _ = leaves[0]
+            resolved[target] = value
+            resolved_paths.add(path)
+    
+    return resolved, _without_paths(data, resolved_paths, "")
+
+def _without_paths(data: Dict[str, Any], paths: set, parent_path: str) -> Dict[str, Any]:
+    """Copy of a document without the given leaf paths, dropping emptied sections"""
+    remaining = {}
+    for key, value in data.items():
+        path = f"{parent_path}.{key}" if parent_path else str(key)
+        if path in paths:
+            continue
+        if isinstance(value, dict) and value:
+            value = _without_paths(value, paths, path)
+            if not value:
+                continue
+        remaining[key] = value
+    return remaining
+
+def without_local_fields(mapped_data: Dict[str, Any], resolved: Dict[str, float]) -> Dict[str, Any]:
+    """
+    Copy of the agent's PartialXBRL output without the locally mapped fields.
+    
+    Decisions are learned from this copy and the document sent to the agent, so the
+    router's own matches are never recorded as accepted decisions.
+    
+    Args:
+        mapped_data: PartialXBRL as a dictionary
+        resolved: Dotted PartialXBRL path -> value from partition_by_confidence
+    
+    Returns:
+        The mapped data without the resolved paths
+    """
+    return _without_paths(mapped_data, set(resolved), "")
+
+def apply_local_fields(mapped_data: Dict[str, Any], resolved: Dict[str, float]) -> Dict[str, Any]:
+    """
+    Write locally mapped values into the agent's PartialXBRL output.
+    
+    Args:
+        mapped_data: PartialXBRL as a dictionary (model_dump output), updated in place
+        resolved: Dotted PartialXBRL path -> value from partition_by_confidence
+    
+    Returns:
+        The updated mapped data
+    """
+    for path, value in resolved.items():
+        *sections, name = path.split(".")
+        target = mapped_data
+        for section in sections:
+            if not isinstance(target.get(section), dict):
+                target[section] = {}
+            target = target[section]
+        target[name] = value
+    return mapped_data
@@ -0,0 +1,235 @@
+"""
+Streaming extraction and categorization of very large raw statement documents.
+"""
+from typing import Any, Dict, List, Optional
+import pandas as pd
+
+try:
+    import ijson
+except ImportError:  # Optional: only needed by the streaming endpoint
+    ijson = None
+
+from .dependencies import FinancialTermDeps
+from .normalize import ROUNDING_KEYS, ROUNDING_MULTIPLIERS, TEXT_KEYS, TEXT_KEY_PATTERN, detect_rounding_level, parse_amounts
+from .tools import gate_match, lookup_term
+
+# Containers down to this depth (1 = top-level sections) are emitted as their own section
+SECTION_DEPTH = 2
+
+# A section with more buffered leaves than this is emitted early, in parts
+MAX_SECTION_LEAVES = 5000
+
+# Leaves held back while the rounding level is not known yet; past this, sections are
+# emitted in units
+MAX_HELD_LEAVES = 50000
+
+# Section declaring the rounding level; once it closed, the level can no longer change
+FILING_INFORMATION_KEY = "filinginformation"
+
+_SCALAR_EVENTS = ("number", "string", "boolean", "null")
+
+class StreamingCategorizer:
+    """
+    Incremental counterpart of extract_and_categorize_financial_data over JSON parse events.
+    
+    Raw bytes are fed as they arrive; leaves are buffered per section and categorized when
+    their section closes (or the buffer fills), so memory stays bounded by the nesting depth
+    and MAX_SECTION_LEAVES rather than by the document size.
+    
+    Amounts with a unit suffix are scaled to the declared rounding level. Until the level is
+    found, or the filing information section has closed without one, completed sections are
+    held back (at most max_held_leaves leaves). Sections emitted before a level declared
+    later in the document are in units; every line reports the level it was parsed with.
+    """
+    
+    def __init__(self, deps: FinancialTermDeps, section_depth: int = SECTION_DEPTH,
+                 max_section_leaves: int = MAX_SECTION_LEAVES, max_held_leaves: int = MAX_HELD_LEAVES):
+        """
+        Start a new document.
+        
+        Args:
+            deps: Financial term dependencies to categorize with
+            section_depth: Deepest containers emitted as their own section
+            max_section_leaves: Buffered leaves that force a section to be emitted in parts
+            max_held_leaves: Leaves of completed sections held back while the rounding level
+                is unknown
+        """
+        if ijson is None:
+            raise RuntimeError("Streaming extraction requires the 'ijson' package")
+        self.deps = deps
+        self.section_depth = section_depth
+        self.max_section_leaves = max_section_leaves
+        self.max_held_leaves = max_held_leaves
+        self._events = ijson.sendable_list()
+        self._parser = ijson.parse_coro(self._events, use_float=True)
+        
+        # Open containers: [is_list, key of the container, next list index, path]
+        self._containers: List[list] = []
+        self._key: Optional[str] = None
+        # Open sections: [path, buffered (key, path, value) leaves, parts emitted so far]
+        self._sections: List[list] = []
+        self._rounding_level: Optional[str] = None
+        self._filing_closed = False
+        # Completed sections waiting for the rounding level: (path, leaves, part, final)
+        self._held: List[tuple] = []
+        self._held_leaves = 0
+        self.leaf_count = 0
+        self.sections_emitted = 0
+    
+    def feed(self, chunk: bytes) -> List[Dict[str, Any]]:
+        """
+        Parse the next chunk of the document.
+        
+        Args:
+            chunk: Raw bytes, split anywhere
+        
+        Returns:
+            Categorizations of the sections completed by this chunk
+        """
+        # An empty chunk would end the parser; the document only ends in close()
+        if chunk:
+            self._parser.send(chunk)
+        return self._drain()
+    
+    def close(self) -> List[Dict[str, Any]]:
+        """
+        Finish the document.
+        
+        Returns:
+            Categorizations of the remaining sections
+        
+        Raises:
+            ijson.JSONError: If the document is incomplete or invalid
+        """
+        self._parser.close()
+        output = self._drain()
+        while self._sections:
+            output.extend(self._flush(self._sections.pop(), final=True))
+        return output + self._release()
+    
+    def summary(self) -> Dict[str, Any]:
+        """Totals of the document processed so far"""
+        return {
+            "leaf_count": self.leaf_count,
+            "sections": self.sections_emitted,
+            "rounding_level": self._rounding_level
+        }
+    
+    def _drain(self) -> List[Dict[str, Any]]:
+        """Handle the parse events produced so far"""
+        output = []
+        for _, event, value in self._events:
+            if event == "map_key":
+                self._key = value
+            elif event in ("start_map", "start_array"):
+                path = self._child_path()
+                key = self._child_key()
+                self._containers.append([event == "start_array", key, 0, path])
+                if len(self._containers) - 1 <= self.section_depth:
+                    self._sections.append([path, [], 0])
+            elif event in ("end_map", "end_array"):
+                depth = len(self._containers) - 1
+                container = self._containers.pop()
+                if str(container[1]).lower() == FILING_INFORMATION_KEY:
+                    self._filing_closed = True
+                if depth <= self.section_depth:
+                    output.extend(self._flush(self._sections.pop(), final=True))
+                if self._filing_closed and self._held:
+                    output.extend(self._release())
+            elif event in _SCALAR_EVENTS:
+                self._leaf(self._child_key(), self._child_path(), value, output)
+        del self._events[:]
+        return output
+    
+    def _child_key(self) -> str:
+        """Key of the next child of the innermost container (list items use the list's key)"""
+        if not self._containers:
+            return ""
+        container = self._containers[-1]
+        return container[1] if container[0] else str(self._key)
+    
+    def _child_path(self) -> str:
+        """Dotted path of the next child of the innermost container"""
+        if not self._containers:
+            return ""
+        container = self._containers[-1]
+        if container[0]:
+            container[2] += 1
+            return f"{container[3]}[{container[2] - 1}]"
+        return f"{container[3]}.{self._key}" if container[3] else str(self._key)
+    
+    def _leaf(self, key: str, path: str, value: Any, output: List[Dict[str, Any]]) -> None:
+        """Buffer a scalar leaf in its innermost open section"""
+        if not self._sections:
+            # A bare scalar document has nothing to categorize
+            return
+        self.leaf_count += 1
+        if self._rounding_level is None and isinstance(value, str) and key.lower() in ROUNDING_KEYS:
+            self._rounding_level = detect_rounding_level([key], [value])
+            if self._rounding_level is not None:
+                output.extend(self._release())
+        
+        section = self._sections[-1]
+        section[1].append((key, path, value))
+        if len(section[1]) >= self.max_section_leaves:
+            output.extend(self._flush(section, final=False))
+    
+    def _flush(self, section: list, final: bool) -> List[Dict[str, Any]]:
+        """Emit the buffered leaves of a section, or hold them until the rounding level is known"""
+        path, leaves, part = section
+        if not leaves:
+            return []
+        section[1] = []
+        section[2] += 1
+        self._held.append((path, leaves, part + 1, final))
+        self._held_leaves += len(leaves)
+        
+        settled = self._rounding_level is not None or self._filing_closed
+        if settled or self._held_leaves > self.max_held_leaves:
+            return self._release()
+        return []
+    
+    def _release(self) -> List[Dict[str, Any]]:
+        """Categorize the held sections with the rounding level known so far"""
+        output = [self._categorize(*held) for held in self._held]
+        self._held = []
+        self._held_leaves = 0
+        return output
+    
+    def _categorize(self, path: str, leaves: List[tuple], part: int, final: bool) -> Dict[str, Any]:
+        """Categorize the leaves of one section part"""
+        self.sections_emitted += 1
+        
+        # Parse formatted amounts of the whole buffer at once
+        values = pd.Series([value for _, _, value in leaves], dtype=object)
+        parsed = parse_amounts(values, ROUNDING_MULTIPLIERS.get(self._rounding_level, 1.0))
+        amounts = parsed["value"].to_numpy()
+        is_number = values.map(lambda v: isinstance(v, (int, float)) and not isinstance(v, bool)).to_numpy(dtype=bool)
+        usable = is_number | parsed["parsed"].to_numpy(dtype=bool)
+        
+        categorized: Dict[str, Dict[str, float]] = {}
+        unknown: Dict[str, float] = {}
+        text_leaves = 0
+        for idx, (key, leaf_path, _) in enumerate(leaves):
+            if not usable[idx] or key.lower() in TEXT_KEYS or TEXT_KEY_PATTERN.search(key):
+                text_leaves += 1
+                continue
+            
+            term_info = gate_match(self.deps, lookup_term(self.deps, key, section=path))
+            if term_info["statement_type"] == "unknown":
+                term_info = gate_match(self.deps, lookup_term(self.deps, leaf_path.replace(".", "_"), section=path))
+            if term_info["statement_type"] == "unknown":
+                unknown[leaf_path] = float(amounts[idx])
+            else:
+                categorized.setdefault(term_info["statement_type"], {})[term_info["field"]] = float(amounts[idx])
+        
+        return {
+            "section": path,
+            "part": part,
+            "final": final,
+            "categorized": categorized,
+            "unknown": unknown,
+            "leaf_count": len(leaves),
+            "text_leaf_count": text_leaves,
+            "rounding_level": self._rounding_level
+        }
@@ -0,0 +1,326 @@
+"""
+Persistent store of label-to-field decisions learned from completed mapping runs.
+"""
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import contextlib
+import json
+import os
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves are only serialized within one process
+    fcntl = None
+
+# Default location of the store, next to the mapping package
+DEFAULT_SYNONYM_STORE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "learned_synonyms.json")
+
+# A learned label is merged into the term dictionaries once it was accepted this often...
+MIN_SYNONYM_COUNT = 2
+# ...and this share of its decisions agree on the same field
+MIN_SYNONYM_CONFIDENCE = 0.8
+
+# PartialXBRL sections of the statement of financial position and their term-table prefixes
+POSITION_SECTION_PREFIXES = {
+    "CurrentAssets": "currentAssets",
+    "NonCurrentAssets": "nonCurrentAssets",
+    "CurrentLiabilities": "currentLiabilities",
+    "NonCurrentLiabilities": "nonCurrentLiabilities",
+    "Equity": "equity"
+}
+
+def _numeric(value: Any) -> bool:
+    """Whether a value is a usable, non-zero number (zeros can't be told apart)"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value != 0
+
+def iter_mapped_fields(mapped_data: Dict[str, Any]) -> Iterator[Tuple[str, str, float]]:
+    """
+    Yield the numeric fields of a mapped PartialXBRL dictionary in term-table form.
+    
+    Args:
+        mapped_data: PartialXBRL as a dictionary (model_dump output)
+    
+    Yields:
+        Tuples of (statement type, term-table field name, value)
+    """
+    position = mapped_data.get("StatementOfFinancialPosition") or {}
+    for key, value in position.items():
+        if isinstance(value, dict) and key in POSITION_SECTION_PREFIXES:
+            for field_name, field_value in value.items():
+                if _numeric(field_value):
+                    yield "financial_position", f"{POSITION_SECTION_PREFIXES[key]}.{field_name}", field_value
+        elif _numeric(value):
+            yield "financial_position", key, value
+    
+    income = mapped_data.get("IncomeStatement") or {}
+    for field_name, field_value in income.items():
+        if _numeric(field_value):
+            yield "income_statement", field_name, field_value
+
+def iter_raw_leaves(raw_data: Dict[str, Any]) -> Iterator[Tuple[str, str, Any]]:
+    """
+    Yield every leaf of a raw document with its section, in document order.
+    
+    Args:
+        raw_data: Raw financial statement data as received
+    
+    Yields:
+        Tuples of (dotted section path, leaf key, leaf value); list items report the key of their list
+    """
+    stack = [("", iter(raw_data.items()))]
+    while stack:
+        section, entries = stack[-1]
+        entry = next(entries, None)
+        if entry is None:
+            stack.pop()
+            continue
+        
+        key, value = entry
+        if isinstance(value, dict):
+            stack.append((f"{section}.{key}" if section else str(key), iter(value.items())))
+        elif isinstance(value, list):
+            stack.append((section, ((key, item) for item in value)))
+        else:
+            yield section, str(key), value
+
+def align_decisions(raw_data: Dict[str, Any], mapped_data: Dict[str, Any]) -> List[Tuple[str, str, str, str]]:
+    """
+    Recover the label -> field decisions of a completed mapping run.
+    
+    Raw leaves are aligned with mapped fields by value: a decision is only reported when a
+    non-zero value occurs exactly once among the raw leaves and exactly once among the
+    mapped fields, so the pairing is unambiguous.
+    
+    Args:
+        raw_data: Raw financial statement data sent for mapping
+        mapped_data: The accepted PartialXBRL result as a dictionary
+    
+    Returns:
+        List of (label, section, statement_type, field) decisions
+    """
+    mapped_by_value: Dict[float, List[Tuple[str, str]]] = {}
+    for statement_type, field, value in iter_mapped_fields(mapped_data):
+        mapped_by_value.setdefault(float(value), []).append((statement_type, field))
+    
+    raw_by_value: Dict[float, List[Tuple[str, str]]] = {}
+    for section, label, value in iter_raw_leaves(raw_data):
+        if _numeric(value):
+            raw_by_value.setdefault(float(value), []).append((label, section))
+    
+    decisions = []
+    for value, leaves in raw_by_value.items():
+        targets = mapped_by_value.get(value, [])
+        if len(leaves) == 1 and len(targets) == 1:
+            decisions.append(leaves[0] + targets[0])
+    return decisions
+
+def _merge_counts(base: Dict[str, Dict[str, int]], added: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, int]]:
+    """Copy of per-label decision counts with other counts added"""
+    merged = {label: dict(decisions) for label, decisions in base.items()}
+    for label, decisions in added.items():
+        counts = merged.setdefault(label, {})
+        for decision, count in decisions.items():
+            counts[decision] = counts.get(decision, 0) + count
+    return merged
+
+class SynonymStore:
+    """
+    Label -> field decisions accepted in completed mapping runs, persisted as JSON.
+    
+    Labels are stored lowercased and stripped, with a count per "statement_type.field"
+    decision, so frequency and confidence can be derived for every label.
+    
+    Several workers may share one file: each save takes a lock file, re-reads the store and
+    adds only the decisions recorded since the last save, so no worker overwrites another's.
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        """
+        Open a store, loading existing decisions if the file exists.
+        
+        Args:
+            path: JSON file backing the store (None keeps it in memory only)
+        """
+        self.path = path
+        self.labels: Dict[str, Dict[str, int]] = {}
+        # Decisions recorded since the last save, added to the file on the next one
+        self._pending: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        
+        if path:
+            self.labels = self._read()
+    
+    def record(self, label: str, statement_type: str, field: str, count: int = 1) -> None:
+        """
+        Record an accepted decision.
+        
+        Args:
+            label: Raw label as it appeared in the input
+            statement_type: "income_statement" or "financial_position"
+            field: Term-table field name (e.g. "currentAssets.CashAndBankBalances")
+            count: Number of times the decision was accepted
+        """
+        label = label.lower().strip()
+        if not label:
+            return
+        decision = f"{statement_type}.{field}"
+        with self._lock:
+            for labels in (self.labels, self._pending):
+                decisions = labels.setdefault(label, {})
+                decisions[decision] = decisions.get(decision, 0) + count
+    
+    def record_decisions(self, decisions: List[Tuple[str, str, str, str]]) -> int:
+        """
+        Record the decisions of a completed mapping run.
+        
+        Args:
+            decisions: (label, section, statement_type, field) tuples from align_decisions
+        
+        Returns:
+            Number of decisions recorded
+        """
+        for label, _, statement_type, field in decisions:
+            self.record(label, statement_type, field)
+        return len(decisions)
+    
+    def record_mappings(self, raw_data: Dict[str, Any], mapped_data: Dict[str, Any]) -> int:
+        """
+        Learn label -> field decisions from a completed mapping run (see align_decisions).
+        
+        Args:
+            raw_data: Raw financial statement data sent for mapping
+            mapped_data: The accepted PartialXBRL result as a dictionary
+        
+        Returns:
+            Number of decisions recorded
+        """
+        return self.record_decisions(align_decisions(raw_data, mapped_data))
+    
+    def examples(self) -> Iterator[Tuple[str, str, str, int]]:
+        """
+        Yield every recorded decision as a labelled example.
+        
+        Yields:
+            Tuples of (label, statement_type, field, count)
+        """
+        with self._lock:
+            snapshot = {label: dict(decisions) for label, decisions in self.labels.items()}
+        
+        for label, decisions in snapshot.items():
+            for decision, count in decisions.items():
+                statement_type, field = decision.split(".", 1)
+                yield label, statement_type, field, count
+    
+    def accepted(self, min_count: int = MIN_SYNONYM_COUNT,
+                 min_confidence: float = MIN_SYNONYM_CONFIDENCE) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the learned labels that are frequent and consistent enough to trust.
+        
+        Args:
+            min_count: Minimum number of times the winning decision was accepted
+            min_confidence: Minimum share of the label's decisions agreeing on that field
+        
+        Yields:
+            Dictionaries with label, statement_type, field, count and confidence
+        """
+        with self._lock:
+            snapshot = {label: dict(decisions) for label, decisions in self.labels.items()}
+        
+        for label, decisions in snapshot.items():
+            decision, count = max(decisions.items(), key=lambda item: item[1])
+            confidence = count / sum(decisions.values())
+            if count >= min_count and confidence >= min_confidence:
+                statement_type, field = decision.split(".", 1)
+                yield {
+                    "label": label,
+                    "statement_type": statement_type,
+                    "field": field,
+                    "count": count,
+                    "confidence": confidence
+                }
+    
+    def merge_into(self, deps, min_count: int = MIN_SYNONYM_COUNT,
+                   min_confidence: float = MIN_SYNONYM_CONFIDENCE) -> int:
+        """
+        Add the accepted labels to a FinancialTermDeps instance as keywords.
+        
+        Args:
+            deps: FinancialTermDeps to extend (recompiled once at the end)
+            min_count: Minimum number of times the winning decision was accepted
+            min_confidence: Minimum share of the label's decisions agreeing on that field
+        
+        Returns:
+            Number of labels merged
+        """
+        merged = 0
+        for synonym in self.accepted(min_count, min_confidence):
+            if synonym["statement_type"] == "income_statement":
+                table = deps.income_statement_terms
+            else:
+                table = deps.financial_position_terms
+            
+            keywords = table.setdefault(synonym["field"], [])
+            if synonym["label"] not in keywords:
+                keywords.append(synonym["label"])
+            deps.learned_terms[synonym["label"]] = synonym
+            merged += 1
+        
+        if merged:
+            deps.refresh()
+        return merged
+    
+    def _read(self) -> Dict[str, Dict[str, int]]:
+        """Decisions currently in the store's file"""
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f).get("labels", {})
+    
+    @contextlib.contextmanager
+    def _file_lock(self):
+        """Hold an exclusive lock on the store's lock file, shared by all workers"""
+        with open(self.path + ".lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def save(self) -> None:
+        """
+        Add the decisions recorded since the last save to the file, atomically.
+        
+        The file is re-read under the lock file first, so decisions saved by other workers
+        are kept, and are picked up by this store too.
+        """
+        if not self.path:
+            return
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        
+        try:
+            with self._file_lock():
+                labels = _merge_counts(self._read(), pending)
+                payload = json.dumps({"labels": labels}, indent=2, sort_keys=True)
+                
+                directory = os.path.dirname(os.path.abspath(self.path))
+                fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "w", encoding="utf-8") as f:
+                        f.write(payload)
+                    os.replace(tmp_path, self.path)
+                except Exception:
+                    os.unlink(tmp_path)
+                    raise
+        except Exception:
+            # Keep the decisions for the next save
+            with self._lock:
+                self._pending = _merge_counts(pending, self._pending)
+            raise
+        
+        with self._lock:
+            # The file's decisions plus the ones recorded while saving
+            self.labels = _merge_counts(labels, self._pending)
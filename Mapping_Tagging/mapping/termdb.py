@@ -0,0 +1,325 @@
+"""
+Compiled, memory-mapped term dictionary format.
+
+The keyword tables and the Aho-Corasick automaton built from them are written once to a
+binary file. Loading maps the file read-only and reads only the fixed-size header, so it
+takes constant time whatever the dictionary size. Every worker process maps the same
+pages instead of holding its own copy of the tables.
+
+Usage:
+    python -m mapping.termdb build --output term_dictionary.ftdb
+    python -m mapping.termdb build --source industry_terms.json --with-synonyms
+    python -m mapping.termdb info term_dictionary.ftdb
+"""
+from bisect import bisect_left
+from collections.abc import Sequence
+from typing import Dict, List, Optional, Tuple
+import argparse
+import array
+import json
+import mmap
+import os
+import struct
+import sys
+
+from .matcher import TermMatcher
+
+# Default location of the compiled dictionary
+DEFAULT_TERM_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "term_dictionary.ftdb")
+
+MAGIC = b"FTDB"
+FORMAT_VERSION = 1
+
+# Arrays stored in the file, in order; all are unsigned 32-bit except the string blobs
+SECTIONS = (
+    "keyword_blob", "keyword_offsets",     # UTF-8 keywords and their (n+1) offsets
+    "field_blob", "field_offsets",         # UTF-8 field names and their (n+1) offsets
+    "kf_start", "kf_field", "kf_count",    # CSR: fields (and counts) using each keyword
+    "ft_start", "ft_keyword",              # CSR: keyword ids listed by each field, in order
+    "state_start", "edge_char", "edge_target",  # CSR: goto edges per state, sorted by char
+    "fail",                                # failure link per state
+    "out_start", "out_keyword"             # CSR: keywords output by each state
+)
+BLOB_SECTIONS = ("keyword_blob", "field_blob")
+
+# magic, format version, income field count, dictionary version, then (offset, length) per section
+_HEADER = struct.Struct("<4sII16s")
+_SECTION_ENTRY = struct.Struct("<QQ")
+_ALIGNMENT = 8
+
+def _u32(values) -> bytes:
+    """Little-endian unsigned 32-bit encoding of a sequence of integers"""
+    data = array.array("I", values)
+    if sys.byteorder != "little":
+        data.byteswap()
+    return data.tobytes()
+
+def _csr(rows: List[List[int]]) -> Tuple[List[int], List[int]]:
+    """Row starts and flattened values of a list of lists"""
+    starts, values = [0], []
+    for row in rows:
+        values.extend(row)
+        starts.append(len(values))
+    return starts, values
+
+def compile_term_dictionary(income_terms: Dict[str, List[str]], position_terms: Dict[str, List[str]],
+                            version: str) -> bytes:
+    """
+    Compile keyword tables into the binary dictionary format.
+    
+    Args:
+        income_terms: Lowercased keywords per income statement field
+        position_terms: Lowercased keywords per financial position field
+        version: Dictionary version (FinancialTermDeps.version) stored in the header
+    
+    Returns:
+        File contents
+    """
+    matcher = TermMatcher(income_terms, position_terms)
+    
+    def string_table(strings):
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = [0]
+        for item in encoded:
+            offsets.append(offsets[-1] + len(item))
+        return b"".join(encoded), _u32(offsets)
+    
+    keyword_blob, keyword_offsets = string_table(matcher.keywords)
+    field_blob, field_offsets = string_table([name for _, name in matcher.fields])
+    
+    kf_rows = [sorted(counts.items()) for counts in matcher.keyword_fields]
+    kf_start, kf_field = _csr([[idx for idx, _ in row] for row in kf_rows])
+    _, kf_count = _csr([[count for _, count in row] for row in kf_rows])
+    
+    all_terms = list(income_terms.values()) + list(position_terms.values())
+    ft_start, ft_keyword = _csr([[matcher.keyword_ids[k] for k in keywords if k] for keywords in all_terms])
+    
+    edges = [sorted((ord(char), target) for char, target in transitions.items()) for transitions in matcher.goto]
+    state_start, edge_char = _csr([[char for char, _ in row] for row in edges])
+    _, edge_target = _csr([[target for _, target in row] for row in edges])
+    out_start, out_keyword = _csr(matcher.outputs)
+    
+    payloads = {
+        "keyword_blob": keyword_blob, "keyword_offsets": keyword_offsets,
+        "field_blob": field_blob, "field_offsets": field_offsets,
+        "kf_start": _u32(kf_start), "kf_field": _u32(kf_field), "kf_count": _u32(kf_count),
+        "ft_start": _u32(ft_start), "ft_keyword": _u32(ft_keyword),
+        "state_start": _u32(state_start), "edge_char": _u32(edge_char), "edge_target": _u32(edge_target),
+        "fail": _u32(matcher.fail),
+        "out_start": _u32(out_start), "out_keyword": _u32(out_keyword)
+    }
+    
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, matcher.income_field_count, version.encode("ascii")[:16].ljust(16, b"\0"))
+    offset = len(header) + _SECTION_ENTRY.size * len(SECTIONS)
+    entries, chunks = [], []
+    for name in SECTIONS:
+        padding = -offset % _ALIGNMENT
+        chunks.append(b"\0" * padding)
+        offset += padding
+        entries.append(_SECTION_ENTRY.pack(offset, len(payloads[name])))
+        chunks.append(payloads[name])
+        offset += len(payloads[name])
+    return header + b"".join(entries) + b"".join(chunks)
+
+def write_term_dictionary(path: str, income_terms: Dict[str, List[str]], position_terms: Dict[str, List[str]],
+                          version: str) -> int:
+    """
+    Compile keyword tables and write them atomically to a file.
+    
+    Returns:
+        Size of the written file in bytes
+    """
+    data = compile_term_dictionary(income_terms, position_terms, version)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(data)
+
+class _StringTable(Sequence):
+    """Read-only sequence of strings decoded on access from a blob and its offsets"""
+    
+    def __init__(self, blob: memoryview, offsets: memoryview):
+        self.blob = blob
+        self.offsets = offsets
+    
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+    
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(idx)
+        return str(self.blob[self.offsets[idx]:self.offsets[idx + 1]], "utf-8")
+
+class _KeywordFields(Sequence):
+    """Read-only sequence of {field index: count} dictionaries, one per keyword"""
+    
+    def __init__(self, starts: memoryview, fields: memoryview, counts: memoryview):
+        self.starts = starts
+        self.fields = fields
+        self.counts = counts
+    
+    def __len__(self) -> int:
+        return len(self.starts) - 1
+    
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        start, end = self.starts[idx], self.starts[idx + 1]
+        return dict(zip(self.fields[start:end], self.counts[start:end]))
+
+class _FieldTable(Sequence):
+    """Read-only sequence of (statement prefix, field name), income fields first"""
+    
+    def __init__(self, names: _StringTable, income_field_count: int):
+        self.names = names
+        self.income_field_count = income_field_count
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        return ("income" if idx < self.income_field_count else "position", self.names[idx])
+
+class CompiledTermMatcher(TermMatcher):
+    """
+    TermMatcher backed by a memory-mapped compiled dictionary.
+    
+    Scoring and tie-breaking are inherited from TermMatcher; only the keyword search walks
+    the mapped automaton (binary search over each state's sorted edges) instead of dictionaries.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Map a compiled dictionary file read-only.
+        
+        Args:
+            path: File written by write_term_dictionary
+        """
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        
+        magic, format_version, income_field_count, version = _HEADER.unpack_from(view, 0)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a compiled term dictionary (format {FORMAT_VERSION})")
+        if sys.byteorder != "little":
+            raise ValueError("Compiled term dictionaries can only be mapped on little-endian hosts")
+        self.path = path
+        self.version = version.rstrip(b"\0").decode("ascii")
+        self.income_field_count = income_field_count
+        
+        sections = {}
+        for i, name in enumerate(SECTIONS):
+            offset, length = _SECTION_ENTRY.unpack_from(view, _HEADER.size + i * _SECTION_ENTRY.size)
+            section = view[offset:offset + length]
+            sections[name] = section if name in BLOB_SECTIONS else section.cast("I")
+        
+        self.keywords = _StringTable(sections["keyword_blob"], sections["keyword_offsets"])
+        self.fields = _FieldTable(_StringTable(sections["field_blob"], sections["field_offsets"]), income_field_count)
+        self.keyword_fields = _KeywordFields(sections["kf_start"], sections["kf_field"], sections["kf_count"])
+        self._field_terms = (sections["ft_start"], sections["ft_keyword"])
+        self._state_start = sections["state_start"]
+        self._edge_char = sections["edge_char"]
+        self._edge_target = sections["edge_target"]
+        self._fail = sections["fail"]
+        self._out_start = sections["out_start"]
+        self._out_keyword = sections["out_keyword"]
+    
+    def find_keywords(self, term: str) -> set:
+        """
+        Find every keyword contained in a term in one pass over the mapped automaton.
+        
+        Args:
+            term: Lowercased, stripped term
+        
+        Returns:
+            Set of matching keyword ids
+        """
+        found = set()
+        state_start, edge_char, edge_target = self._state_start, self._edge_char, self._edge_target
+        fail, out_start, out_keyword = self._fail, self._out_start, self._out_keyword
+        state = 0
+        for char in term:
+            code = ord(char)
+            while True:
+                lo, hi = state_start[state], state_start[state + 1]
+                idx = bisect_left(edge_char, code, lo, hi)
+                if idx < hi and edge_char[idx] == code:
+                    state = edge_target[idx]
+                    break
+                if state == 0:
+                    break
+                state = fail[state]
+            start, end = out_start[state], out_start[state + 1]
+            if start != end:
+                found.update(out_keyword[start:end])
+        return found
+    
+    def term_tables(self) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+        """
+        Decode the keyword tables the dictionary was compiled from.
+        
+        Returns:
+            Tuple of (income statement terms, financial position terms)
+        """
+        starts, keyword_ids = self._field_terms
+        tables = ({}, {})
+        for field_idx in range(len(self.fields)):
+            prefix, name = self.fields[field_idx]
+            keywords = [self.keywords[k] for k in keyword_ids[starts[field_idx]:starts[field_idx + 1]]]
+            tables[prefix == "position"][name] = keywords
+        return tables
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: compile the source tables, or describe a compiled file"""
+    parser = argparse.ArgumentParser(description="Build and inspect compiled term dictionaries")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    build_parser = subparsers.add_parser("build", help="Compile the keyword tables")
+    build_parser.add_argument("--output", default=DEFAULT_TERM_DB_PATH, help="Compiled dictionary file")
+    build_parser.add_argument("--source", help="JSON file with income_statement_terms and financial_position_terms "
+                                               "(defaults to the tables in mapping/dependencies.py)")
+    build_parser.add_argument("--with-synonyms", action="store_true", help="Include the accepted learned synonyms")
+    
+    info_parser = subparsers.add_parser("info", help="Describe a compiled dictionary")
+    info_parser.add_argument("path", nargs="?", default=DEFAULT_TERM_DB_PATH)
+    
+    args = parser.parse_args(argv)
+    
+    if args.command == "info":
+        matcher = CompiledTermMatcher(args.path)
+        print(json.dumps({
+            "path": args.path,
+            "version": matcher.version,
+            "fields": len(matcher.fields),
+            "keywords": len(matcher.keywords),
+            "states": len(matcher._state_start) - 1,
+            "bytes": os.path.getsize(args.path)
+        }, indent=2))
+        return 0
+    
+    from .dependencies import FinancialTermDeps, income_terms, position_terms, synonym_store
+    if args.source:
+        with open(args.source, "r", encoding="utf-8") as f:
+            source = json.load(f)
+        deps = FinancialTermDeps(source["income_statement_terms"], source["financial_position_terms"])
+    else:
+        deps = FinancialTermDeps(income_terms, position_terms)
+    if args.with_synonyms:
+        synonym_store.merge_into(deps)
+    
+    size = write_term_dictionary(args.output, deps.income_statement_terms, deps.financial_position_terms, deps.version)
+    print(json.dumps({"path": args.output, "version": deps.version, "bytes": size}, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,23 @@
 """
 Tools for the financial statement mapping agent.
 """
-from typing import Dict, Any, List, Union
+from typing import Dict, Any, List, Optional, Tuple, Union
+import os
 from pydantic import BaseModel, Field
 from pydantic_ai import RunContext
 
+from .cache import TermMatchCache
+from .classifier import CLASSIFIER_MIN_PROBABILITY
 from .dependencies import FinancialTermDeps
+from .fuzzy import fuzzy_score
+
+# Memo of term matches, shared by all runs; entries are keyed by dictionary version
+TERM_MATCH_CACHE_SIZE = int(os.environ.get("TERM_MATCH_CACHE_SIZE", "10000"))
+_term_match_cache = TermMatchCache(maxsize=TERM_MATCH_CACHE_SIZE)
+
+# Keys holding data that is already in statement form
+STATEMENT_FORM_KEYS = ("incomeStatement", "statementOfFinancialPosition")
+STATEMENT_OF_FINANCIAL_POSITION_SECTIONS = ("currentAssets", "nonCurrentAssets", "currentLiabilities", "nonCurrentLiabilities", "equity")
 
 class MatchTermContext(BaseModel):
     """Context for the term matching tool"""
@@ -35,106 +47,205 @@ def match_financial_term(context: RunContext[FinancialTermDeps], term: str, stat
         statement_type: Type of statement to match against ("income", "position", "all")
         
     Returns:
-        Dictionary with matching field name, statement type, and confidence level
+        Dictionary with matching field name, statement type, match score and calibrated confidence
+    """
+    return lookup_term(context.deps, term, statement_type)
+
+def lookup_term(deps: FinancialTermDeps, term: str, statement_type: str = "all", section: str = "") -> Dict[str, Any]:
+    """
+    Match a financial term against the dependencies directly, outside of an agent run.
+    Terms the dictionaries can't place with confidence are passed to the local label
+    classifier, if one is loaded, before being left to the LLM.
+    
+    Args:
+        deps: Financial term dependencies
+        term: The financial term to match
+        statement_type: Type of statement to match against ("income", "position", "all")
+        section: Dotted path of the section holding the term, used by the classifier
+        
+    Returns:
+        Dictionary with matching field name, statement type, match score, calibrated confidence
+        and which resolver produced the match: "dictionary" (keywords), "fuzzy" (n-gram
+        similarity, with its "similarity"), "classifier" (within the statement scope and
+        section, with no match_score) or "guess" (no field found).
+        Fuzzy matches are never confident on their own; bulk callers pass results through
+        gate_match before filing a value under them
     """
     term_lower = term.lower().strip()
     
-    # Get mappings from dependencies
-    income_mappings = context.deps.income_statement_terms
-    position_mappings = context.deps.financial_position_terms
+    # Ensure statement_type is not None before calling lower()
+    statement_type = (statement_type or "all").lower()
     
-    # Filter mappings based on statement_type - with null safety
-    filtered_mappings = {}
+    # Recurring labels are served from the memo; the dictionary version in the key
+    # makes sure results computed against older term tables are never reused
+    cache_key = (term_lower, statement_type, deps.version)
+    match = _term_match_cache.get(cache_key)
+    if match is None:
+        match = _match_term(deps, term_lower, statement_type)
+        _term_match_cache.put(cache_key, match)
     
-    # Ensure statement_type is not None before calling lower()
-    statement_type = statement_type or "all"
-    
-    if statement_type.lower() in ["all", "income", "profit", "loss"]:
-        for field, keywords in income_mappings.items():
-            filtered_mappings[f"income.{field}"] = keywords
-    
-    if statement_type.lower() in ["all", "position", "balance", "financial_position"]:
-        for field, keywords in position_mappings.items():
-            filtered_mappings[f"position.{field}"] = keywords
-    
-    # If no valid statement type provided, use all mappings
-    if not filtered_mappings:
-        for field, keywords in income_mappings.items():
-            filtered_mappings[f"income.{field}"] = keywords
-        for field, keywords in position_mappings.items():
-            filtered_mappings[f"position.{field}"] = keywords
-    
-    # Find matches
-    matches = {}
-    for full_field, keywords in filtered_mappings.items():
-        score = 0
-        for keyword in keywords:
-            if keyword in term_lower:
-                score += 1
-            # Extra points for exact matches or close matches
-            if keyword == term_lower:
-                score += 5
-            elif keyword in term_lower and len(keyword) > 5:
-                score += 2
-                
-        if score > 0:
-            matches[full_field] = score
+    matched_statement, field_name, score, resolver = match
+    # Fuzzy matches carry their similarity, scored below the keyword matches
+    match_score = fuzzy_score(score) if resolver == "fuzzy" else score
+    result = {
+        "statement_type": matched_statement,
+        # Guessed matches have no standard field, so they report the term as given
+        "field": term if field_name is None else field_name,
+        "match_score": match_score,
+        # Probability that the field is right, calibrated on accepted mappings
+        "confidence": deps.calibrator.confidence(match_score),
+        "matched_term": term,
+        "resolved_by": resolver
+    }
+    if resolver == "fuzzy":
+        result["similarity"] = score
     
-    # If we have matches, return the best one
-    if matches:
-        best_match = max(matches.items(), key=lambda x: x[1])
-        statement_type, field_name = best_match[0].split('.', 1)
+    if result["confidence"] < deps.confidence_threshold and deps.label_classifier is not None:
+        prediction = deps.label_classifier.predict(term, section, statement_type)
+        if prediction is not None and prediction[2] >= CLASSIFIER_MIN_PROBABILITY and prediction[2] > result["confidence"]:
+            predicted_statement, predicted_field, probability = prediction
+            result.update({
+                "statement_type": predicted_statement,
+                "field": predicted_field,
+                # The keyword score belongs to the replaced field
+                "match_score": None,
+                "confidence": probability,
+                "resolved_by": "classifier"
+            })
+            result.pop("similarity", None)
+    return result
+
+def _match_term(deps: FinancialTermDeps, term_lower: str, statement_type: str) -> Tuple[str, Optional[str], float, str]:
+    """
+    Compute a term match without the memo.
+    
+    Args:
+        deps: Financial term dependencies
+        term_lower: Lowercased, stripped term
+        statement_type: Lowercased statement scope
         
-        return {
-            "statement_type": "income_statement" if statement_type == "income" else "financial_position",
-            "field": field_name,
-            "match_score": best_match[1],
-            "matched_term": term
-        }
+    Returns:
+        Tuple of (statement type, field name or None for a guess, match score or fuzzy
+        similarity, resolver)
+    """
+    # Score all keywords in one pass with the matcher compiled from the dependencies
+    best_match = deps.best_match(term_lower, statement_type)
+    
+    # If we have matches, return the best one
+    if best_match:
+        matched_statement, field_name, score = best_match
+        return (
+            "income_statement" if matched_statement == "income" else "financial_position",
+            field_name,
+            score,
+            "dictionary"
+        )
     
+    # Misspelled or reordered keywords: the nearest keyword by n-gram similarity
+    fuzzy_match = deps.fuzzy_match(term_lower, statement_type)
+    if fuzzy_match:
+        matched_statement, field_name, similarity = fuzzy_match
+        return (
+            "income_statement" if matched_statement == "income" else "financial_position",
+            field_name,
+            similarity,
+            "fuzzy"
+        )
+    
+    return _guess(term_lower)
+
+def _guess(term_lower: str) -> Tuple[str, Optional[str], float, str]:
+    """Statement type guessed from common words, for terms no field matched"""
     # No matches found - make a best guess based on the term
     if any(word in term_lower for word in ["revenue", "income", "sale", "expense", "cost", "profit", "loss", "tax"]):
-        return {
-            "statement_type": "income_statement",
-            "field": term,
-            "match_score": 0,
-            "matched_term": term
-        }
+        return ("income_statement", None, 0, "guess")
     elif any(word in term_lower for word in ["asset", "liability", "equity", "cash", "receivable", "payable", "property", "equipment"]):
-        return {
-            "statement_type": "financial_position", 
-            "field": term,
-            "match_score": 0,
-            "matched_term": term
-        }
+        return ("financial_position", None, 0, "guess")
     
     # Truly unknown
+    return ("unknown", "unknown", 0, "guess")
+
+def gate_match(deps: FinancialTermDeps, term_info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    A lookup_term result as bulk callers may file it without review.
+    
+    Fuzzy matches below deps.confidence_threshold are replaced by the guess the term would
+    get without them (a statement type with the term as field, or unknown), with the fuzzy
+    field kept under "suggestion"; every other result is returned unchanged.
+    
+    Args:
+        deps: Financial term dependencies holding the threshold
+        term_info: Result of lookup_term
+    
+    Returns:
+        The result, or its guessed form
+    """
+    if term_info["resolved_by"] != "fuzzy" or term_info["confidence"] >= deps.confidence_threshold:
+        return term_info
+    term = term_info["matched_term"]
+    statement_type, field_name, score, resolver = _guess(term.lower().strip())
     return {
-        "statement_type": "unknown",
-        "field": "unknown",
-        "match_score": 0,
-        "matched_term": term
+        **term_info,
+        "statement_type": statement_type,
+        "field": term if field_name is None else field_name,
+        "match_score": score,
+        "confidence": deps.calibrator.confidence(score),
+        "resolved_by": resolver,
+        "suggestion": {key: term_info[key] for key in ("statement_type", "field", "confidence", "similarity")}
     }
 
+def match_leaf(deps: FinancialTermDeps, key: str, path: str, section: str = "") -> Dict[str, Any]:
+    """
+    Match a numeric leaf of a document, as every bulk tool files it.
+    
+    The label is matched on its own first; the full path is only tried when the label is
+    unknown, as section names like "currentAssets" would otherwise dominate the path.
+    
+    Args:
+        deps: Financial term dependencies
+        key: Label of the leaf
+        path: Path of the leaf as one term (keys joined with "_")
+        section: Dotted path of the section holding the leaf
+    
+    Returns:
+        Gated lookup_term result; a guess keeps the label's fuzzy "suggestion" if the path has none
+    """
+    label_info = gate_match(deps, lookup_term(deps, key, section=section))
+    if label_info["statement_type"] != "unknown" or path == key:
+        return label_info
+    term_info = gate_match(deps, lookup_term(deps, path, section=section))
+    if "suggestion" in label_info and "suggestion" not in term_info:
+        term_info = {**term_info, "suggestion": label_info["suggestion"]}
+    return term_info
+
+def get_term_match_cache_stats() -> Dict[str, Any]:
+    """Hit rate, size and eviction statistics of the term match memo"""
+    return _term_match_cache.stats()
+
 def extract_and_categorize_financial_data(context: RunContext[ExtractContext], data: Union[Dict[str, Any], FinancialData], field_path: str = "") -> Dict[str, Dict[str, float]]:
     """
     Extract and categorize financial values from nested structures, organizing them into appropriate statement models.
     Handles direct values without CFY/PFY structure, assuming each field has only one value.
+    Walks the structure iteratively with an explicit stack, so arbitrarily deep or wide payloads
+    are handled in a single pass without recursion limits.
     
     Args:
         context: The tool context
         data: Financial data structure (raw dictionary or FinancialData object)
-        field_path: Current path in the nested structure (used in recursion)
+        field_path: Path prefix for the keys of the data (for data nested in a larger document)
         
     Returns:
         Dictionary with categorized financial data organized by statement type and field
     """
-    # Initialize results with statement types
+    # Single accumulator for every level of the structure
     results = {
         "income_statement": {},
         "financial_position": {},
         "unknown": {}
     }
+    income_results = results["income_statement"]
+    position_results = results["financial_position"]
+    unknown_results = results["unknown"]
     
     # Handle different input types
     if isinstance(data, dict):
@@ -143,82 +254,81 @@ def extract_and_categorize_financial_data(context: RunContext[ExtractContext], d
         items_dict = data.data
     else:
         items_dict = {}
+    
+    def enter_dict(level: Dict[str, Any], path: str, section: str):
+        """Handle the statement-form special cases of a dictionary level and return its stack frame"""
+        # Special case: Check if data is already in statement form
+        income_statement = level.get("incomeStatement")
+        if isinstance(income_statement, dict):
+            for key, value in income_statement.items():
+                if isinstance(value, (int, float)):
+                    income_results[key] = float(value)
+        
+        financial_position = level.get("statementOfFinancialPosition")
+        if isinstance(financial_position, dict):
+            # First handle top-level items
+            for key, value in financial_position.items():
+                if isinstance(value, (int, float)):
+                    position_results[key] = float(value)
+            
+            # Handle nested structures (current assets, non-current assets, etc.)
+            for section in STATEMENT_OF_FINANCIAL_POSITION_SECTIONS:
+                section_data = financial_position.get(section)
+                if isinstance(section_data, dict):
+                    for key, value in section_data.items():
+                        if isinstance(value, (int, float)):
+                            position_results[f"{section}.{key}"] = float(value)
         
-    # Special case: Check if data is already in statement form
-    if "incomeStatement" in items_dict and isinstance(items_dict["incomeStatement"], dict):
-        results["income_statement"] = {k: float(v) for k, v in items_dict["incomeStatement"].items() if isinstance(v, (int, float))}
+        return (False, iter(level.items()), path, section)
+    
+    def match(term: str) -> Dict[str, Any]:
+        """Match a term, leaving unconfident fuzzy matches unknown"""
+        return gate_match(context.deps, match_financial_term(context, term))
+    
+    def store(term_info: Dict[str, Any], path: str, value: float) -> None:
+        """Store a value under its matched field, or under its path if the match is unknown"""
+        if term_info["statement_type"] != "unknown":
+            results[term_info["statement_type"]][term_info["field"]] = value
+        else:
+            unknown_results[path] = value
     
-    if "statementOfFinancialPosition" in items_dict and isinstance(items_dict["statementOfFinancialPosition"], dict):
-        # Extract values from the financial position structure
-        financial_position = items_dict["statementOfFinancialPosition"]
+    # Each frame is (is_list, iterator over entries, path of the container, its dotted section)
+    stack = [enter_dict(items_dict, field_path, field_path.replace("_", "."))]
+    while stack:
+        is_list, entries, path, section = stack[-1]
+        entry = next(entries, None)
+        if entry is None:
+            stack.pop()
+            continue
         
-        # First handle top-level items
-        for key, value in financial_position.items():
-            if isinstance(value, (int, float)):
-                results["financial_position"][key] = float(value)
+        # Handle arrays/lists
+        if is_list:
+            index, item = entry
+            if isinstance(item, dict):
+                stack.append(enter_dict(item, f"{path}[{index}]", f"{section}[{index}]"))
+            elif isinstance(item, (int, float)) and index == 0:
+                store(match(path), path, float(item))
+            continue
         
-        # Handle nested structures (current assets, non-current assets, etc.)
-        for section in ["currentAssets", "nonCurrentAssets", "currentLiabilities", "nonCurrentLiabilities", "equity"]:
-            if section in financial_position and isinstance(financial_position[section], dict):
-                for key, value in financial_position[section].items():
-                    if isinstance(value, (int, float)):
-                        results["financial_position"][f"{section}.{key}"] = float(value)
-    
-    # Process regular dictionary structure
-    for key, value in items_dict.items():
+        key, value = entry
         # Skip already processed statement sections
-        if key in ["incomeStatement", "statementOfFinancialPosition"]:
+        if key in STATEMENT_FORM_KEYS:
             continue
-            
-        current_path = f"{field_path}_{key}" if field_path else key
         
-        # Process direct numeric values
+        current_path = f"{path}_{key}" if path else key
+        current_section = f"{section}.{key}" if section else key
+        
+        # Process direct numeric values: the label first, then the path, as map_financial_document does
         if isinstance(value, (int, float)):
-            float_value = float(value)
-            term_info = match_financial_term(context, current_path)
-            
-            if term_info["statement_type"] != "unknown":
-                results[term_info["statement_type"]][term_info["field"]] = float_value
-            else:
-                term_info_key_only = match_financial_term(context, key)
-                if term_info_key_only["statement_type"] != "unknown":
-                    results[term_info_key_only["statement_type"]][term_info_key_only["field"]] = float_value
-                else:
-                    results["unknown"][current_path] = float_value
+            store(match_leaf(context.deps, key, current_path, section), current_path, float(value))
         
-        # Process nested dictionaries
+        # Process nested dictionaries; a single wrapped value ({"Revenue": {"2023": 100}}) is
+        # matched like any leaf, so its unknown label falls back to the path
         elif isinstance(value, dict):
-            if len(value) == 1 and isinstance(list(value.values())[0], (int, float)):
-                term_info = match_financial_term(context, current_path)
-                if term_info["statement_type"] != "unknown":
-                    results[term_info["statement_type"]][term_info["field"]] = float(list(value.values())[0])
-                else:
-                    results["unknown"][current_path] = float(list(value.values())[0])
-                continue
-            
-            nested_results = extract_and_categorize_financial_data(context, value, current_path)
-            for statement_type, fields in nested_results.items():
-                for field, value in fields.items():
-                    if statement_type in results:
-                        results[statement_type][field] = value
+            stack.append(enter_dict(value, current_path, current_section))
         
-        # Handle arrays/lists
         elif isinstance(value, list):
-            for i, item in enumerate(value):
-                if isinstance(item, dict):
-                    list_path = f"{current_path}[{i}]"
-                    nested_results = extract_and_categorize_financial_data(context, item, list_path)
-                    
-                    for statement_type, fields in nested_results.items():
-                        for field, value in fields.items():
-                            if statement_type in results:
-                                results[statement_type][field] = value
-                elif isinstance(item, (int, float)) and i == 0:
-                    term_info = match_financial_term(context, current_path)
-                    if term_info["statement_type"] != "unknown":
-                        results[term_info["statement_type"]][term_info["field"]] = float(item)
-                    else:
-                        results["unknown"][current_path] = float(item)
+            stack.append((True, enumerate(value), current_path, current_section))
     
     # Remove empty statement types
     for statement_type in list(results.keys()):
@@ -226,3 +336,78 @@ def extract_and_categorize_financial_data(context: RunContext[ExtractContext], d
             del results[statement_type]
     
     return results
+
+def map_financial_document(context: RunContext[FinancialTermDeps], data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map every leaf of a raw financial document in a single call.
+    Runs a match_financial_term lookup per leaf, so the whole document is pre-mapped in one
+    tool round trip instead of one per term.
+    
+    Args:
+        context: The tool context with injected dependencies
+        data: The complete raw financial document
+        
+    Returns:
+        Dictionary with a candidate mapping for every numeric leaf matched to a field,
+        conflicting candidates and the leaves that still need to be mapped by hand. Leaves
+        with only a guessed statement type are gaps, with the guess as "statement_type"
+    """
+    candidates = []
+    gaps = []
+    fields_seen = {}
+    
+    # Walk the document with an explicit stack, visiting keys in document order
+    def child_entries(container, parent_path):
+        if isinstance(container, dict):
+            return ((f"{parent_path}.{k}" if parent_path else str(k), str(k), v) for k, v in container.items())
+        return ((f"{parent_path}[{i}]", parent_path.rsplit(".", 1)[-1], v) for i, v in enumerate(container))
+    
+    stack = [child_entries(data, "")] if isinstance(data, dict) else []
+    while stack:
+        entry = next(stack[-1], None)
+        if entry is None:
+            stack.pop()
+            continue
+        
+        path, key, value = entry
+        if isinstance(value, (dict, list)):
+            stack.append(child_entries(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            section = path.rsplit(".", 1)[0] if "." in path else ""
+            term_info = match_leaf(context.deps, key, path.replace(".", "_"), section)
+            
+            # A guess has no field of its own, so it is left to the model
+            if term_info["resolved_by"] == "guess":
+                gap = {"path": path, "value": value, "reason": "no matching term"}
+                if term_info["statement_type"] != "unknown":
+                    gap["statement_type"] = term_info["statement_type"]
+                if "suggestion" in term_info:
+                    gap["suggestion"] = term_info["suggestion"]
+                gaps.append(gap)
+                continue
+            
+            candidate = {
+                "path": path,
+                "value": float(value),
+                "statement_type": term_info["statement_type"],
+                "field": term_info["field"],
+                "match_score": term_info["match_score"],
+                "confidence": term_info["confidence"]
+            }
+            candidates.append(candidate)
+            fields_seen.setdefault((candidate["statement_type"], candidate["field"]), []).append(path)
+        else:
+            # Text, booleans and nulls (filing information, statements, opinions) are left to the model
+            gaps.append({"path": path, "value": value, "reason": "non-numeric value"})
+    
+    conflicts = [
+        {"statement_type": statement_type, "field": field, "paths": paths}
+        for (statement_type, field), paths in fields_seen.items() if len(paths) > 1
+    ]
+    
+    return {
+        "candidates": candidates,
+        "conflicts": conflicts,
+        "gaps": gaps,
+        "leaf_count": len(candidates) + len(gaps)
+    }
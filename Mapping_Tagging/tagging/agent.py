@@ -2,13 +2,14 @@
 Agent for XBRL tagging operations.
 """
 
-from pydantic_ai import Agent, Tool
+from pydantic_ai import Agent, ModelRetry, RunContext, Tool
 from pydantic_ai.models.openai import OpenAIModel
 import os
 
 from .models import PartialXBRLWithTags
 from .system_prompts import XBRL_DATA_TAGGING_PROMPT
 from .dependencies import XBRLTaxonomyDependencies
+from .hydration import PartialXBRLWithTagIds, hydrate_tags
 
 # Import the enhanced tools
 from .tools import (
@@ -26,7 +27,7 @@ tagging_model = OpenAIModel(model_name="gpt-4o", api_key=OPENAI_API_KEY)
 # Define the agent with dependencies and register tools
 xbrl_tagging_agent = Agent(
     model=tagging_model,
-    result_type=PartialXBRLWithTags,
+    result_type=PartialXBRLWithTagIds,
     system_prompt=XBRL_DATA_TAGGING_PROMPT,
     deps_type=XBRLTaxonomyDependencies,
     retries=10,
@@ -37,4 +38,21 @@ xbrl_tagging_agent = Agent(
         # Tool(validate_tagged_data, takes_ctx=True),
         Tool(batch_tag_elements, takes_ctx=True)
     ]
-)
\ No newline at end of file
+)
+
+@xbrl_tagging_agent.result_validator
+def hydrate_result(context: RunContext[XBRLTaxonomyDependencies], result) -> PartialXBRLWithTags:
+    """Replace the element ids chosen by the model with the complete taxonomy tags"""
+    tagged, unknown = hydrate_tags(result, context.deps.elements)
+    if unknown:
+        suggestions = []
+        for element_id in unknown:
+            field_name, _ = context.deps.lookup.best(element_id.split("_", 1)[-1])
+            if field_name:
+                ids = ", ".join(tag.element_id for tag in context.deps.field_tags[field_name])
+                suggestions.append(f"{element_id} -> {ids}")
+        hint = f" Closest known ids: {'; '.join(suggestions)}." if suggestions else ""
+        raise ModelRetry(
+            f"Unknown element ids: {', '.join(unknown)}. Use only element_id values returned by the tagging tools.{hint}"
+        )
+    return tagged
@@ -0,0 +1,95 @@
+"""
+Memoization for the XBRL tagging tools.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+import os
+import threading
+
+# Largest number of (taxonomy, element, statement type) lookups kept
+TAG_CACHE_SIZE = int(os.environ.get("TAG_CACHE_SIZE", "4096"))
+
+class TagCache:
+    """
+    Bounded, thread-safe LRU memo for tag lookups.
+    
+    Keys are (taxonomy name, taxonomy version, element name, statement type) tuples, so
+    entries computed against another taxonomy, or another version of the same one, are never
+    served. The lock is only held for dictionary operations and never across an await, so
+    the cache is safe to share between threads and between concurrent agent runs.
+    """
+    
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[str, str, str, str], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for a key (marking it recently used), or None"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entries beyond maxsize"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, taxonomy_name: Optional[str] = None, version: Optional[str] = None) -> int:
+        """
+        Drop the entries of a taxonomy, e.g. when it is reloaded.
+        
+        Args:
+            taxonomy_name: Taxonomy whose entries are dropped (all entries if None)
+            version: Only drop the entries of this version of the taxonomy
+        
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            stale = [
+                key for key in self._entries
+                if (taxonomy_name is None or key[0] == taxonomy_name) and (version is None or key[1] == version)
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+            return len(stale)
+    
+    def clear(self) -> None:
+        """Drop all entries and reset the statistics"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate, size, eviction and invalidation statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+# Shared by all tagging runs; taxonomy dependencies invalidate their entries when reloaded
+tag_cache = TagCache(maxsize=TAG_CACHE_SIZE)
@@ -1,9 +1,18 @@
 """
 Dependencies for XBRL tagging operations.
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional
-from .models import FinancialTag
+import hashlib
+import json
+from .cache import tag_cache
+from .index import TagLookupIndex
+from .records import TagRecord, as_records
+from .serialization import TagPayloads
+
+# Fields whose reassignment reloads the taxonomy: rebuilds the lookups, bumps the version
+# and invalidates the cached tags of the previous version
+TAXONOMY_FIELDS = ("mandatory_fields", "field_tags", "statement_tags")
 
 # Tagging Dependencies
 @dataclass
@@ -12,15 +21,60 @@ class XBRLTaxonomyDependencies:
     taxonomy_name: str
     entity_name: str
     mandatory_fields: Dict[str, bool]
-    field_tags: Dict[str, List[FinancialTag]]
-    statement_tags: List[FinancialTag]
+    # Tags are kept as compact TagRecords; FinancialTag models are converted when loaded
+    field_tags: Dict[str, List[TagRecord]]
+    statement_tags: List[TagRecord]
     reporting_year: Optional[str] = None # Set to None since we're not using it currently
+    # Every tag of the taxonomy by element_id, for hydrating the ids chosen by the agent
+    elements: Dict[str, TagRecord] = field(init=False, repr=False)
+    # Indexed lookup of field_tags keys by approximate element name
+    lookup: TagLookupIndex = field(init=False, repr=False)
+    # Dictionary and JSON forms of every tag, encoded once
+    payloads: TagPayloads = field(init=False, repr=False)
+    # Content fingerprint of the taxonomy; cached tags are keyed by it
+    version: str = field(init=False, compare=False)
+    
+    def __post_init__(self):
+        self.refresh()
+    
+    def __setattr__(self, name, value):
+        """Reload whenever the taxonomy content is replaced"""
+        super().__setattr__(name, value)
+        if name in TAXONOMY_FIELDS and "version" in self.__dict__:
+            self.refresh()
+    
+    def refresh(self) -> None:
+        """
+        Convert the tags to shared records, rebuild the element and name lookups and the
+        encoded tags, recompute the taxonomy version and drop the cached tags of the previous
+        version. Call this after editing the taxonomy in place; replacing field_tags,
+        statement_tags or mandatory_fields triggers it automatically.
+        """
+        # Every tag of the taxonomy by element_id; equal tags share one record
+        elements: Dict[str, TagRecord] = {}
+        # Write through __dict__ so the rebuild doesn't re-trigger __setattr__
+        self.__dict__["field_tags"] = {
+            name: as_records(tags, elements) for name, tags in self.field_tags.items()
+        }
+        self.__dict__["statement_tags"] = as_records(self.statement_tags, elements)
+        content = json.dumps([
+            {name: [tag.model_dump() for tag in tags] for name, tags in self.field_tags.items()},
+            [tag.model_dump() for tag in self.statement_tags],
+            self.mandatory_fields
+        ], sort_keys=True, default=str)
+        version = hashlib.sha1(content.encode()).hexdigest()[:16]
+        
+        previous = self.__dict__.get("version")
+        self.__dict__.update(elements=elements, lookup=TagLookupIndex(self.field_tags),
+                             payloads=TagPayloads(elements.values()), version=version)
+        if previous is not None and previous != version:
+            tag_cache.invalidate(self.taxonomy_name, previous)
 
 # Filing information XBRL taxonomy tags
 
 SG_XBRL_FILING_TAGS = {
     "DisclosureOfFilingInformationAbstract": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-dei",
             element_name="DisclosureOfFilingInformationAbstract",
             element_id="sg-dei_DisclosureOfFilingInformationAbstract",
@@ -33,7 +87,7 @@ SG_XBRL_FILING_TAGS = {
         )
     ],
     "NameOfCompany": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-dei",
             element_name="NameOfCompany",
             element_id="sg-dei_NameOfCompany",
@@ -46,7 +100,7 @@ SG_XBRL_FILING_TAGS = {
         )
     ],
     "UniqueEntityNumber": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-dei",
             element_name="UniqueEntityNumber",
             element_id="sg-dei_UniqueEntityNumber",
@@ -59,7 +113,7 @@ SG_XBRL_FILING_TAGS = {
         )
     ],
     "CurrentPeriodStartDate": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-dei",
             element_name="CurrentPeriodStartDate",
             element_id="sg-dei_CurrentPeriodStartDate",
@@ -72,7 +126,7 @@ SG_XBRL_FILING_TAGS = {
         )
     ],
     "CurrentPeriodEndDate": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-dei",
             element_name="CurrentPeriodEndDate",
             element_id="sg-dei_CurrentPeriodEndDate",
@@ -85,7 +139,7 @@ SG_XBRL_FILING_TAGS = {
         )
     ],
     "PriorPeriodStartDate": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-dei",
             element_name="PriorPeriodStartDate",
             element_id="sg-dei_PriorPeriodStartDate",
@@ -98,7 +152,7 @@ SG_XBRL_FILING_TAGS = {
         )
     ],
     "TypeOfXBRLFiling": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-dei",
             element_name="TypeOfXBRLFiling",
             element_id="sg-dei_TypeOfXBRLFiling",
@@ -111,7 +165,7 @@ SG_XBRL_FILING_TAGS = {
         )
     ],
     "NatureOfFinancialStatementsCompanyLevelOrConsolidated": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-dei",
             element_name="NatureOfFinancialStatementsCompanyLevelOrConsolidated",
             element_id="sg-dei_NatureOfFinancialStatementsCompanyLevelOrConsolidated",
@@ -124,7 +178,7 @@ SG_XBRL_FILING_TAGS = {
         )
     ],
     "TypeOfAccountingStandardUsedToPrepareFinancialStatements": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-dei",
             element_name="TypeOfAccountingStandardUsedToPrepareFinancialStatements",
             element_id="sg-dei_TypeOfAccountingStandardUsedToPrepareFinancialStatements",
@@ -137,7 +191,7 @@ SG_XBRL_FILING_TAGS = {
         )
     ],
     "DateOfAuthorisationForIssueOfFinancialStatements": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="DateOfAuthorisationForIssueOfFinancialStatements",
             element_id="sg-as_DateOfAuthorisationForIssueOfFinancialStatements",
@@ -150,7 +204,7 @@ SG_XBRL_FILING_TAGS = {
         )
     ],
     "TypeOfStatementOfFinancialPosition": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-dei",
             element_name="TypeOfStatementOfFinancialPosition",
             element_id="sg-dei_TypeOfStatementOfFinancialPosition",
@@ -163,7 +217,7 @@ SG_XBRL_FILING_TAGS = {
         )
     ],
     "WhetherFinancialStatementsArePreparedOnGoingConcernBasis": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-dei",
             element_name="WhetherFinancialStatementsArePreparedOnGoingConcernBasis",
             element_id="sg-dei_WhetherFinancialStatementsArePreparedOnGoingConcernBasis",
@@ -176,7 +230,7 @@ SG_XBRL_FILING_TAGS = {
         )
     ],
     "WhetherThereAreChangesToComparativeAmountsDueToRestatementsReclassificationOrOtherReasons": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-dei",
             element_name="WhetherThereAreChangesToComparativeAmountsDueToRestatementsReclassificationOrOtherReasons",
             element_id="sg-dei_WhetherThereAreChangesToComparativeAmountsDueToRestatementsReclassificationOrOtherReasons",
@@ -189,7 +243,7 @@ SG_XBRL_FILING_TAGS = {
         )
     ],
     "DescriptionOfPresentationCurrency": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-dei",
             element_name="DescriptionOfPresentationCurrency",
             element_id="sg-dei_DescriptionOfPresentationCurrency",
@@ -202,7 +256,7 @@ SG_XBRL_FILING_TAGS = {
         )
     ],
     "DescriptionOfFunctionalCurrency": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="DescriptionOfFunctionalCurrency",
             element_id="sg-as_DescriptionOfFunctionalCurrency",
@@ -215,7 +269,7 @@ SG_XBRL_FILING_TAGS = {
         )
     ],
     "LevelOfRoundingUsedInFinancialStatements": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-dei",
             element_name="LevelOfRoundingUsedInFinancialStatements",
             element_id="sg-dei_LevelOfRoundingUsedInFinancialStatements",
@@ -228,7 +282,7 @@ SG_XBRL_FILING_TAGS = {
         )
     ],
     "DescriptionOfNatureOfEntitysOperationsAndPrincipalActivities": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="DescriptionOfNatureOfEntitysOperationsAndPrincipalActivities",
             element_id="sg-as_DescriptionOfNatureOfEntitysOperationsAndPrincipalActivities",
@@ -241,7 +295,7 @@ SG_XBRL_FILING_TAGS = {
         )
     ],
     "PrincipalPlaceOfBusinessIfDifferentFromRegisteredOffice": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="PrincipalPlaceOfBusinessIfDifferentFromRegisteredOffice",
             element_id="sg-as_PrincipalPlaceOfBusinessIfDifferentFromRegisteredOffice",
@@ -254,7 +308,7 @@ SG_XBRL_FILING_TAGS = {
         )
     ],
     "WhetherCompanyOrGroupIfConsolidatedAccountsArePreparedHasMoreThan50Employees": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-dei",
             element_name="WhetherCompanyOrGroupIfConsolidatedAccountsArePreparedHasMoreThan50Employees",
             element_id="sg-dei_WhetherCompanyOrGroupIfConsolidatedAccountsArePreparedHasMoreThan50Employees",
@@ -267,7 +321,7 @@ SG_XBRL_FILING_TAGS = {
         )
     ],
     "NameOfParentEntity": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="NameOfParentEntity",
             element_id="sg-as_NameOfParentEntity",
@@ -280,7 +334,7 @@ SG_XBRL_FILING_TAGS = {
         )
     ],
     "NameOfUltimateParentOfGroup": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="NameOfUltimateParentOfGroup",
             element_id="sg-as_NameOfUltimateParentOfGroup",
@@ -293,7 +347,7 @@ SG_XBRL_FILING_TAGS = {
         )
     ],
     "DetailsOfInstanceDocumentAbstract": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-dei",
             element_name="DetailsOfInstanceDocumentAbstract",
             element_id="sg-dei_DetailsOfInstanceDocumentAbstract",
@@ -306,7 +360,7 @@ SG_XBRL_FILING_TAGS = {
         )
     ],
     "TaxonomyVersion": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-dei",
             element_name="TaxonomyVersion",
             element_id="sg-dei_TaxonomyVersion",
@@ -319,7 +373,7 @@ SG_XBRL_FILING_TAGS = {
         )
     ],
     "NameAndVersionOfSoftwareUsedToGenerateInstanceDocument": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-dei",
             element_name="NameAndVersionOfSoftwareUsedToGenerateInstanceDocument",
             element_id="sg-dei_NameAndVersionOfSoftwareUsedToGenerateInstanceDocument",
@@ -332,7 +386,7 @@ SG_XBRL_FILING_TAGS = {
         )
     ],
     "HowWasXBRLInstanceDocumentPrepared": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-dei",
             element_name="HowWasXBRLInstanceDocumentPrepared",
             element_id="sg-dei_HowWasXBRLInstanceDocumentPrepared",
@@ -347,7 +401,7 @@ SG_XBRL_FILING_TAGS = {
 }
 # statement-level tags
 SG_XBRL_FILING_STATEMENT_TAGS = [
-    FinancialTag(
+    TagRecord(
         prefix="sg-dei",
         element_name="DisclosureOfFilingInformationAbstract",
         element_id="sg-dei_DisclosureOfFilingInformationAbstract",
@@ -358,7 +412,7 @@ SG_XBRL_FILING_STATEMENT_TAGS = [
         substitution_group="xbrli:item",
         description="Abstract container element that represents the entire filing information section of the report"
     ),
-    FinancialTag(
+    TagRecord(
         prefix="sg-dei",
         element_name="DetailsOfInstanceDocumentAbstract",
         element_id="sg-dei_DetailsOfInstanceDocumentAbstract",
@@ -397,7 +451,7 @@ MANDATORY_FILING_TAGS = {
 
 SG_XBRL_DIRECTORS_TAGS = {
     "DisclosureInStatementByDirectorsAbstract": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-dei",
             element_name="DisclosureInStatementByDirectorsAbstract",
             element_id="sg-dei_DisclosureInStatementByDirectorsAbstract",
@@ -410,7 +464,7 @@ SG_XBRL_DIRECTORS_TAGS = {
         )
     ],
     "WhetherInDirectorsOpinionFinancialStatementsAreDrawnUpSoAsToExhibitATrueAndFairView": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-dei",
             element_name="WhetherInDirectorsOpinionFinancialStatementsAreDrawnUpSoAsToExhibitATrueAndFairView",
             element_id="sg-dei_WhetherInDirectorsOpinionFinancialStatementsAreDrawnUpSoAsToExhibitATrueAndFairView",
@@ -423,7 +477,7 @@ SG_XBRL_DIRECTORS_TAGS = {
         )
     ],
     "WhetherThereAreReasonableGroundsToBelieveThatCompanyWillBeAbleToPayItsDebtsAsAndWhenTheyFallDueAtDateOfStatement": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-dei",
             element_name="WhetherThereAreReasonableGroundsToBelieveThatCompanyWillBeAbleToPayItsDebtsAsAndWhenTheyFallDueAtDateOfStatement",
             element_id="sg-dei_WhetherThereAreReasonableGroundsToBelieveThatCompanyWillBeAbleToPayItsDebtsAsAndWhenTheyFallDueAtDateOfStatement",
@@ -439,7 +493,7 @@ SG_XBRL_DIRECTORS_TAGS = {
 
 # statement-level tags
 SG_XBRL_DIRECTORS_STATEMENT_TAGS = [
-    FinancialTag(
+    TagRecord(
         prefix="sg-dei",
         element_name="DisclosureInStatementByDirectorsAbstract",
         element_id="sg-dei_DisclosureInStatementByDirectorsAbstract",
@@ -463,7 +517,7 @@ MANDATORY_DIRECTORS_TAGS = {
 
 SG_XBRL_AUDIT_TAGS = {
     "DisclosuresInIndependentAuditorsReportAbstract": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-ssa",
             element_name="DisclosuresInIndependentAuditorsReportAbstract",
             element_id="sg-ssa_DisclosuresInIndependentAuditorsReportAbstract",
@@ -476,7 +530,7 @@ SG_XBRL_AUDIT_TAGS = {
         )
     ],
     "TypeOfAuditOpinionInIndependentAuditorsReport": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-ssa",
             element_name="TypeOfAuditOpinionInIndependentAuditorsReport",
             element_id="sg-ssa_TypeOfAuditOpinionInIndependentAuditorsReport",
@@ -489,7 +543,7 @@ SG_XBRL_AUDIT_TAGS = {
         )
     ],
     "AuditingStandardsUsedToConductAudit": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-ssa",
             element_name="AuditingStandardsUsedToConductAudit",
             element_id="sg-ssa_AuditingStandardsUsedToConductAudit",
@@ -502,7 +556,7 @@ SG_XBRL_AUDIT_TAGS = {
         )
     ],
     "WhetherThereIsAnyMaterialUncertaintyRelatingToGoingConcern": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-ssa",
             element_name="WhetherThereIsAnyMaterialUncertaintyRelatingToGoingConcern",
             element_id="sg-ssa_WhetherThereIsAnyMaterialUncertaintyRelatingToGoingConcern",
@@ -515,7 +569,7 @@ SG_XBRL_AUDIT_TAGS = {
         )
     ],
     "WhetherInAuditorsOpinionAccountingAndOtherRecordsRequiredAreProperlyKeptInAccordanceWithCompaniesAct": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-ssa",
             element_name="WhetherInAuditorsOpinionAccountingAndOtherRecordsRequiredAreProperlyKeptInAccordanceWithCompaniesAct",
             element_id="sg-ssa_WhetherInAuditorsOpinionAccountingAndOtherRecordsRequiredAreProperlyKeptInAccordanceWithCompaniesAct",
@@ -531,7 +585,7 @@ SG_XBRL_AUDIT_TAGS = {
 
 # statement-level tags
 SG_XBRL_AUDIT_STATEMENT_TAGS = [
-    FinancialTag(
+    TagRecord(
         prefix="sg-ssa",
         element_name="DisclosuresInIndependentAuditorsReportAbstract",
         element_id="sg-ssa_DisclosuresInIndependentAuditorsReportAbstract",
@@ -557,7 +611,7 @@ MANDATORY_AUDIT_TAGS = {
 
 SG_XBRL_FINANCIAL_POSITION_TAGS = {
     "StatementOfFinancialPositionLineItems": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="StatementOfFinancialPositionLineItems",
             element_id="sg-as_StatementOfFinancialPositionLineItems",
@@ -570,7 +624,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "AssetsAbstract": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="AssetsAbstract",
             element_id="sg-as_AssetsAbstract",
@@ -583,7 +637,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "CurrentAssetsAbstract": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="CurrentAssetsAbstract",
             element_id="sg-as_CurrentAssetsAbstract",
@@ -596,7 +650,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "CashAndBankBalances": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="CashAndBankBalances",
             element_id="sg-as_CashAndBankBalances",
@@ -609,7 +663,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "TradeAndOtherReceivablesCurrent": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="TradeAndOtherReceivablesCurrent",
             element_id="sg-as_TradeAndOtherReceivablesCurrent",
@@ -622,7 +676,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "CurrentFinanceLeaseReceivables": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="CurrentFinanceLeaseReceivables",
             element_id="sg-as_CurrentFinanceLeaseReceivables",
@@ -635,7 +689,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "CurrentDerivativeFinancialAssets": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="CurrentDerivativeFinancialAssets",
             element_id="sg-as_CurrentDerivativeFinancialAssets",
@@ -648,7 +702,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "CurrentFinancialAssetsMeasuredAtFairValueThroughProfitOrLoss": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="CurrentFinancialAssetsMeasuredAtFairValueThroughProfitOrLoss",
             element_id="sg-as_CurrentFinancialAssetsMeasuredAtFairValueThroughProfitOrLoss",
@@ -661,7 +715,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "OtherCurrentFinancialAssets": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="OtherCurrentFinancialAssets",
             element_id="sg-as_OtherCurrentFinancialAssets",
@@ -674,7 +728,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "DevelopmentProperties": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="DevelopmentProperties",
             element_id="sg-as_DevelopmentProperties",
@@ -687,7 +741,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "Inventories": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="Inventories",
             element_id="sg-as_Inventories",
@@ -700,7 +754,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "OtherCurrentNonfinancialAssets": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="OtherCurrentNonfinancialAssets",
             element_id="sg-as_OtherCurrentNonfinancialAssets",
@@ -713,7 +767,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "NoncurrentAssetsOrDisposalGroupsClassifiedAsHeldForSaleOrAsHeldForDistributionToOwners": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="NoncurrentAssetsOrDisposalGroupsClassifiedAsHeldForSaleOrAsHeldForDistributionToOwners",
             element_id="sg-as_NoncurrentAssetsOrDisposalGroupsClassifiedAsHeldForSaleOrAsHeldForDistributionToOwners",
@@ -726,7 +780,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "CurrentAssets": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="CurrentAssets",
             element_id="sg-as_CurrentAssets",
@@ -739,7 +793,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "NoncurrentAssetsAbstract": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="NoncurrentAssetsAbstract",
             element_id="sg-as_NoncurrentAssetsAbstract",
@@ -752,7 +806,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "TradeAndOtherReceivablesNoncurrent": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="TradeAndOtherReceivablesNoncurrent",
             element_id="sg-as_TradeAndOtherReceivablesNoncurrent",
@@ -765,7 +819,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "NoncurrentFinanceLeaseReceivables": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="NoncurrentFinanceLeaseReceivables",
             element_id="sg-as_NoncurrentFinanceLeaseReceivables",
@@ -778,7 +832,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "NoncurrentDerivativeFinancialAssets": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="NoncurrentDerivativeFinancialAssets",
             element_id="sg-as_NoncurrentDerivativeFinancialAssets",
@@ -791,7 +845,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "NoncurrentFinancialAssetsMeasuredAtFairValueThroughProfitOrLoss": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="NoncurrentFinancialAssetsMeasuredAtFairValueThroughProfitOrLoss",
             element_id="sg-as_NoncurrentFinancialAssetsMeasuredAtFairValueThroughProfitOrLoss",
@@ -804,7 +858,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "OtherNoncurrentFinancialAssets": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="OtherNoncurrentFinancialAssets",
             element_id="sg-as_OtherNoncurrentFinancialAssets",
@@ -817,7 +871,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "PropertyPlantAndEquipment": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="PropertyPlantAndEquipment",
             element_id="sg-as_PropertyPlantAndEquipment",
@@ -830,7 +884,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "InvestmentProperties": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="InvestmentProperties",
             element_id="sg-as_InvestmentProperties",
@@ -843,7 +897,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "Goodwill": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="Goodwill",
             element_id="sg-as_Goodwill",
@@ -856,7 +910,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "IntangibleAssetsOtherThanGoodwill": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="IntangibleAssetsOtherThanGoodwill",
             element_id="sg-as_IntangibleAssetsOtherThanGoodwill",
@@ -869,7 +923,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "InvestmentsInSubsidiariesAssociatesOrJointVentures": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="InvestmentsInSubsidiariesAssociatesOrJointVentures",
             element_id="sg-as_InvestmentsInSubsidiariesAssociatesOrJointVentures",
@@ -882,7 +936,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "DeferredTaxAssets": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="DeferredTaxAssets",
             element_id="sg-as_DeferredTaxAssets",
@@ -895,7 +949,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "OtherNoncurrentNonfinancialAssets": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="OtherNoncurrentNonfinancialAssets",
             element_id="sg-as_OtherNoncurrentNonfinancialAssets",
@@ -908,7 +962,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "NoncurrentAssets": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="NoncurrentAssets",
             element_id="sg-as_NoncurrentAssets",
@@ -921,7 +975,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "Assets": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="Assets",
             element_id="sg-as_Assets",
@@ -934,7 +988,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "LiabilitiesAbstract": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="LiabilitiesAbstract",
             element_id="sg-as_LiabilitiesAbstract",
@@ -947,7 +1001,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "CurrentLiabilitiesAbstract": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="CurrentLiabilitiesAbstract",
             element_id="sg-as_CurrentLiabilitiesAbstract",
@@ -960,7 +1014,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "TradeAndOtherPayablesCurrent": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="TradeAndOtherPayablesCurrent",
             element_id="sg-as_TradeAndOtherPayablesCurrent",
@@ -973,7 +1027,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "CurrentLoansAndBorrowings": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="CurrentLoansAndBorrowings",
             element_id="sg-as_CurrentLoansAndBorrowings",
@@ -986,7 +1040,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "CurrentFinancialLiabilitiesMeasuredAtFairValueThroughProfitOrLoss": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="CurrentFinancialLiabilitiesMeasuredAtFairValueThroughProfitOrLoss",
             element_id="sg-as_CurrentFinancialLiabilitiesMeasuredAtFairValueThroughProfitOrLoss",
@@ -999,7 +1053,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "CurrentFinanceLeaseLiabilities": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="CurrentFinanceLeaseLiabilities",
             element_id="sg-as_CurrentFinanceLeaseLiabilities",
@@ -1012,7 +1066,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "OtherCurrentFinancialLiabilities": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="OtherCurrentFinancialLiabilities",
             element_id="sg-as_OtherCurrentFinancialLiabilities",
@@ -1025,7 +1079,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "CurrentIncomeTaxLiabilities": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="CurrentIncomeTaxLiabilities",
             element_id="sg-as_CurrentIncomeTaxLiabilities",
@@ -1038,7 +1092,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "CurrentProvisions": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="CurrentProvisions",
             element_id="sg-as_CurrentProvisions",
@@ -1051,7 +1105,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "OtherCurrentNonfinancialLiabilities": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="OtherCurrentNonfinancialLiabilities",
             element_id="sg-as_OtherCurrentNonfinancialLiabilities",
@@ -1064,7 +1118,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "LiabilitiesClassifiedAsHeldForSale": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="LiabilitiesClassifiedAsHeldForSale",
             element_id="sg-as_LiabilitiesClassifiedAsHeldForSale",
@@ -1077,7 +1131,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "CurrentLiabilities": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="CurrentLiabilities",
             element_id="sg-as_CurrentLiabilities",
@@ -1090,7 +1144,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "NoncurrentLiabilitiesAbstract": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="NoncurrentLiabilitiesAbstract",
             element_id="sg-as_NoncurrentLiabilitiesAbstract",
@@ -1103,7 +1157,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "TradeAndOtherPayablesNoncurrent": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="TradeAndOtherPayablesNoncurrent",
             element_id="sg-as_TradeAndOtherPayablesNoncurrent",
@@ -1116,7 +1170,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "NoncurrentLoansAndBorrowings": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="NoncurrentLoansAndBorrowings",
             element_id="sg-as_NoncurrentLoansAndBorrowings",
@@ -1129,7 +1183,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "NoncurrentFinancialLiabilitiesMeasuredAtFairValueThroughProfitOrLoss": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="NoncurrentFinancialLiabilitiesMeasuredAtFairValueThroughProfitOrLoss",
             element_id="sg-as_NoncurrentFinancialLiabilitiesMeasuredAtFairValueThroughProfitOrLoss",
@@ -1142,7 +1196,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "NoncurrentFinanceLeaseLiabilities": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="NoncurrentFinanceLeaseLiabilities",
             element_id="sg-as_NoncurrentFinanceLeaseLiabilities",
@@ -1155,7 +1209,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "OtherNoncurrentFinancialLiabilities": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="OtherNoncurrentFinancialLiabilities",
             element_id="sg-as_OtherNoncurrentFinancialLiabilities",
@@ -1168,7 +1222,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "DeferredTaxLiabilities": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="DeferredTaxLiabilities",
             element_id="sg-as_DeferredTaxLiabilities",
@@ -1181,7 +1235,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "NoncurrentProvisions": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="NoncurrentProvisions",
             element_id="sg-as_NoncurrentProvisions",
@@ -1194,7 +1248,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "OtherNoncurrentNonfinancialLiabilities": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="OtherNoncurrentNonfinancialLiabilities",
             element_id="sg-as_OtherNoncurrentNonfinancialLiabilities",
@@ -1207,7 +1261,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "NoncurrentLiabilities": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="NoncurrentLiabilities",
             element_id="sg-as_NoncurrentLiabilities",
@@ -1220,7 +1274,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "Liabilities": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="Liabilities",
             element_id="sg-as_Liabilities",
@@ -1233,7 +1287,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "EquityAbstract": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="EquityAbstract",
             element_id="sg-as_EquityAbstract",
@@ -1246,7 +1300,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "ShareCapital": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="ShareCapital",
             element_id="sg-as_ShareCapital",
@@ -1259,7 +1313,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "TreasuryShares": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="TreasuryShares",
             element_id="sg-as_TreasuryShares",
@@ -1272,7 +1326,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "AccumulatedProfitsLosses": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="AccumulatedProfitsLosses",
             element_id="sg-as_AccumulatedProfitsLosses",
@@ -1285,7 +1339,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "ReservesOtherThanAccumulatedProfitsLosses": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="ReservesOtherThanAccumulatedProfitsLosses",
             element_id="sg-as_ReservesOtherThanAccumulatedProfitsLosses",
@@ -1298,7 +1352,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "NoncontrollingInterests": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="NoncontrollingInterests",
             element_id="sg-as_NoncontrollingInterests",
@@ -1311,7 +1365,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
         )
     ],
     "Equity": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="Equity",
             element_id="sg-as_Equity",
@@ -1327,7 +1381,7 @@ SG_XBRL_FINANCIAL_POSITION_TAGS = {
 
 # statement-level tags
 SG_XBRL_FINANCIAL_POSITION_STATEMENT_TAGS = [
-    FinancialTag(
+    TagRecord(
         prefix="sg-as",
         element_name="StatementOfFinancialPositionLineItems",
         element_id="sg-as_StatementOfFinancialPositionLineItems",
@@ -1338,7 +1392,7 @@ SG_XBRL_FINANCIAL_POSITION_STATEMENT_TAGS = [
         substitution_group="xbrli:item",
         description="Parent container element for the entire statement of financial position"
     ),
-    FinancialTag(
+    TagRecord(
         prefix="sg-as",
         element_name="AssetsAbstract",
         element_id="sg-as_AssetsAbstract",
@@ -1349,7 +1403,7 @@ SG_XBRL_FINANCIAL_POSITION_STATEMENT_TAGS = [
         substitution_group="xbrli:item",
         description="Section container for all asset categories in the statement of financial position"
     ),
-    FinancialTag(
+    TagRecord(
         prefix="sg-as",
         element_name="LiabilitiesAbstract",
         element_id="sg-as_LiabilitiesAbstract",
@@ -1360,7 +1414,7 @@ SG_XBRL_FINANCIAL_POSITION_STATEMENT_TAGS = [
         substitution_group="xbrli:item",
         description="Section container for all liability categories in the statement of financial position"
     ),
-    FinancialTag(
+    TagRecord(
         prefix="sg-as",
         element_name="EquityAbstract",
         element_id="sg-as_EquityAbstract",
@@ -1391,7 +1445,7 @@ MANDATORY_FINANCIAL_POSITION_TAGS = {
 
 SG_XBRL_INCOME_STATEMENT_TAGS = {
     "StatementOfProfitOrLossLineItems": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="StatementOfProfitOrLossLineItems",
             element_id="sg-as_StatementOfProfitOrLossLineItems",
@@ -1404,7 +1458,7 @@ SG_XBRL_INCOME_STATEMENT_TAGS = {
         )
     ],
     "ProfitLossAbstract": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="ProfitLossAbstract",
             element_id="sg-as_ProfitLossAbstract",
@@ -1417,7 +1471,7 @@ SG_XBRL_INCOME_STATEMENT_TAGS = {
         )
     ],
     "Revenue": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="Revenue",
             element_id="sg-as_Revenue",
@@ -1430,7 +1484,7 @@ SG_XBRL_INCOME_STATEMENT_TAGS = {
         )
     ],
     "OtherIncome": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="OtherIncome",
             element_id="sg-as_OtherIncome",
@@ -1443,7 +1497,7 @@ SG_XBRL_INCOME_STATEMENT_TAGS = {
         )
     ],
     "EmployeeBenefitsExpense": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="EmployeeBenefitsExpense",
             element_id="sg-as_EmployeeBenefitsExpense",
@@ -1456,7 +1510,7 @@ SG_XBRL_INCOME_STATEMENT_TAGS = {
         )
     ],
     "DepreciationExpense": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="DepreciationExpense",
             element_id="sg-as_DepreciationExpense",
@@ -1469,7 +1523,7 @@ SG_XBRL_INCOME_STATEMENT_TAGS = {
         )
     ],
     "AmortisationExpense": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="AmortisationExpense",
             element_id="sg-as_AmortisationExpense",
@@ -1482,7 +1536,7 @@ SG_XBRL_INCOME_STATEMENT_TAGS = {
         )
     ],
     "RepairsAndMaintenanceExpense": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="RepairsAndMaintenanceExpense",
             element_id="sg-as_RepairsAndMaintenanceExpense",
@@ -1495,7 +1549,7 @@ SG_XBRL_INCOME_STATEMENT_TAGS = {
         )
     ],
     "SalesAndMarketingExpense": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="SalesAndMarketingExpense",
             element_id="sg-as_SalesAndMarketingExpense",
@@ -1508,7 +1562,7 @@ SG_XBRL_INCOME_STATEMENT_TAGS = {
         )
     ],
     "OtherExpensesByNature": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="OtherExpensesByNature",
             element_id="sg-as_OtherExpensesByNature",
@@ -1521,7 +1575,7 @@ SG_XBRL_INCOME_STATEMENT_TAGS = {
         )
     ],
     "OtherGainsLosses": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="OtherGainsLosses",
             element_id="sg-as_OtherGainsLosses",
@@ -1534,7 +1588,7 @@ SG_XBRL_INCOME_STATEMENT_TAGS = {
         )
     ],
     "FinanceCosts": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="FinanceCosts",
             element_id="sg-as_FinanceCosts",
@@ -1547,7 +1601,7 @@ SG_XBRL_INCOME_STATEMENT_TAGS = {
         )
     ],
     "ShareOfProfitLossOfAssociatesAndJointVenturesAccountedForUsingEquityMethod": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="ShareOfProfitLossOfAssociatesAndJointVenturesAccountedForUsingEquityMethod",
             element_id="sg-as_ShareOfProfitLossOfAssociatesAndJointVenturesAccountedForUsingEquityMethod",
@@ -1560,7 +1614,7 @@ SG_XBRL_INCOME_STATEMENT_TAGS = {
         )
     ],
     "ProfitLossBeforeTaxation": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="ProfitLossBeforeTaxation",
             element_id="sg-as_ProfitLossBeforeTaxation",
@@ -1573,7 +1627,7 @@ SG_XBRL_INCOME_STATEMENT_TAGS = {
         )
     ],
     "TaxExpenseBenefitContinuingOperations": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="TaxExpenseBenefitContinuingOperations",
             element_id="sg-as_TaxExpenseBenefitContinuingOperations",
@@ -1586,7 +1640,7 @@ SG_XBRL_INCOME_STATEMENT_TAGS = {
         )
     ],
     "ProfitLossFromDiscontinuedOperations": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="ProfitLossFromDiscontinuedOperations",
             element_id="sg-as_ProfitLossFromDiscontinuedOperations",
@@ -1599,7 +1653,7 @@ SG_XBRL_INCOME_STATEMENT_TAGS = {
         )
     ],
     "ProfitLoss": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="ProfitLoss",
             element_id="sg-as_ProfitLoss",
@@ -1612,7 +1666,7 @@ SG_XBRL_INCOME_STATEMENT_TAGS = {
         )
     ],
     "ProfitLossAttributableToAbstract": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="ProfitLossAttributableToAbstract",
             element_id="sg-as_ProfitLossAttributableToAbstract",
@@ -1625,7 +1679,7 @@ SG_XBRL_INCOME_STATEMENT_TAGS = {
         )
     ],
     "ProfitLossAttributableToOwnersOfCompany": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="ProfitLossAttributableToOwnersOfCompany",
             element_id="sg-as_ProfitLossAttributableToOwnersOfCompany",
@@ -1638,7 +1692,7 @@ SG_XBRL_INCOME_STATEMENT_TAGS = {
         )
     ],
     "ProfitLossAttributableToNoncontrollingInterests": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="ProfitLossAttributableToNoncontrollingInterests",
             element_id="sg-as_ProfitLossAttributableToNoncontrollingInterests",
@@ -1654,7 +1708,7 @@ SG_XBRL_INCOME_STATEMENT_TAGS = {
 
 # statement-level tags
 SG_XBRL_INCOME_STATEMENT_STATEMENT_TAGS = [
-    FinancialTag(
+    TagRecord(
         prefix="sg-as",
         element_name="StatementOfProfitOrLossLineItems",
         element_id="sg-as_StatementOfProfitOrLossLineItems",
@@ -1665,7 +1719,7 @@ SG_XBRL_INCOME_STATEMENT_STATEMENT_TAGS = [
         substitution_group="xbrli:item",
         description="Parent container element for the entire statement of profit or loss"
     ),
-    FinancialTag(
+    TagRecord(
         prefix="sg-as",
         element_name="ProfitLossAbstract",
         element_id="sg-as_ProfitLossAbstract",
@@ -1676,7 +1730,7 @@ SG_XBRL_INCOME_STATEMENT_STATEMENT_TAGS = [
         substitution_group="xbrli:item",
         description="Section container for the main profit or loss components"
     ),
-    FinancialTag(
+    TagRecord(
         prefix="sg-as",
         element_name="ProfitLossAttributableToAbstract",
         element_id="sg-as_ProfitLossAttributableToAbstract",
@@ -1703,7 +1757,7 @@ MANDATORY_INCOME_STATEMENT_TAGS = {
 
 SG_XBRL_RECEIVABLES_TAGS = {
     "TradeAndOtherReceivablesAbstract": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="TradeAndOtherReceivablesAbstract",
             element_id="sg-as_TradeAndOtherReceivablesAbstract",
@@ -1716,7 +1770,7 @@ SG_XBRL_RECEIVABLES_TAGS = {
         )
     ],
     "DisclosureOfDetailedInformationAboutTradeAndOtherReceivablesTable": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="DisclosureOfDetailedInformationAboutTradeAndOtherReceivablesTable",
             element_id="sg-as_DisclosureOfDetailedInformationAboutTradeAndOtherReceivablesTable",
@@ -1729,7 +1783,7 @@ SG_XBRL_RECEIVABLES_TAGS = {
         )
     ],
     "ConsolidatedAndSeparateFinancialStatementsAxis": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="ConsolidatedAndSeparateFinancialStatementsAxis",
             element_id="sg-as_ConsolidatedAndSeparateFinancialStatementsAxis",
@@ -1742,7 +1796,7 @@ SG_XBRL_RECEIVABLES_TAGS = {
         )
     ],
     "DisclosureOfDetailedInformationAboutTradeAndOtherReceivablesLineItems": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="DisclosureOfDetailedInformationAboutTradeAndOtherReceivablesLineItems",
             element_id="sg-as_DisclosureOfDetailedInformationAboutTradeAndOtherReceivablesLineItems",
@@ -1755,7 +1809,7 @@ SG_XBRL_RECEIVABLES_TAGS = {
         )
     ],
     "TradeAndOtherReceivablesDueFromThirdParties": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="TradeAndOtherReceivablesDueFromThirdParties",
             element_id="sg-as_TradeAndOtherReceivablesDueFromThirdParties",
@@ -1768,7 +1822,7 @@ SG_XBRL_RECEIVABLES_TAGS = {
         )
     ],
     "TradeAndOtherReceivablesDueFromRelatedParties": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="TradeAndOtherReceivablesDueFromRelatedParties",
             element_id="sg-as_TradeAndOtherReceivablesDueFromRelatedParties",
@@ -1781,7 +1835,7 @@ SG_XBRL_RECEIVABLES_TAGS = {
         )
     ],
     "UnbilledReceivables": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="UnbilledReceivables",
             element_id="sg-as_UnbilledReceivables",
@@ -1794,7 +1848,7 @@ SG_XBRL_RECEIVABLES_TAGS = {
         )
     ],
     "OtherReceivables": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="OtherReceivables",
             element_id="sg-as_OtherReceivables",
@@ -1807,7 +1861,7 @@ SG_XBRL_RECEIVABLES_TAGS = {
         )
     ],
     "TradeAndOtherReceivables": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="TradeAndOtherReceivables",
             element_id="sg-as_TradeAndOtherReceivables",
@@ -1823,7 +1877,7 @@ SG_XBRL_RECEIVABLES_TAGS = {
 
 # statement-level tags
 SG_XBRL_RECEIVABLES_STATEMENT_TAGS = [
-    FinancialTag(
+    TagRecord(
         prefix="sg-as",
         element_name="TradeAndOtherReceivablesAbstract",
         element_id="sg-as_TradeAndOtherReceivablesAbstract",
@@ -1834,7 +1888,7 @@ SG_XBRL_RECEIVABLES_STATEMENT_TAGS = [
         substitution_group="xbrli:item",
         description="Parent container for the entire trade and other receivables note"
     ),
-    FinancialTag(
+    TagRecord(
         prefix="sg-as",
         element_name="DisclosureOfDetailedInformationAboutTradeAndOtherReceivablesLineItems",
         element_id="sg-as_DisclosureOfDetailedInformationAboutTradeAndOtherReceivablesLineItems",
@@ -1857,7 +1911,7 @@ MANDATORY_RECEIVABLES_TAGS = {
 
 SG_XBRL_PAYABLES_TAGS = {
     "TradeAndOtherPayablesAbstract": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="TradeAndOtherPayablesAbstract",
             element_id="sg-as_TradeAndOtherPayablesAbstract",
@@ -1870,7 +1924,7 @@ SG_XBRL_PAYABLES_TAGS = {
         )
     ],
     "DisclosureOfDetailedInformationAboutTradeAndOtherPayablesTable": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="DisclosureOfDetailedInformationAboutTradeAndOtherPayablesTable",
             element_id="sg-as_DisclosureOfDetailedInformationAboutTradeAndOtherPayablesTable",
@@ -1883,7 +1937,7 @@ SG_XBRL_PAYABLES_TAGS = {
         )
     ],
     "ConsolidatedAndSeparateFinancialStatementsAxis": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="ConsolidatedAndSeparateFinancialStatementsAxis",
             element_id="sg-as_ConsolidatedAndSeparateFinancialStatementsAxis",
@@ -1896,7 +1950,7 @@ SG_XBRL_PAYABLES_TAGS = {
         )
     ],
     "DisclosureOfDetailedInformationAboutTradeAndOtherPayablesLineItems": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="DisclosureOfDetailedInformationAboutTradeAndOtherPayablesLineItems",
             element_id="sg-as_DisclosureOfDetailedInformationAboutTradeAndOtherPayablesLineItems",
@@ -1909,7 +1963,7 @@ SG_XBRL_PAYABLES_TAGS = {
         )
     ],
     "TradeAndOtherPayablesDueToThirdParties": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="TradeAndOtherPayablesDueToThirdParties",
             element_id="sg-as_TradeAndOtherPayablesDueToThirdParties",
@@ -1922,7 +1976,7 @@ SG_XBRL_PAYABLES_TAGS = {
         )
     ],
     "TradeAndOtherPayablesDueToRelatedParties": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="TradeAndOtherPayablesDueToRelatedParties",
             element_id="sg-as_TradeAndOtherPayablesDueToRelatedParties",
@@ -1935,7 +1989,7 @@ SG_XBRL_PAYABLES_TAGS = {
         )
     ],
     "DeferredIncome": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="DeferredIncome",
             element_id="sg-as_DeferredIncome",
@@ -1948,7 +2002,7 @@ SG_XBRL_PAYABLES_TAGS = {
         )
     ],
     "OtherPayables": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="OtherPayables",
             element_id="sg-as_OtherPayables",
@@ -1961,7 +2015,7 @@ SG_XBRL_PAYABLES_TAGS = {
         )
     ],
     "TradeAndOtherPayables": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="TradeAndOtherPayables",
             element_id="sg-as_TradeAndOtherPayables",
@@ -1977,7 +2031,7 @@ SG_XBRL_PAYABLES_TAGS = {
 
 # statement-level tags
 SG_XBRL_PAYABLES_STATEMENT_TAGS = [
-    FinancialTag(
+    TagRecord(
         prefix="sg-as",
         element_name="TradeAndOtherPayablesAbstract",
         element_id="sg-as_TradeAndOtherPayablesAbstract",
@@ -1988,7 +2042,7 @@ SG_XBRL_PAYABLES_STATEMENT_TAGS = [
         substitution_group="xbrli:item",
         description="Parent container for the entire trade and other payables note"
     ),
-    FinancialTag(
+    TagRecord(
         prefix="sg-as",
         element_name="DisclosureOfDetailedInformationAboutTradeAndOtherPayablesLineItems",
         element_id="sg-as_DisclosureOfDetailedInformationAboutTradeAndOtherPayablesLineItems",
@@ -2011,7 +2065,7 @@ MANDATORY_PAYABLES_TAGS = {
 
 SG_XBRL_REVENUE_TAGS = {
     "DisclosureOfRevenueAbstract": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="DisclosureOfRevenueAbstract",
             element_id="sg-as_DisclosureOfRevenueAbstract",
@@ -2024,7 +2078,7 @@ SG_XBRL_REVENUE_TAGS = {
         )
     ],
     "DisclosureOfRevenueTable": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="DisclosureOfRevenueTable",
             element_id="sg-as_DisclosureOfRevenueTable",
@@ -2037,7 +2091,7 @@ SG_XBRL_REVENUE_TAGS = {
         )
     ],
     "ConsolidatedAndSeparateFinancialStatementsAxis": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="ConsolidatedAndSeparateFinancialStatementsAxis",
             element_id="sg-as_ConsolidatedAndSeparateFinancialStatementsAxis",
@@ -2050,7 +2104,7 @@ SG_XBRL_REVENUE_TAGS = {
         )
     ],
     "DisclosureOfRevenueLineItems": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="DisclosureOfRevenueLineItems",
             element_id="sg-as_DisclosureOfRevenueLineItems",
@@ -2063,7 +2117,7 @@ SG_XBRL_REVENUE_TAGS = {
         )
     ],
     "RevenueAbstract": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="RevenueAbstract",
             element_id="sg-as_RevenueAbstract",
@@ -2076,7 +2130,7 @@ SG_XBRL_REVENUE_TAGS = {
         )
     ],
     "RevenueFromPropertyTransferredAtPointInTime": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="RevenueFromPropertyTransferredAtPointInTime",
             element_id="sg-as_RevenueFromPropertyTransferredAtPointInTime",
@@ -2089,7 +2143,7 @@ SG_XBRL_REVENUE_TAGS = {
         )
     ],
     "RevenueFromGoodsTransferredAtPointInTime": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="RevenueFromGoodsTransferredAtPointInTime",
             element_id="sg-as_RevenueFromGoodsTransferredAtPointInTime",
@@ -2102,7 +2156,7 @@ SG_XBRL_REVENUE_TAGS = {
         )
     ],
     "RevenueFromServicesTransferredAtPointInTime": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="RevenueFromServicesTransferredAtPointInTime",
             element_id="sg-as_RevenueFromServicesTransferredAtPointInTime",
@@ -2115,7 +2169,7 @@ SG_XBRL_REVENUE_TAGS = {
         )
     ],
     "RevenueFromPropertyTransferredOverTime": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="RevenueFromPropertyTransferredOverTime",
             element_id="sg-as_RevenueFromPropertyTransferredOverTime",
@@ -2128,7 +2182,7 @@ SG_XBRL_REVENUE_TAGS = {
         )
     ],
     "RevenueFromConstructionContractsOverTime": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="RevenueFromConstructionContractsOverTime",
             element_id="sg-as_RevenueFromConstructionContractsOverTime",
@@ -2141,7 +2195,7 @@ SG_XBRL_REVENUE_TAGS = {
         )
     ],
     "RevenueFromServicesTransferredOverTime": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="RevenueFromServicesTransferredOverTime",
             element_id="sg-as_RevenueFromServicesTransferredOverTime",
@@ -2154,7 +2208,7 @@ SG_XBRL_REVENUE_TAGS = {
         )
     ],
     "OtherRevenue": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="OtherRevenue",
             element_id="sg-as_OtherRevenue",
@@ -2167,7 +2221,7 @@ SG_XBRL_REVENUE_TAGS = {
         )
     ],
     "Revenue": [
-        FinancialTag(
+        TagRecord(
             prefix="sg-as",
             element_name="Revenue",
             element_id="sg-as_Revenue",
@@ -2183,7 +2237,7 @@ SG_XBRL_REVENUE_TAGS = {
 
 # statement-level tags
 SG_XBRL_REVENUE_STATEMENT_TAGS = [
-    FinancialTag(
+    TagRecord(
         prefix="sg-as",
         element_name="DisclosureOfRevenueAbstract",
         element_id="sg-as_DisclosureOfRevenueAbstract",
@@ -2194,7 +2248,7 @@ SG_XBRL_REVENUE_STATEMENT_TAGS = [
         substitution_group="xbrli:item",
         description="Parent container for the entire revenue note"
     ),
-    FinancialTag(
+    TagRecord(
         prefix="sg-as",
         element_name="RevenueAbstract",
         element_id="sg-as_RevenueAbstract",
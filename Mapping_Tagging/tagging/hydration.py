@@ -0,0 +1,115 @@
+"""
+Tagging result schema with element ids only, hydrated into full tags from the taxonomy.
+"""
+from typing import Any, Dict, List, Optional, Set, Tuple, Type, Union, get_args, get_origin
+from pydantic import BaseModel, ConfigDict, Field, create_model
+
+from .models import FinancialTag, PartialXBRLWithTags, TaggedValue
+from .records import TagRecord, as_model
+
+
+class TaggedIdValue(BaseModel):
+    """A financial value with the element ids of its XBRL tags"""
+    value: Any = Field(..., description="The financial value")
+    tag_ids: List[str] = Field(default_factory=list, description="Element ids of the tags (e.g. 'sg-as_Revenue')")
+
+
+def _is_optional(annotation: Any) -> bool:
+    """Whether an annotation is Optional[...]"""
+    return get_origin(annotation) is Union and type(None) in get_args(annotation)
+
+
+def _base_type(annotation: Any) -> Any:
+    """The annotation without Optional"""
+    if _is_optional(annotation):
+        return next(arg for arg in get_args(annotation) if arg is not type(None))
+    return annotation
+
+
+def tag_id_model(model: Type[BaseModel]) -> Type[BaseModel]:
+    """
+    Mirror of a tagged schema model in which tags are referenced by element id.
+    
+    TaggedValue fields become TaggedIdValue fields and meta_tags lists become lists of
+    element ids; section models are mirrored recursively. Optionality and defaults are kept.
+    
+    Args:
+        model: Tagged schema model (e.g. PartialXBRLWithTags)
+    
+    Returns:
+        The id-only model, named after the original with "WithTags" replaced by "WithTagIds"
+    """
+    fields: Dict[str, Any] = {}
+    for name, info in model.model_fields.items():
+        base = _base_type(info.annotation)
+        if base is TaggedValue:
+            annotation = TaggedIdValue
+        elif get_origin(base) is list and get_args(base) == (FinancialTag,):
+            annotation = List[str]
+        elif isinstance(base, type) and issubclass(base, BaseModel):
+            annotation = tag_id_model(base)
+        else:
+            annotation = base
+        if _is_optional(info.annotation):
+            annotation = Optional[annotation]
+        
+        if info.is_required():
+            fields[name] = (annotation, Field(..., description=info.description))
+        elif info.default_factory is not None:
+            fields[name] = (annotation, Field(default_factory=list, description=info.description))
+        else:
+            fields[name] = (annotation, Field(None, description=info.description))
+    
+    name = model.__name__.replace("WithTags", "WithTagIds")
+    return create_model(name, __config__=ConfigDict(**model.model_config), __doc__=model.__doc__,
+                        __module__=__name__, **fields)
+
+
+def hydrate_tags(result: BaseModel, elements: Dict[str, Union[TagRecord, FinancialTag]],
+                 model: Type[BaseModel] = PartialXBRLWithTags) -> Tuple[BaseModel, List[str]]:
+    """
+    Build the full tagged model from an id-only result.
+    
+    Args:
+        result: Instance of tag_id_model(model), as returned by the agent
+        elements: Taxonomy tags by element_id (records are materialized once, on first use)
+        model: Tagged schema model to build
+    
+    Returns:
+        Tuple of (model instance with complete tags, element ids not found in the taxonomy)
+    """
+    unknown: Set[str] = set()
+    
+    def tags_of(ids: List[str]) -> List[FinancialTag]:
+        tags = []
+        for element_id in ids:
+            tag = elements.get(element_id)
+            if tag is None:
+                unknown.add(element_id)
+            else:
+                tags.append(as_model(tag))
+        return tags
+    
+    def hydrate(source: BaseModel, target_model: Type[BaseModel]) -> BaseModel:
+        values = {}
+        for name, info in target_model.model_fields.items():
+            item = getattr(source, name)
+            base = _base_type(info.annotation)
+            if item is None:
+                values[name] = None
+            elif base is TaggedValue:
+                values[name] = TaggedValue(value=item.value, tags=tags_of(item.tag_ids))
+            elif get_origin(base) is list and get_args(base) == (FinancialTag,):
+                values[name] = tags_of(item)
+            elif isinstance(base, type) and issubclass(base, BaseModel):
+                values[name] = hydrate(item, base)
+            else:
+                values[name] = item
+        return target_model(**values)
+    
+    hydrated = hydrate(result, model)
+    return hydrated, sorted(unknown)
+
+
+# Result schema of the tagging agent
+PartialXBRLWithTagIds = tag_id_model(PartialXBRLWithTags)
@@ -0,0 +1,167 @@
+"""
+Indexed lookup of taxonomy tags by (approximate) element name.
+"""
+from bisect import bisect_left
+import heapq
+from typing import Any, Dict, Iterable, List, Set, Tuple
+import re
+
+# Names sharing words but neither containing the other are candidates from this Jaccard similarity
+TOKEN_MIN_SIMILARITY = 0.5
+
+# Weights of the word Jaccard similarity, the share of the looked-up words found in a key and
+# the length ratio of a containment; they add up to 1, the score of an exact match
+JACCARD_WEIGHT = 0.5
+RECALL_WEIGHT = 0.25
+CONTAINMENT_WEIGHT = 0.25
+
+_TOKEN = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+
+def name_tokens(name: str) -> Set[str]:
+    """
+    Lowercase words of a CamelCase, snake_case or spaced name.
+    
+    "Non" is joined to the next word, so "NonCurrent" and "Noncurrent" give the same word.
+    """
+    tokens: Set[str] = set()
+    pending = ""
+    for token in _TOKEN.findall(name):
+        token = pending + token.lower()
+        pending = ""
+        if token == "non":
+            pending = token
+        else:
+            tokens.add(token)
+    if pending:
+        tokens.add(pending)
+    return tokens
+
+
+class TagLookupIndex:
+    """
+    Lookup structures over the element names of a taxonomy, built once per taxonomy.
+    
+    - exact: lowercase name -> key
+    - suffixes: sorted suffixes of every lowercase name, to find the names containing a
+      string with a binary search
+    - trie: lowercase names by character, to find the names contained in a string by
+      walking it from each position
+    - tokens: word -> keys using it
+    
+    Candidates are keys that contain the name, are contained in it, or share enough of its
+    words. They are ranked by a score, then by key, so the result does not depend on
+    dictionary order. A case-insensitive exact match scores 1. Any other candidate scores
+    the weighted sum of its word Jaccard similarity, the share of the name's words it has,
+    and the length ratio of a containment, so a short key contained in the name (such as
+    "Liabilities") ranks below a longer key with most of the name's words.
+    """
+    
+    def __init__(self, keys: Iterable[str]):
+        """
+        Build the index.
+        
+        Args:
+            keys: Element names of the taxonomy (e.g. the keys of field_tags)
+        """
+        self.keys: List[str] = sorted(set(keys))
+        self.lower: List[str] = [key.lower() for key in self.keys]
+        
+        self.exact: Dict[str, int] = {}
+        for key_id, lower in enumerate(self.lower):
+            self.exact.setdefault(lower, key_id)
+        
+        suffixes = sorted(
+            (lower[start:], key_id) for key_id, lower in enumerate(self.lower) for start in range(len(lower))
+        )
+        self.suffixes: List[str] = [suffix for suffix, _ in suffixes]
+        self.suffix_keys: List[int] = [key_id for _, key_id in suffixes]
+        
+        self.trie: Dict[str, Any] = {}
+        for key_id, lower in enumerate(self.lower):
+            node = self.trie
+            for char in lower:
+                node = node.setdefault(char, {})
+            node.setdefault("", key_id)
+        
+        self.key_tokens: List[Set[str]] = [name_tokens(key) for key in self.keys]
+        self.tokens: Dict[str, List[int]] = {}
+        for key_id, tokens in enumerate(self.key_tokens):
+            for token in tokens:
+                self.tokens.setdefault(token, []).append(key_id)
+    
+    def _containing(self, text: str) -> Set[int]:
+        """Keys whose lowercase name contains text"""
+        found = set()
+        position = bisect_left(self.suffixes, text)
+        while position < len(self.suffixes) and self.suffixes[position].startswith(text):
+            found.add(self.suffix_keys[position])
+            position += 1
+        return found
+    
+    def _contained(self, text: str) -> Set[int]:
+        """Keys whose lowercase name is a substring of text"""
+        found = set()
+        for start in range(len(text)):
+            node = self.trie
+            for char in text[start:]:
+                node = node.get(char)
+                if node is None:
+                    break
+                if "" in node:
+                    found.add(node[""])
+        return found
+    
+    def candidates(self, name: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """
+        Ranked keys matching an element name.
+        
+        Args:
+            name: Element name to look up
+            limit: Maximum number of candidates
+        
+        Returns:
+            Up to limit (key, score) pairs, best first
+        """
+        lower = name.lower()
+        scores: Dict[int, float] = {}
+        
+        # Word Jaccard similarity and word score of every key sharing a word with the name
+        tokens = name_tokens(name)
+        shared: Dict[int, int] = {}
+        for token in tokens:
+            for key_id in self.tokens.get(token, ()):
+                shared[key_id] = shared.get(key_id, 0) + 1
+        similarities: Dict[int, float] = {}
+        word_scores: Dict[int, float] = {}
+        for key_id, count in shared.items():
+            similarity = count / (len(tokens) + len(self.key_tokens[key_id]) - count)
+            similarities[key_id] = similarity
+            word_scores[key_id] = JACCARD_WEIGHT * similarity + RECALL_WEIGHT * count / len(tokens)
+        
+        if lower:
+            for key_id in self._containing(lower) | self._contained(lower):
+                key_length = len(self.lower[key_id])
+                ratio = min(key_length, len(lower)) / max(key_length, len(lower))
+                scores[key_id] = word_scores.get(key_id, 0.0) + CONTAINMENT_WEIGHT * ratio
+        
+        for key_id, similarity in similarities.items():
+            if key_id not in scores and similarity >= TOKEN_MIN_SIMILARITY:
+                scores[key_id] = word_scores[key_id]
+        
+        key_id = self.exact.get(lower)
+        if key_id is not None:
+            scores[key_id] = 1.0
+        
+        ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(self.keys[key_id], round(score, 4)) for key_id, score in ranked]
+    
+    def best(self, name: str) -> Tuple[str, float]:
+        """
+        Best matching key for an element name.
+        
+        Returns:
+            (key, score), or ("", 0.0) if nothing matches
+        """
+        found = self.candidates(name, limit=1)
+        return found[0] if found else ("", 0.0)
@@ -1,8 +1,9 @@
 """
 Models for XBRL tagging operations.
 """
-from pydantic import BaseModel, Field
-from typing import Dict, Any, List, Optional
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union, get_args, get_origin
+import weakref
 
 
 class FinancialTag(BaseModel):
@@ -17,7 +18,61 @@ class FinancialTag(BaseModel):
     substitution_group: str = Field("xbrli:item", description="XBRL substitution group")
 
 
-class TaggedValue(BaseModel):
+# Private attributes of the tagged models that only track cached tag tables
+_BOOKKEEPING = ("_owners", "_tags_cache")
+
+class TrackedModel(BaseModel):
+    """
+    Base of the tagged schema models: field assignments invalidate cached tag tables.
+    
+    Each model knows the documents whose cached tag table was collected through it, and
+    only their caches are dropped when it changes.
+    """
+    # id() -> weak reference of each TagTableModel whose cached tags were read through this model
+    _owners: Optional[Dict[int, "weakref.ref"]] = PrivateAttr(default=None)
+    
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if not name.startswith("_"):
+            self.mark_mutation()
+    
+    def __eq__(self, other):
+        # The private attributes only hold cache bookkeeping, so they are left out
+        if isinstance(other, TrackedModel) and type(self) is type(other):
+            return (self.__dict__ == other.__dict__
+                    and (self.__pydantic_extra__ or {}) == (other.__pydantic_extra__ or {}))
+        return super().__eq__(other)
+    
+    def __getstate__(self):
+        # The cache bookkeeping holds weak references, which cannot be pickled; a copy
+        # collects its tags again on first use anyway
+        state = super().__getstate__()
+        private = state.get("__pydantic_private__")
+        if private:
+            state["__pydantic_private__"] = {name: None if name in _BOOKKEEPING else value
+                                             for name, value in private.items()}
+        return state
+    
+    def add_owner(self, owner: "TagTableModel") -> None:
+        """Register a document whose cached tag table depends on this model"""
+        owners = self._owners
+        if owners is None:
+            owners = self._owners = {}
+        if id(owner) not in owners:
+            owners[id(owner)] = weakref.ref(owner)
+    
+    def mark_mutation(self) -> None:
+        """Invalidate the cached tag tables of the documents containing this model"""
+        owners = self._owners
+        if not owners:
+            return
+        for reference in owners.values():
+            owner = reference()
+            if owner is not None:
+                owner._tags_cache = None
+        owners.clear()
+
+class TaggedValue(TrackedModel):
     """A financial value with associated XBRL tags"""
     value: Any = Field(..., description="The financial value")
     tags: List[FinancialTag] = Field(default_factory=list, description="Tags associated with this element name")
@@ -25,16 +80,102 @@ class TaggedValue(BaseModel):
     def add_tag(self, tag: FinancialTag) -> None:
         """Add a tag to this value"""
         self.tags.append(tag)
+        self.mark_mutation()
         
     def __str__(self):
         """String representation of the value"""
         return f"{self.value}"
 
+def _model_type(annotation: Any) -> Any:
+    """The annotation without Optional"""
+    if get_origin(annotation) is Union:
+        return next(arg for arg in get_args(annotation) if arg is not type(None))
+    return annotation
+
+def tagged_value_paths(model: type, prefix: str = "") -> List[Tuple[str, Tuple[str, ...]]]:
+    """
+    Field paths of the TaggedValue fields of a model and its sections, in declaration order.
+    
+    Args:
+        model: Tagged model class
+        prefix: Path of the model within the document
+    
+    Returns:
+        List of (dotted path, attribute names leading to the field)
+    """
+    paths = []
+    for name, info in model.model_fields.items():
+        if name == "meta_tags":
+            continue
+        annotation = _model_type(info.annotation)
+        path = f"{prefix}.{name}" if prefix else name
+        if annotation is TaggedValue:
+            paths.append((path, tuple(path.split("."))))
+        elif isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            paths.extend(tagged_value_paths(annotation, path))
+    return paths
+
+# Tag path table of each TagTableModel class, built on first use
+_tag_path_tables: Dict[type, Tuple[Tuple[str, Tuple[str, ...]], ...]] = {}
+
+class TagTableModel(TrackedModel):
+    """
+    Tagged model whose tags can be listed by field path.
+    
+    The paths are read from the class once (tag_paths) and the tags of an instance are
+    collected once; the result is reused until one of the models it was read from is changed
+    by assignment, add_tag() or add_meta_tag(). Changes to other documents keep it.
+    """
+    # (weak reference of the instance that collected it, tags by path); copies recollect
+    _tags_cache: Optional[Tuple["weakref.ref", Dict[str, List[FinancialTag]]]] = PrivateAttr(default=None)
+    
+    @classmethod
+    def tag_paths(cls) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+        """Result keys and the attribute names leading to their tags, in result order"""
+        table = _tag_path_tables.get(cls)
+        if table is None:
+            table = _tag_path_tables[cls] = tuple(cls.build_tag_paths())
+        return table
+    
+    @classmethod
+    def build_tag_paths(cls) -> List[Tuple[str, Tuple[str, ...]]]:
+        """Compute the tag path table of the class"""
+        return tagged_value_paths(cls)
+    
+    def iter_tags(self, owner: Optional["TagTableModel"] = None) -> Iterator[Tuple[str, List[FinancialTag]]]:
+        """
+        Yield (field path, tags) for every field or section that has tags.
+        
+        Args:
+            owner: Document to register on every model read, so changes to them drop its cache
+        """
+        if owner is not None:
+            self.add_owner(owner)
+        for path, attributes in self.tag_paths():
+            target = self
+            for attribute in attributes:
+                target = getattr(target, attribute, None)
+                if target is None:
+                    break
+                if owner is not None and isinstance(target, TrackedModel):
+                    target.add_owner(owner)
+            tags = target.tags if isinstance(target, TaggedValue) else target
+            if tags:
+                yield path, tags
+    
+    def get_all_tags(self) -> Dict[str, List[FinancialTag]]:
+        """Get all tags organized by field path"""
+        cached = self._tags_cache
+        if cached is None or cached[0]() is not self:
+            cached = (weakref.ref(self), dict(self.iter_tags(owner=self)))
+            self._tags_cache = cached
+        return dict(cached[1])
+
 #----------------------------------------------------------------------------------------------------------------------------------------------
 # FILLING INFORMATION
 #----------------------------------------------------------------------------------------------------------------------------------------------
 
-class FilingInformationWithTags(BaseModel):
+class FilingInformationWithTags(TrackedModel):
     """Filing information with tags"""
     NameOfCompany: TaggedValue
     UniqueEntityNumber: TaggedValue
@@ -62,14 +203,14 @@ class FilingInformationWithTags(BaseModel):
     meta_tags: List[FinancialTag] = Field(default_factory=list, description="Tags for the entire filing information")
 
 
-class DirectorsStatementWithTags(BaseModel):
+class DirectorsStatementWithTags(TrackedModel):
     """Directors' statement with tags"""
     WhetherInDirectorsOpinionFinancialStatementsAreDrawnUpSoAsToExhibitATrueAndFairView: TaggedValue
     WhetherThereAreReasonableGroundsToBelieveThatCompanyWillBeAbleToPayItsDebtsAsAndWhenTheyFallDueAtDateOfStatement: TaggedValue
     meta_tags: List[FinancialTag] = Field(default_factory=list, description="Tags for the entire directors' statement")
 
 
-class AuditReportWithTags(BaseModel):
+class AuditReportWithTags(TrackedModel):
     """Audit report with tags"""
     TypeOfAuditOpinionInIndependentAuditorsReport: TaggedValue
     AuditingStandardsUsedToConductTheAudit: Optional[TaggedValue] = None
@@ -82,7 +223,7 @@ class AuditReportWithTags(BaseModel):
 #----------------------------------------------------------------------------------------------------------------------------------------------
 
 # Current Assets with Tags
-class CurrentAssetsWithTags(BaseModel):
+class CurrentAssetsWithTags(TrackedModel):
     """Current assets section with tags"""
     CashAndBankBalances: Optional[TaggedValue] = None
     TradeAndOtherReceivablesCurrent: Optional[TaggedValue] = None
@@ -98,7 +239,7 @@ class CurrentAssetsWithTags(BaseModel):
     
 
 # Non-Current Assets with Tags
-class NonCurrentAssetsWithTags(BaseModel):
+class NonCurrentAssetsWithTags(TrackedModel):
     """Non-current assets section with tags"""
     TradeAndOtherReceivablesNoncurrent: Optional[TaggedValue] = None
     NoncurrentFinanceLeaseReceivables: Optional[TaggedValue] = None
@@ -116,7 +257,7 @@ class NonCurrentAssetsWithTags(BaseModel):
 
 
 # Current Liabilities with Tags
-class CurrentLiabilitiesWithTags(BaseModel):
+class CurrentLiabilitiesWithTags(TrackedModel):
     """Current liabilities section with tags"""
     TradeAndOtherPayablesCurrent: Optional[TaggedValue] = None
     CurrentLoansAndBorrowings: Optional[TaggedValue] = None
@@ -131,7 +272,7 @@ class CurrentLiabilitiesWithTags(BaseModel):
 
 
 # Non-Current Liabilities with Tags
-class NonCurrentLiabilitiesWithTags(BaseModel):
+class NonCurrentLiabilitiesWithTags(TrackedModel):
     """Non-current liabilities section with tags"""
     TradeAndOtherPayablesNoncurrent: Optional[TaggedValue] = None
     NoncurrentLoansAndBorrowings: Optional[TaggedValue] = None
@@ -145,7 +286,7 @@ class NonCurrentLiabilitiesWithTags(BaseModel):
 
 
 # Equity with Tags
-class EquityWithTags(BaseModel):
+class EquityWithTags(TrackedModel):
     """Equity section with tags"""
     ShareCapital: TaggedValue
     TreasuryShares: Optional[TaggedValue] = None
@@ -156,7 +297,7 @@ class EquityWithTags(BaseModel):
 
 
 # Statement of Financial Position with Tags
-class StatementOfFinancialPositionWithTags(BaseModel):
+class StatementOfFinancialPositionWithTags(TagTableModel):
     """Statement of financial position with tags"""
     currentAssets: CurrentAssetsWithTags
     nonCurrentAssets: NonCurrentAssetsWithTags
@@ -191,41 +332,21 @@ class StatementOfFinancialPositionWithTags(BaseModel):
     def add_meta_tag(self, tag: FinancialTag) -> None:
         """Add a statement-level tag"""
         self.meta_tags.append(tag)
+        self.mark_mutation()
     
-    def get_all_tags(self) -> Dict[str, List[FinancialTag]]:
-        """Get all tags organized by field path"""
-        all_tags = {}
-        
-        # Add meta tags
-        if self.meta_tags:
-            all_tags["statement"] = self.meta_tags
-        
-        # Helper function to extract tags from a section
-        def extract_section_tags(section, prefix):
-            for field_name, field_value in section.__dict__.items():
-                if isinstance(field_value, TaggedValue) and field_value.tags:
-                    all_tags[f"{prefix}.{field_name}"] = field_value.tags
-        
-        # Extract tags from each section
-        extract_section_tags(self.currentAssets, "currentAssets")
-        extract_section_tags(self.nonCurrentAssets, "nonCurrentAssets")
-        extract_section_tags(self.currentLiabilities, "currentLiabilities")
-        extract_section_tags(self.nonCurrentLiabilities, "nonCurrentLiabilities")
-        extract_section_tags(self.equity, "equity")
-        
-        # Add top-level fields
-        if self.Assets.tags:
-            all_tags["Assets"] = self.Assets.tags
-        if self.Liabilities.tags:
-            all_tags["Liabilities"] = self.Liabilities.tags
-            
-        return all_tags
+    @classmethod
+    def build_tag_paths(cls) -> List[Tuple[str, Tuple[str, ...]]]:
+        """Statement tags, then the fields of each section, then the top-level totals"""
+        values = tagged_value_paths(cls)
+        return ([("statement", ("meta_tags",))]
+                + [entry for entry in values if len(entry[1]) > 1]
+                + [entry for entry in values if len(entry[1]) == 1])
 
 #----------------------------------------------------------------------------------------------------------------------------------------------
 # STATEMENT OF PROFIT OR LOSS
 #----------------------------------------------------------------------------------------------------------------------------------------------
 
-class StatementOfProfitOrLossWithTags(BaseModel):
+class StatementOfProfitOrLossWithTags(TrackedModel):
     """Statement of Profit or Loss that supports tags on each field"""
     revenue: TaggedValue
     other_income: Optional[TaggedValue] = None
@@ -251,7 +372,7 @@ class StatementOfProfitOrLossWithTags(BaseModel):
 #----------------------------------------------------------------------------------------------------------------------------------------------
 
 # Notes section with tags
-class TradeAndOtherReceivablesWithTags(BaseModel):
+class TradeAndOtherReceivablesWithTags(TrackedModel):
     """Trade and other receivables with tags"""
     TradeAndOtherReceivablesDueFromThirdParties: Optional[TaggedValue] = None
     TradeAndOtherReceivablesDueFromRelatedParties: Optional[TaggedValue] = None
@@ -260,7 +381,7 @@ class TradeAndOtherReceivablesWithTags(BaseModel):
     TradeAndOtherReceivables: TaggedValue
     meta_tags: List[FinancialTag] = Field(default_factory=list, description="Tags for trade and other receivables section")
 
-class TradeAndOtherPayablesWithTags(BaseModel):
+class TradeAndOtherPayablesWithTags(TrackedModel):
     """Trade and other payables with tags"""
     TradeAndOtherPayablesDueToThirdParties: Optional[TaggedValue] = None
     TradeAndOtherPayablesDueToRelatedParties: Optional[TaggedValue] = None
@@ -269,7 +390,7 @@ class TradeAndOtherPayablesWithTags(BaseModel):
     TradeAndOtherPayables: TaggedValue
     meta_tags: List[FinancialTag] = Field(default_factory=list, description="Tags for trade and other payables section")
 
-class RevenueWithTags(BaseModel):
+class RevenueWithTags(TrackedModel):
     """Revenue details with tags"""
     RevenueFromPropertyTransferredAtPointInTime: Optional[TaggedValue] = None
     RevenueFromGoodsTransferredAtPointInTime: Optional[TaggedValue] = None
@@ -281,7 +402,7 @@ class RevenueWithTags(BaseModel):
     Revenue: TaggedValue
     meta_tags: List[FinancialTag] = Field(default_factory=list, description="Tags for revenue section")
 
-class NotesWithTags(BaseModel):
+class NotesWithTags(TrackedModel):
     """Notes to financial statements with tags"""
     tradeAndOtherReceivables: TradeAndOtherReceivablesWithTags
     tradeAndOtherPayables: TradeAndOtherPayablesWithTags
@@ -295,7 +416,7 @@ class NotesWithTags(BaseModel):
 # COMBINED MODEL
 #----------------------------------------------------------------------------------------------------------------------------------------------
 
-class PartialXBRLWithTags(BaseModel):
+class PartialXBRLWithTags(TagTableModel):
     """Singapore XBRL schema with tags"""
     filingInformation: FilingInformationWithTags
     directorsStatement: DirectorsStatementWithTags
@@ -305,47 +426,11 @@ class PartialXBRLWithTags(BaseModel):
     notes: NotesWithTags
     meta_tags: List[FinancialTag] = Field(default_factory=list, description="Tags for the entire XBRL document")
     
-    def get_all_tags(self) -> Dict[str, List[FinancialTag]]:
-        """Get all tags organized by field path"""
-        all_tags = {}
-        
-        # Add document-level meta tags
-        if self.meta_tags:
-            all_tags["document"] = self.meta_tags
-            
-        # Add section-level meta tags
-        if self.filingInformation.meta_tags:
-            all_tags["filingInformation"] = self.filingInformation.meta_tags
-        if self.directorsStatement.meta_tags:
-            all_tags["directorsStatement"] = self.directorsStatement.meta_tags
-        if self.auditReport.meta_tags:
-            all_tags["auditReport"] = self.auditReport.meta_tags
-        if self.statementOfFinancialPosition.meta_tags:
-            all_tags["statementOfFinancialPosition"] = self.statementOfFinancialPosition.meta_tags
-        if self.incomeStatement.meta_tags:
-            all_tags["incomeStatement"] = self.incomeStatement.meta_tags
-        if self.notes.meta_tags:
-            all_tags["notes"] = self.notes.meta_tags
-            
-        # Add field-level tags from each section using a recursive helper function
-        def extract_tagged_values(obj, prefix=""):
-            for field_name, field_value in obj.__dict__.items():
-                if field_name == "meta_tags":
-                    continue
-                    
-                field_path = f"{prefix}.{field_name}" if prefix else field_name
-                
-                if isinstance(field_value, TaggedValue) and field_value.tags:
-                    all_tags[field_path] = field_value.tags
-                elif isinstance(field_value, BaseModel):
-                    extract_tagged_values(field_value, field_path)
-        
-        # Extract tags from each section
-        extract_tagged_values(self.filingInformation, "filingInformation")
-        extract_tagged_values(self.directorsStatement, "directorsStatement")
-        extract_tagged_values(self.auditReport, "auditReport")
-        extract_tagged_values(self.statementOfFinancialPosition, "statementOfFinancialPosition")
-        extract_tagged_values(self.incomeStatement, "incomeStatement") 
-        extract_tagged_values(self.notes, "notes")
-        
-        return all_tags
+    @classmethod
+    def build_tag_paths(cls) -> List[Tuple[str, Tuple[str, ...]]]:
+        """Document tags, then the tags of each section, then every tagged field"""
+        sections = [
+            (name, (name, "meta_tags")) for name, info in cls.model_fields.items()
+            if isinstance(info.annotation, type) and "meta_tags" in getattr(info.annotation, "model_fields", {})
+        ]
+        return [("document", ("meta_tags",))] + sections + tagged_value_paths(cls)
@@ -0,0 +1,117 @@
+"""
+Compact, immutable in-memory form of taxonomy tags.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Union
+import sys
+
+from .models import FinancialTag
+
+# Attributes of a tag, in FinancialTag field order
+TAG_FIELDS = tuple(FinancialTag.model_fields)
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Interned copy of a string, so repeated prefixes and types are stored once per process"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+class TagRecord:
+    """
+    Frozen, slotted record of a taxonomy tag.
+    
+    Takes a fraction of the memory of a FinancialTag model and shares its strings with
+    every other record. Reads like a FinancialTag (same attributes, dict() and model_dump());
+    to_model() builds the pydantic view once, when a response needs one.
+    """
+    __slots__ = TAG_FIELDS + ("_model",)
+    
+    def __init__(self, element_name: str, element_id: str, prefix: str = "sg-as", abstract: bool = False,
+                 data_type: str = "xbrli:monetaryItemType", balance_type: Optional[str] = None,
+                 period_type: str = "instant", substitution_group: str = "xbrli:item",
+                 description: Optional[str] = None):
+        # description documents the taxonomy literals only; like FinancialTag, records don't keep it
+        values = {
+            "prefix": _intern(prefix),
+            "element_name": _intern(element_name),
+            "element_id": _intern(element_id),
+            "abstract": bool(abstract),
+            "data_type": _intern(data_type),
+            "balance_type": _intern(balance_type),
+            "period_type": _intern(period_type),
+            "substitution_group": _intern(substitution_group)
+        }
+        for name in TAG_FIELDS:
+            object.__setattr__(self, name, values[name])
+        object.__setattr__(self, "_model", None)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+    
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+    
+    def __reduce__(self):
+        return (_from_values, (self.values(),))
+    
+    def values(self) -> tuple:
+        """The tag attributes in FinancialTag field order"""
+        return tuple(getattr(self, name) for name in TAG_FIELDS)
+    
+    def __eq__(self, other):
+        if isinstance(other, (TagRecord, FinancialTag)):
+            return self.values() == tuple(getattr(other, name) for name in TAG_FIELDS)
+        return NotImplemented
+    
+    def __hash__(self):
+        return hash(self.values())
+    
+    def __repr__(self):
+        return f"TagRecord({self.element_id!r})"
+    
+    @classmethod
+    def from_tag(cls, tag: FinancialTag) -> "TagRecord":
+        """Record of a FinancialTag"""
+        return cls(**{name: getattr(tag, name) for name in TAG_FIELDS})
+    
+    def model_dump(self) -> Dict[str, Any]:
+        """The tag as a dictionary, as FinancialTag.model_dump() returns it"""
+        return dict(zip(TAG_FIELDS, self.values()))
+    
+    dict = model_dump
+    
+    def to_model(self) -> FinancialTag:
+        """The pydantic view of the tag, built on first use and then reused"""
+        if self._model is None:
+            object.__setattr__(self, "_model", FinancialTag.model_construct(**self.model_dump()))
+        return self._model
+
+def _from_values(values: tuple) -> TagRecord:
+    """Rebuild a record from its attributes (unpickling)"""
+    return TagRecord(**dict(zip(TAG_FIELDS, values)))
+
+def as_record(tag: Union[TagRecord, FinancialTag], records: Optional[Dict[str, TagRecord]] = None) -> TagRecord:
+    """
+    Record form of a tag.
+    
+    Args:
+        tag: Tag in either form
+        records: Records already built, by element_id; equal tags reuse the same record
+    
+    Returns:
+        The shared record for the tag
+    """
+    if records is not None:
+        known = records.get(tag.element_id)
+        if known is not None and (known is tag or known == tag):
+            return known
+    record = tag if isinstance(tag, TagRecord) else TagRecord.from_tag(tag)
+    if records is not None:
+        records.setdefault(record.element_id, record)
+    return record
+
+def as_records(tags: Iterable[Union[TagRecord, FinancialTag]],
+               records: Optional[Dict[str, TagRecord]] = None) -> List[TagRecord]:
+    """Record forms of a list of tags, sharing records through records"""
+    return [as_record(tag, records) for tag in tags]
+
+def as_model(tag: Union[TagRecord, FinancialTag]) -> FinancialTag:
+    """Pydantic form of a tag"""
+    return tag.to_model() if isinstance(tag, TagRecord) else tag
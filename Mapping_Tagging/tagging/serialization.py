@@ -0,0 +1,167 @@
+"""
+Tag payloads encoded once per taxonomy, and a response encoder that splices them in.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Union
+import json
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from .models import FinancialTag, TaggedValue
+from .records import TagRecord
+
+# A tag in model or record form
+Tag = Union[FinancialTag, TagRecord]
+
+# Attributes left out of compact tag definitions when they have these values
+TAG_DEFAULTS = {
+    name: info.default for name, info in FinancialTag.model_fields.items() if not info.is_required()
+}
+
+def _definition(tag_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact tag definition: the attributes that differ from the FinancialTag defaults"""
+    return {name: value for name, value in tag_dict.items() if name not in TAG_DEFAULTS or TAG_DEFAULTS[name] != value}
+
+def _dumps(value: Any) -> str:
+    """JSON text in the same form as Starlette's JSONResponse"""
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"))
+
+class FrozenTagDict(dict):
+    """Shared, read-only dictionary form of a taxonomy tag"""
+    
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Taxonomy tag payloads are shared and read-only; copy them with dict(tag) first")
+    
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _readonly
+    
+    def __ior__(self, other):
+        self._readonly()
+    
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+class TagPayloads:
+    """
+    The dictionary and JSON forms of every tag of a taxonomy, built once when it loads.
+    
+    Tags that do not come from the taxonomy (or differ from its definition) are converted
+    on the fly, so the output is always that of FinancialTag.model_dump().
+    """
+    
+    def __init__(self, tags: Iterable[Tag]):
+        """
+        Encode the tags.
+        
+        Args:
+            tags: Taxonomy tags, unique by element_id
+        """
+        self.tags: Dict[str, Tag] = {}
+        self.dicts: Dict[str, FrozenTagDict] = {}
+        self.json: Dict[str, str] = {}
+        self.definitions: Dict[str, str] = {}
+        for tag in tags:
+            if tag.element_id in self.tags:
+                continue
+            self.tags[tag.element_id] = tag
+            self.dicts[tag.element_id] = FrozenTagDict(tag.model_dump())
+            self.json[tag.element_id] = _dumps(tag.model_dump())
+            self.definitions[tag.element_id] = _dumps(_definition(tag.model_dump()))
+    
+    def _known(self, tag: Tag) -> bool:
+        """Whether a tag is the taxonomy's definition of its element"""
+        known = self.tags.get(tag.element_id)
+        return known is not None and (known is tag or known == tag)
+    
+    def tag_dict(self, tag: Tag) -> Dict[str, Any]:
+        """Dictionary form of a tag (shared and read-only for taxonomy tags)"""
+        return self.dicts[tag.element_id] if self._known(tag) else tag.model_dump()
+    
+    def tag_dicts(self, tags: Iterable[Tag]) -> List[Dict[str, Any]]:
+        """Dictionary forms of a list of tags"""
+        return [self.tag_dict(tag) for tag in tags]
+    
+    def tag_json(self, tag: Tag) -> str:
+        """JSON form of a tag"""
+        return self.json[tag.element_id] if self._known(tag) else _dumps(tag.model_dump())
+    
+    def definition_json(self, tag: Tag) -> str:
+        """JSON form of a tag without the attributes that have their FinancialTag default"""
+        return self.definitions[tag.element_id] if self._known(tag) else _dumps(_definition(tag.model_dump()))
+    
+    def encode(self, content: Any, compact: bool = False) -> bytes:
+        """
+        Encode a response body, splicing in the pre-encoded tags.
+        
+        Pydantic models are written field by field in declaration order, as model_dump()
+        would, and leaves that are not JSON types go through FastAPI's jsonable_encoder.
+        The result is the same as rendering jsonable_encoder(content) with JSONResponse.
+        
+        In compact form every tag is written as its element_id, tagged values as
+        {"value", "tag_ids"} (the PartialXBRLWithTagIds shape), and each referenced tag is
+        defined once under "tag_definitions", keyed by element_id. Definitions leave out the
+        attributes that have their FinancialTag default, so FinancialTag.model_validate()
+        restores them.
+        
+        Args:
+            content: Response content; may hold tagged models and tags (a dictionary when compact)
+            compact: Whether to reference tags by element_id
+        
+        Returns:
+            The UTF-8 encoded JSON body
+        """
+        parts: List[str] = []
+        if not compact:
+            self._encode(content, parts)
+            return "".join(parts).encode("utf-8")
+        
+        referenced: Dict[str, Tag] = {}
+        self._encode(content, parts, referenced)
+        # Reopen the top-level object to add the definitions of the tags referenced above
+        parts.pop()
+        parts.append(',"tag_definitions":{' if content else '"tag_definitions":{')
+        for index, (element_id, tag) in enumerate(referenced.items()):
+            if index:
+                parts.append(",")
+            parts.append(_dumps(element_id))
+            parts.append(":")
+            parts.append(self.definition_json(tag))
+        parts.append("}}")
+        return "".join(parts).encode("utf-8")
+    
+    def _encode(self, value: Any, parts: List[str], referenced: Optional[Dict[str, Tag]] = None) -> None:
+        """Append the JSON text of a value; tags are only referenced when referenced is given"""
+        if isinstance(value, (FinancialTag, TagRecord)):
+            if referenced is None:
+                parts.append(self.tag_json(value))
+            else:
+                referenced.setdefault(value.element_id, value)
+                parts.append(_dumps(value.element_id))
+        elif isinstance(value, TaggedValue) and referenced is not None:
+            self._encode_items((("value", value.value), ("tag_ids", value.tags)), parts, referenced)
+        elif isinstance(value, BaseModel):
+            self._encode_items(
+                ((name, getattr(value, name)) for name in type(value).model_fields), parts, referenced
+            )
+        elif isinstance(value, dict):
+            self._encode_items(value.items(), parts, referenced)
+        elif isinstance(value, (list, tuple)):
+            parts.append("[")
+            for index, item in enumerate(value):
+                if index:
+                    parts.append(",")
+                self._encode(item, parts, referenced)
+            parts.append("]")
+        elif value is None or isinstance(value, (str, bool, int, float)):
+            parts.append(_dumps(value))
+        else:
+            parts.append(_dumps(jsonable_encoder(value)))
+    
+    def _encode_items(self, items: Iterable, parts: List[str], referenced: Optional[Dict[str, Tag]] = None) -> None:
+        """Append a JSON object"""
+        parts.append("{")
+        for index, (key, item) in enumerate(items):
+            if index:
+                parts.append(",")
+            parts.append(_dumps(str(key)))
+            parts.append(":")
+            self._encode(item, parts, referenced)
+        parts.append("}")
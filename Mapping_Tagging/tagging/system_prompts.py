@@ -1,3 +1,9 @@
+"""
+System prompts and request assembly for the tagging agent.
+"""
+import json
+from typing import Any, Dict
+
 # Add or update the system prompt for better performance
 
 XBRL_DATA_TAGGING_PROMPT = """You are a financial XBRL tagging specialist that applies appropriate XBRL tags to financial statement data.
@@ -20,6 +26,12 @@ To efficiently process financial data and apply XBRL tags, use these tools in th
    - Creates proper XBRL context references
    - Required for valid XBRL documents
 
+RESULT FORMAT:
+- For every value, return only the element ids of its tags in "tag_ids" (e.g. ["sg-as_Revenue"]),
+  and element ids in "meta_tags"; take them from the element_id of the tags the tools return
+- Do not write out prefixes, data types, balance or period types: complete tags are filled in
+  from the taxonomy after your answer, and unknown ids are sent back to you
+
 PERFORMANCE TIPS:
 - Process similar items together with batch tools
 - Use tag_statement_section for entire statement sections
@@ -27,4 +39,23 @@ PERFORMANCE TIPS:
 - Handle simple elements before complex nested structures
 
 Focus on producing accurate tags while maximizing processing speed.
-"""
\ No newline at end of file
+"""
+# Fixed opening of every tagging request, shared by /api/tag and /api/process so both hit the
+# same cached prefix (system prompt, tool schemas, result schema, this instruction). Only the
+# mapped data varies, so it always goes last.
+TAGGING_REQUEST_PREFIX = (
+    "Please apply appropriate XBRL tags to this financial data. "
+    "Focus on the most important elements first and limit complexity:\n"
+)
+
+def build_tagging_prompt(data: Dict[str, Any]) -> str:
+    """
+    Assemble the user prompt for a tagging run.
+    
+    Args:
+        data: Mapped financial data to tag
+        
+    Returns:
+        Prompt with the static instruction first and the mapped data last
+    """
+    return TAGGING_REQUEST_PREFIX + json.dumps(data, indent=4)
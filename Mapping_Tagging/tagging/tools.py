@@ -14,10 +14,12 @@ import re
 from pydantic import BaseModel, Field
 from pydantic_ai import RunContext
 
+from .cache import tag_cache
 from .dependencies import XBRLTaxonomyDependencies
 
-# Tags cache to avoid redundant lookups
-_tags_cache = {}
+def _cache_key(deps: XBRLTaxonomyDependencies, element_name: str, statement_type: str) -> tuple:
+    """Key of an element's tags in the tag cache, scoped to the taxonomy and its version"""
+    return (deps.taxonomy_name, deps.version, element_name, statement_type)
 
 # Tagging apply_tags_to_element tool with enhanced performance
 def apply_tags_to_element(
@@ -41,9 +43,10 @@ def apply_tags_to_element(
         Dictionary containing the tagged value and metadata
     """
     # Check cache first using a compound key
-    cache_key = f"{element_name}:{statement_type}"
-    if cache_key in _tags_cache:
-        cached_result = _tags_cache[cache_key].copy()
+    cache_key = _cache_key(context.deps, element_name, statement_type)
+    cached_entry = tag_cache.get(cache_key)
+    if cached_entry is not None:
+        cached_result = cached_entry.copy()
         cached_result["value"] = value  # Update with current value
         return cached_result
     
@@ -57,16 +60,11 @@ def apply_tags_to_element(
         messages.append(f"Found exact tag match for {element_name}")
     else:
         messages.append(f"No exact tag match found for {element_name}")
-        # Try finding similar tags for fuzzy matching - optimized version
-        element_lower = element_name.lower()
-        
-        # First try direct substring matches (faster)
-        for field_name, field_tags in context.deps.field_tags.items():
-            field_lower = field_name.lower()
-            if element_lower in field_lower or field_lower in element_lower:
-                tags = field_tags
-                messages.append(f"Using similar tag: {field_name}")
-                break
+        # Best ranked similar name from the taxonomy index
+        field_name, score = context.deps.lookup.best(element_name)
+        if field_name:
+            tags = context.deps.field_tags[field_name]
+            messages.append(f"Using similar tag: {field_name} (score {score})")
     
     # Check if it's a mandatory field
     is_mandatory = False
@@ -79,7 +77,7 @@ def apply_tags_to_element(
     result = {
         "element_name": element_name,
         "value": value,
-        "tags": [tag.dict() for tag in tags],  # Convert tags to dict for JSON serialization
+        "tags": context.deps.payloads.tag_dicts(tags),  # Shared dicts, encoded once per taxonomy
         "is_mandatory": is_mandatory,
         "messages": messages,
         "processing_time_ms": (time.time() - start_time) * 1000
@@ -88,7 +86,7 @@ def apply_tags_to_element(
     # Store in cache (without the value to save memory)
     cache_entry = result.copy()
     cache_entry.pop("value", None)  # Remove value for caching
-    _tags_cache[cache_key] = cache_entry
+    tag_cache.put(cache_key, cache_entry)
     
     return result
 
@@ -120,13 +118,7 @@ def tag_statement_section(
             for tag in context.deps.statement_tags:
                 try:
                     if section_name.lower() in tag.element_name.lower():
-                        # Use safe dictionary conversion
-                        if hasattr(tag, 'dict') and callable(tag.dict):
-                            tagged_section["meta_tags"].append(tag.dict())
-                        else:
-                            # Fallback for objects without dict() method
-                            tag_dict = {k: v for k, v in tag.__dict__.items() if not k.startswith('_')}
-                            tagged_section["meta_tags"].append(tag_dict)
+                        tagged_section["meta_tags"].append(context.deps.payloads.tag_dict(tag))
                 except Exception as tag_e:
                     logger.warning(f"Error processing tag in section {section_name}: {str(tag_e)}")
                     continue  # Skip problematic tags
@@ -193,10 +185,10 @@ def tag_statement_section(
                                 continue
                                 
                             # Get tags (using cache if possible)
-                            cache_key = f"{element_name}:{statement_type}"
-                            if cache_key in _tags_cache:
+                            cache_key = _cache_key(context.deps, element_name, statement_type)
+                            cached_entry = tag_cache.get(cache_key)
+                            if cached_entry is not None:
                                 # Use cached tags
-                                cached_entry = _tags_cache[cache_key]
                                 tagged_section[element_name] = {
                                     "value": element_value,
                                     "tags": cached_entry.get("tags", []),
@@ -210,31 +202,14 @@ def tag_statement_section(
                                         tags = context.deps.field_tags[element_name]
                                     else:
                                         # Try finding similar tags
-                                        element_lower = element_name.lower()
-                                        for field_name, field_tags in context.deps.field_tags.items():
-                                            try:
-                                                field_lower = field_name.lower()
-                                                if element_lower in field_lower or field_lower in element_lower:
-                                                    tags = field_tags
-                                                    break
-                                            except Exception:
-                                                continue
+                                        field_name, _ = context.deps.lookup.best(element_name)
+                                        if field_name:
+                                            tags = context.deps.field_tags[field_name]
                                 except Exception as tags_e:
                                     logger.warning(f"Error finding tags for {element_name}: {str(tags_e)}")
                                 
-                                # Convert tags to dict safely
-                                tag_dicts = []
-                                for tag in tags:
-                                    try:
-                                        if hasattr(tag, 'dict') and callable(tag.dict):
-                                            tag_dicts.append(tag.dict())
-                                        else:
-                                            # Fallback for objects without dict() method
-                                            tag_dict = {k: v for k, v in tag.__dict__.items() 
-                                                      if not k.startswith('_')}
-                                            tag_dicts.append(tag_dict)
-                                    except Exception:
-                                        continue
+                                # Shared dicts, encoded once per taxonomy
+                                tag_dicts = context.deps.payloads.tag_dicts(tags)
                                 
                                 # Store in result and cache
                                 is_mandatory = False
@@ -251,10 +226,10 @@ def tag_statement_section(
                                 
                                 # Add to cache
                                 try:
-                                    _tags_cache[cache_key] = {
+                                    tag_cache.put(cache_key, {
                                         "tags": tag_dicts,
                                         "is_mandatory": is_mandatory
-                                    }
+                                    })
                                 except Exception as cache_e:
                                     logger.warning(f"Error caching tags for {element_name}: {str(cache_e)}")
                         except Exception as elem_e:
@@ -281,18 +256,8 @@ def tag_statement_section(
                         except Exception:
                             pass
                         
-                        # Convert tags to dict safely
-                        tag_dicts = []
-                        for tag in tags:
-                            try:
-                                if hasattr(tag, 'dict') and callable(tag.dict):
-                                    tag_dicts.append(tag.dict())
-                                else:
-                                    tag_dict = {k: v for k, v in tag.__dict__.items() 
-                                               if not k.startswith('_')}
-                                    tag_dicts.append(tag_dict)
-                            except Exception:
-                                continue
+                        # Shared dicts, encoded once per taxonomy
+                        tag_dicts = context.deps.payloads.tag_dicts(tags)
                         
                         tagged_section[element_name] = {
                             "value": element_value,
@@ -491,4 +456,8 @@ def batch_tag_elements(
         "elements_per_second": len(elements) / (processing_time / 1000) if processing_time > 0 else 0
     }
     
-    return result
\ No newline at end of file
+    return result
+
+def get_tag_cache_stats() -> Dict[str, Any]:
+    """Hit rate, size, eviction and invalidation statistics of the tag cache"""
+    return tag_cache.stats()
@@ -0,0 +1,70 @@
+"""
+Shared setup for the service tests.
+"""
+import os
+import sys
+
+import pytest
+
+# The service packages (mapping, tagging) are imported from the service directory, as uvicorn does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The agents build their model clients at import time
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+# Nothing is sent to Logfire from the tests
+os.environ.setdefault("LOGFIRE_SEND_TO_LOGFIRE", "false")
+
+# Routing keeps every confident leaf local unless a test samples some for calibration
+os.environ.setdefault("CALIBRATION_SAMPLE_RATE", "0")
+
+
+@pytest.fixture
+def filing_document():
+    """A complete document under the canonical PartialXBRL keys, with every required field"""
+    return {
+        "FilingInformation": {
+            "NameOfCompany": "Example Pte. Ltd.",
+            "UniqueEntityNumber": "20191234A",
+            "CurrentPeriodStartDate": "2023-01-01",
+            "CurrentPeriodEndDate": "2023-12-31",
+            "TypeOfXBRLFiling": "Full",
+            "NatureOfFinancialStatementsCompanyLevelOrConsolidated": "Company",
+            "TypeOfAccountingStandardUsedToPrepareFinancialStatements": "SFRS",
+            "DateOfAuthorisationForIssueOfFinancialStatements": "2024-03-15",
+            "TypeOfStatementOfFinancialPosition": "Classified",
+            "WhetherTheFinancialStatementsArePreparedOnGoingConcernBasis": True,
+            "DescriptionOfPresentationCurrency": "SGD",
+            "DescriptionOfFunctionalCurrency": "SGD",
+            "LevelOfRoundingUsedInFinancialStatements": "Units",
+            "DescriptionOfNatureOfEntitysOperationsAndPrincipalActivities": "Wholesale trade of electronic parts",
+            "PrincipalPlaceOfBusinessIfDifferentFromRegisteredOffice": "1 Example Road",
+            "WhetherCompanyOrGroupIfConsolidatedAccountsArePreparedHasMoreThan50Employees": False,
+            "TaxonomyVersion": "2022.2",
+            "NameAndVersionOfSoftwareUsedToGenerateXBRLFile": "Example 1.0"
+        },
+        "DirectorsStatement": {
+            "WhetherInDirectorsOpinionFinancialStatementsAreDrawnUpSoAsToExhibitATrueAndFairView": True,
+            "WhetherThereAreReasonableGroundsToBelieveThatCompanyWillBeAbleToPayItsDebtsAsAndWhenTheyFallDueAtDateOfStatement": True
+        },
+        "AuditReport": {"TypeOfAuditOpinionInIndependentAuditorsReport": "Unqualified"},
+        "StatementOfFinancialPosition": {
+            "CurrentAssets": {"CashAndBankBalances": 300.0, "TradeAndOtherReceivablesCurrent": 200.0},
+            "NonCurrentAssets": {"PropertyPlantAndEquipment": 500.0},
+            "CurrentLiabilities": {"TradeAndOtherPayablesCurrent": 150.0},
+            "NonCurrentLiabilities": {"NoncurrentLoansAndBorrowings": 250.0},
+            "Equity": {"ShareCapital": 400.0, "AccumulatedProfitsLosses": 200.0}
+        },
+        "IncomeStatement": {
+            "Revenue": 1000.0,
+            "ProfitLossBeforeTaxation": 240.0,
+            "TaxExpenseBenefitContinuingOperations": 40.0,
+            "ProfitLoss": 200.0,
+            "ProfitLossAttributableToOwnersOfCompany": 200.0
+        },
+        "Notes": {
+            "TradeAndOtherReceivables": {"TradeAndOtherReceivables": 200.0},
+            "TradeAndOtherPayables": {"TradeAndOtherPayables": 150.0},
+            "Revenue": {"Revenue": 1000.0}
+        }
+    }
@@ -0,0 +1,35 @@
+"""
+Tests for the alias table of inputs that use (near-)canonical PartialXBRL keys.
+"""
+from mapping.aliases import FIELD_ALIASES, alias_table, load_field_name_aliases, map_by_aliases
+
+
+def test_snake_case_names_come_from_the_field_mapping():
+    loaded = load_field_name_aliases()
+    assert loaded["FilingInformation.TypeOfXBRLFiling"] == ["xbrl_filing_type"]
+    for path, aliases in loaded.items():
+        assert FIELD_ALIASES[path][-len(aliases):] == aliases
+
+
+def test_missing_field_mapping_file_adds_no_aliases(tmp_path):
+    assert load_field_name_aliases(str(tmp_path / "field_names.py")) == {}
+
+
+def test_snake_case_and_client_keys_resolve():
+    resolved = alias_table.resolve({"filing_information": {"xbrl_filing_type": "Full", "CompanyName": "A"}})
+    assert resolved == {"FilingInformation": {"TypeOfXBRLFiling": "Full", "NameOfCompany": "A"}}
+
+
+def test_unknown_or_duplicate_keys_do_not_resolve():
+    assert alias_table.resolve({"FilingInformation": {"Turnover": 1}}) is None
+    assert alias_table.resolve({"FilingInformation": {"FilingType": "Full", "xbrl_filing_type": "Full"}}) is None
+
+
+def test_canonical_document_is_mapped_with_derived_totals(filing_document):
+    mapped, checks = map_by_aliases(filing_document)
+    position = mapped["StatementOfFinancialPosition"]
+    assert position["CurrentAssets"]["CurrentAssets"] == 500.0
+    assert position["Assets"] == 1000.0
+    assert position["Liabilities"] == 400.0
+    assert position["Equity"]["Equity"] == 600.0
+    assert checks["missing"] == [] and checks["issues"] == []
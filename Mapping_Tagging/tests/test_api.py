@@ -0,0 +1,99 @@
+"""
+Tests for the mapping, tagging and combined endpoints.
+"""
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+import api
+from mapping.derivation import MappingResult
+from tagging.dependencies import sg_xbrl_deps
+from tagging.hydration import PartialXBRLWithTagIds, TaggedIdValue, _base_type, hydrate_tags
+from tagging.models import FinancialTag
+
+
+def test_tagging_failure_after_alias_mapping_returns_partial_result(filing_document, monkeypatch):
+    async def run_agent_stage(request, agent, prompt, deps, stage, deadline=None):
+        assert stage == "tagging", "the alias table maps the document without the agent"
+        raise RuntimeError("tagging model unavailable")
+    
+    monkeypatch.setattr(api, "run_agent_stage", run_agent_stage)
+    response = TestClient(api.app).post("/api/process", json={"data": filing_document})
+    
+    assert response.status_code == 207
+    body = response.json()
+    assert body["completed_stages"] == ["mapping"]
+    assert body["mapped_data"]["FilingInformation"]["UniqueEntityNumber"] == "20191234A"
+    assert body["checks"]["missing"] == []
+    assert "tagging model unavailable" in body["error"]
+
+
+def test_missing_required_totals_return_partial_mapping(filing_document, monkeypatch):
+    position = filing_document["StatementOfFinancialPosition"]
+    position["NonCurrentAssets"] = {}
+    position["CurrentLiabilities"] = {}
+    position["NonCurrentLiabilities"] = {}
+    
+    async def run_agent_stage(request, agent, prompt, deps, stage, deadline=None):
+        return SimpleNamespace(data=MappingResult.model_validate(filing_document))
+    
+    async def record_mapping_decisions(raw_data, mapped_data):
+        pass
+    
+    monkeypatch.setattr(api, "run_agent_stage", run_agent_stage)
+    monkeypatch.setattr(api, "record_mapping_decisions", record_mapping_decisions)
+    # Raw labels the alias table cannot resolve, so the document goes to the (stubbed) agent
+    response = TestClient(api.app).post("/api/map", json={"data": {"balanceSheet": {"Cash at bank": 300}}})
+    
+    assert response.status_code == 207
+    body = response.json()
+    assert body["status"] == "partial_success"
+    assert "StatementOfFinancialPosition.Liabilities" in body["checks"]["missing"]
+    assert body["checks"]["partial"] == ["StatementOfFinancialPosition.Assets"]
+    assert body["mapped_data"]["StatementOfFinancialPosition"]["Assets"] == 500.0
+    assert "StatementOfFinancialPosition.Liabilities" in body["error"]
+
+
+def _tag_ids_payload(model, field_tags):
+    """Id-only tagging result with every field filled in and tagged from the taxonomy"""
+    payload = {}
+    for name, info in model.model_fields.items():
+        base = _base_type(info.annotation)
+        if base is TaggedIdValue:
+            payload[name] = {"value": 100.0, "tag_ids": [tag.element_id for tag in field_tags.get(name, [])]}
+        elif isinstance(base, type) and issubclass(base, BaseModel):
+            payload[name] = _tag_ids_payload(base, field_tags)
+    return payload
+
+
+def test_compact_tags_hydrate_to_the_full_format(monkeypatch):
+    tag_ids = PartialXBRLWithTagIds.model_validate(_tag_ids_payload(PartialXBRLWithTagIds, sg_xbrl_deps.field_tags))
+    tagged, unknown = hydrate_tags(tag_ids, sg_xbrl_deps.elements)
+    assert unknown == []
+    
+    async def run_agent_stage(request, agent, prompt, deps, stage, deadline=None):
+        return SimpleNamespace(data=tagged)
+    
+    monkeypatch.setattr(api, "run_agent_stage", run_agent_stage)
+    client = TestClient(api.app)
+    full = client.post("/api/tag", json={"data": {}}).json()
+    compact = client.post("/api/tag", params={"format": "compact"}, json={"data": {}}).json()
+    
+    assert "tags" not in compact and compact["tag_definitions"]
+    definitions = {
+        element_id: FinancialTag.model_validate(definition)
+        for element_id, definition in compact["tag_definitions"].items()
+    }
+    restored, unknown = hydrate_tags(PartialXBRLWithTagIds.model_validate(compact["tagged_data"]), definitions)
+    assert unknown == []
+    assert jsonable_encoder(restored) == full["tagged_data"]
+
+
+def test_compact_format_is_documented():
+    schema = TestClient(api.app).get("/openapi.json").json()
+    for path, model in (("/api/tag", "CompactTaggingResponse"), ("/api/process", "CompactCombinedResponse")):
+        response = schema["paths"][path]["post"]["responses"]["200"]["content"]["application/json"]["schema"]
+        assert {"$ref": f"#/components/schemas/{model}"} in response["anyOf"]
+    assert "tag_definitions" in schema["components"]["schemas"]["CompactTaggingResponse"]["required"]
@@ -0,0 +1,51 @@
+"""
+Tests for the vectorized batch classification of labels.
+"""
+import pandas as pd
+import pytest
+
+from mapping import batch
+from mapping.batch import classify_terms
+from mapping.dependencies import FinancialTermDeps, income_terms, position_terms
+from mapping.termdb import write_term_dictionary
+from mapping.tools import lookup_term
+
+
+@pytest.fixture(scope="module")
+def deps():
+    return FinancialTermDeps(income_terms, position_terms)
+
+
+@pytest.fixture(scope="module")
+def compiled_deps(deps, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("termdb") / "terms.ftdb")
+    write_term_dictionary(path, deps.income_statement_terms, deps.financial_position_terms, deps.version)
+    return FinancialTermDeps.from_compiled(path)
+
+
+LABELS = ["Revenue", "Other operating income", "TRADE RECEIVABLES", "Cash and bank balances net",
+          "Total equity ", "Staff welfare", "Misc", "", "income tax expense"]
+
+
+@pytest.mark.parametrize("statement_type", ["all", "income", "position"])
+def test_keyword_results_match_the_lookup(deps, statement_type):
+    result = classify_terms(pd.Series(LABELS), deps, statement_type)
+    for label, row in zip(LABELS, result.itertuples()):
+        expected = lookup_term(deps, label, statement_type)
+        assert expected["resolved_by"] in ("dictionary", "guess")
+        assert (row.statement_type, row.field, row.match_score) == (
+            expected["statement_type"], expected["field"], expected["match_score"])
+
+
+def test_misspelled_labels_are_not_fuzzy_matched(deps):
+    assert lookup_term(deps, "Trade recievables")["resolved_by"] == "fuzzy"
+    row = classify_terms(["Trade recievables"], deps).iloc[0]
+    assert (row["statement_type"], row["field"], row["match_score"]) == ("unknown", "unknown", 0)
+
+
+def test_compiled_dictionaries_classify_like_the_source(deps, compiled_deps):
+    # Classifiers are shared by dictionary version, which both dependencies have
+    batch._classifiers.clear()
+    result = classify_terms(LABELS, compiled_deps)
+    expected = batch.BatchTermClassifier(deps).classify(LABELS)
+    pd.testing.assert_frame_equal(result, expected)
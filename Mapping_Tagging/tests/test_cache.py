@@ -0,0 +1,67 @@
+"""
+Tests for the memo of the XBRL tagging tool lookups.
+"""
+from tagging import dependencies
+from tagging.cache import TagCache
+from tagging.dependencies import XBRLTaxonomyDependencies
+from tagging.records import TagRecord
+
+
+def _record(element_name):
+    return TagRecord(prefix="sg-as", element_name=element_name, element_id=f"sg-as_{element_name}",
+                     abstract=False, data_type="xbrli:monetaryItemType", balance_type="credit",
+                     period_type="duration", substitution_group="xbrli:item")
+
+
+def _taxonomy(name):
+    return XBRLTaxonomyDependencies(taxonomy_name=name, entity_name="Example Pte. Ltd.", mandatory_fields={},
+                                    field_tags={"Revenue": [_record("Revenue")]}, statement_tags=[])
+
+
+def test_refresh_drops_only_the_previous_version(monkeypatch):
+    cache = TagCache(maxsize=16)
+    monkeypatch.setattr(dependencies, "tag_cache", cache)
+    taxonomy, other = _taxonomy("test"), _taxonomy("other")
+    old_version = taxonomy.version
+    cache.put(("test", old_version, "Revenue", "income"), {"tags": ["old"]})
+    cache.put(("test", "0123456789abcdef", "Revenue", "income"), {"tags": ["pinned"]})
+    cache.put(("other", other.version, "Revenue", "income"), {"tags": ["other"]})
+    
+    taxonomy.field_tags = {"Revenue": [_record("Revenue")], "Inventories": [_record("Inventories")]}
+    
+    assert taxonomy.version != old_version
+    assert cache.get(("test", old_version, "Revenue", "income")) is None
+    assert cache.get(("test", "0123456789abcdef", "Revenue", "income")) == {"tags": ["pinned"]}
+    assert cache.get(("other", other.version, "Revenue", "income")) == {"tags": ["other"]}
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_refresh_without_changes_keeps_the_entries(monkeypatch):
+    cache = TagCache(maxsize=16)
+    monkeypatch.setattr(dependencies, "tag_cache", cache)
+    taxonomy = _taxonomy("test")
+    cache.put(("test", taxonomy.version, "Revenue", "income"), {"tags": []})
+    taxonomy.refresh()
+    assert cache.get(("test", taxonomy.version, "Revenue", "income")) == {"tags": []}
+
+
+def test_least_recently_used_entries_are_evicted_first():
+    cache = TagCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+
+
+def test_non_positive_maxsize_disables_caching():
+    for maxsize in (0, -1):
+        cache = TagCache(maxsize=maxsize)
+        cache.put("a", 1)
+        assert cache.get("a") is None
+        assert cache.stats()["size"] == 0
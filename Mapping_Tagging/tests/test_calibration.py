@@ -0,0 +1,45 @@
+"""
+Tests for the calibration of match scores on logged decisions.
+"""
+import pytest
+
+from mapping.calibration import ScoreCalibrator, logged_decisions
+from mapping.classifier import append_examples
+from mapping.dependencies import FinancialTermDeps, income_terms, position_terms
+from mapping.routing import partition_by_confidence
+
+
+@pytest.fixture(scope="module")
+def deps():
+    return FinancialTermDeps(income_terms, position_terms)
+
+
+def test_examples_are_scored_within_their_section(deps, tmp_path):
+    # Without the section scope, "Revenue receivables" scores 3 on Revenue and would pull
+    # the confidence of every score-3 match down
+    decisions = (
+        [("Revenue receivables", "statementOfFinancialPosition.currentAssets", "financial_position",
+          "currentAssets.TradeAndOtherReceivablesCurrent")] * 30
+        + [("Net revenue", "incomeStatement", "income_statement", "Revenue")] * 30
+    )
+    path = str(tmp_path / "mapping_log.jsonl")
+    append_examples(path, decisions)
+    
+    calibrator = ScoreCalibrator.fit(logged_decisions(path), deps)
+    assert calibrator.examples == 60
+    assert calibrator.confidence(3) > 0.9
+    assert calibrator.confidence(0) < 0.1
+
+
+def test_missing_log_keeps_the_default_table(deps, tmp_path):
+    calibrator = ScoreCalibrator.fit(logged_decisions(str(tmp_path / "missing.jsonl")), deps)
+    assert calibrator.examples == 0
+
+
+def test_sampled_confident_leaves_go_to_the_agent(deps):
+    data = {"currentAssets": {"Trade receivables": 50}, "incomeStatement": {"Revenue": 120}}
+    resolved, pending = partition_by_confidence(data, deps, sample_rate=1.0)
+    assert resolved == {}
+    assert pending == data
+    resolved, _ = partition_by_confidence(data, deps, sample_rate=0.0)
+    assert len(resolved) == 2
@@ -0,0 +1,74 @@
+"""
+Tests for the local label classifier and its use in the term lookup.
+"""
+import dataclasses
+
+import pytest
+
+from mapping import classifier
+from mapping.dependencies import FinancialTermDeps, income_terms, position_terms
+from mapping.tools import lookup_term
+
+
+def _examples(deps):
+    examples = []
+    for prefix, field in deps.matcher.fields:
+        if prefix == "income":
+            statement_type, section, terms = "income_statement", "incomeStatement", deps.income_statement_terms
+        else:
+            statement_type = "financial_position"
+            section = "statementOfFinancialPosition." + field.split(".")[0]
+            terms = deps.financial_position_terms
+        for term in terms[field]:
+            examples.append({"label": term.title(), "section": section, "statement_type": statement_type, "field": field})
+    # A label no keyword covers, seen often enough to be predicted with confidence
+    examples += [{"label": "Kopi allowance", "section": "incomeStatement", "statement_type": "income_statement",
+                  "field": "EmployeeBenefitsExpense"}] * 20
+    return examples
+
+
+@pytest.fixture(scope="module")
+def deps():
+    return FinancialTermDeps(income_terms, position_terms)
+
+
+@pytest.fixture(scope="module")
+def model(deps):
+    return classifier.LabelClassifier.train(_examples(deps), epochs=15)
+
+
+def test_predictions_stay_in_the_requested_statement(model):
+    statement_type, _, _ = model.predict("Trade receivables", "", "income")
+    assert statement_type == "income_statement"
+    statement_type, _, _ = model.predict("Revenue", "", "position")
+    assert statement_type == "financial_position"
+
+
+def test_predictions_stay_in_the_section_group(model):
+    _, field, probability = model.predict("Trade receivables", "statementOfFinancialPosition.nonCurrentAssets")
+    assert field.startswith("nonCurrentAssets.")
+    assert probability < classifier.CLASSIFIER_MIN_PROBABILITY
+
+
+def test_unseen_labels_are_rejected(model):
+    assert model.predict("Zorgblat quux") is None
+    assert model.predict("UEN") is None
+
+
+def test_holdout_split_keeps_each_label_on_one_side(deps):
+    examples = _examples(deps) * 3
+    train, held = classifier._split_holdout(examples, 0.2, 0)
+    assert train and held
+    train_labels = {classifier.normalize_label(e["label"]) for e in train}
+    assert not train_labels & {classifier.normalize_label(e["label"]) for e in held}
+    assert len(classifier._unique_labels(held)) == len({(e["label"], e["section"]) for e in held})
+
+
+def test_classifier_override_drops_the_keyword_score(deps, model):
+    scoped = dataclasses.replace(deps)
+    scoped.label_classifier = model
+    result = lookup_term(scoped, "Kopi allowance", section="incomeStatement")
+    assert result["resolved_by"] == "classifier"
+    assert result["field"] == "EmployeeBenefitsExpense"
+    assert result["match_score"] is None
+    assert lookup_term(scoped, "Kopi allowance", "position", "incomeStatement")["resolved_by"] != "classifier"
@@ -0,0 +1,45 @@
+"""
+Tests for the short-alias mapping result schema.
+"""
+from pydantic import BaseModel
+
+from mapping.aliases import map_by_aliases
+from mapping.compact import CompactMappingResult, compact_aliases, expand_aliases, short_alias
+
+
+def _sections(model):
+    """The model and every nested section model"""
+    yield model
+    for info in model.model_fields.values():
+        if isinstance(info.annotation, type) and issubclass(info.annotation, BaseModel):
+            yield from _sections(info.annotation)
+
+
+def test_short_alias_uses_initials_and_digits():
+    assert short_alias("ShareOfProfitLossOfAssociatesAndJointVenturesAccountedForUsingEquityMethod") == "soploaajvafuem"
+    assert short_alias("TaxonomyVersion2022") == "tv2022"
+
+
+def test_aliases_are_unique_per_section():
+    for section in _sections(CompactMappingResult):
+        aliases = [info.alias for info in section.model_fields.values()]
+        assert len(aliases) == len(set(aliases)), section.__name__
+
+
+def test_full_document_round_trips(filing_document):
+    document, _ = map_by_aliases(filing_document)
+    compact = compact_aliases(document)
+    assert "sofp" in compact and "StatementOfFinancialPosition" not in compact
+    assert expand_aliases(compact) == document
+
+
+def test_alias_keyed_payload_validates_to_full_names(filing_document):
+    document, _ = map_by_aliases(filing_document)
+    payload = compact_aliases(document)
+    payload["is"]["r"] = 1200.0
+    payload["sofp"]["ca"]["cabb"] = 350.0
+    
+    dumped = CompactMappingResult.model_validate(payload).model_dump()
+    assert dumped["IncomeStatement"]["Revenue"] == 1200.0
+    assert dumped["StatementOfFinancialPosition"]["CurrentAssets"]["CashAndBankBalances"] == 350.0
+    assert dumped["FilingInformation"]["NameOfCompany"] == "Example Pte. Ltd."
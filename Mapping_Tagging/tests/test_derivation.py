@@ -0,0 +1,54 @@
+"""
+Tests for the derived totals and consistency checks of mapped statements.
+"""
+from mapping.derivation import REQUIRED_TOTALS, derive_statement_totals
+
+
+def test_totals_are_derived_from_their_components():
+    mapped = {
+        "StatementOfFinancialPosition": {
+            "CurrentAssets": {"CashAndBankBalances": 100.0, "Inventories": 50.0},
+            "NonCurrentAssets": {"PropertyPlantAndEquipment": 200.0},
+            "CurrentLiabilities": {"TradeAndOtherPayablesCurrent": 80.0},
+            "NonCurrentLiabilities": {"NoncurrentLoansAndBorrowings": 70.0},
+            "Equity": {"ShareCapital": 150.0, "AccumulatedProfitsLosses": 50.0}
+        },
+        "IncomeStatement": {"ProfitLossBeforeTaxation": 120.0, "TaxExpenseBenefitContinuingOperations": -20.0}
+    }
+    checks = derive_statement_totals(mapped)
+    position = mapped["StatementOfFinancialPosition"]
+    assert position["Assets"] == 350.0
+    assert position["Liabilities"] == 150.0
+    assert mapped["IncomeStatement"]["ProfitLoss"] == 100.0
+    assert checks["issues"] == []
+    assert checks["missing"] == []
+
+
+def test_underivable_required_totals_are_reported_missing():
+    mapped = {
+        "StatementOfFinancialPosition": {"CurrentAssets": {"CashAndBankBalances": 100.0}},
+        "IncomeStatement": {"Revenue": 500.0}
+    }
+    checks = derive_statement_totals(mapped)
+    assert "StatementOfFinancialPosition.CurrentAssets.CurrentAssets" not in checks["missing"]
+    assert "StatementOfFinancialPosition.Liabilities" in checks["missing"]
+    assert "IncomeStatement.ProfitLoss" in checks["missing"]
+    assert set(checks["missing"]) <= set(REQUIRED_TOTALS)
+
+
+def test_balance_sheet_mismatch_is_an_issue():
+    mapped = {"StatementOfFinancialPosition": {"Assets": 100.0, "Liabilities": 40.0, "Equity": {"Equity": 50.0}}}
+    checks = derive_statement_totals(mapped)
+    assert [issue["check"] for issue in checks["issues"]] == ["balance_sheet"]
+
+
+def test_totals_derived_without_a_required_component_are_partial():
+    mapped = {
+        "StatementOfFinancialPosition": {"CurrentAssets": {"CashAndBankBalances": 100.0}},
+        "IncomeStatement": {"ProfitLossBeforeTaxation": 120.0}
+    }
+    checks = derive_statement_totals(mapped)
+    assert mapped["StatementOfFinancialPosition"]["Assets"] == 100.0
+    assert "StatementOfFinancialPosition.Assets" in checks["partial"]
+    assert "IncomeStatement.ProfitLoss" in checks["partial"]
+    assert "StatementOfFinancialPosition.CurrentAssets.CurrentAssets" not in checks["partial"]
@@ -0,0 +1,73 @@
+"""
+Tests for the character n-gram fallback of the term lookup.
+"""
+import math
+
+import numpy as np
+import pytest
+
+from mapping.dependencies import FinancialTermDeps, income_terms, position_terms
+from mapping.fuzzy import char_ngrams, normalize_label
+from mapping.tools import gate_match, lookup_term
+
+
+@pytest.fixture(scope="module")
+def deps():
+    return FinancialTermDeps(income_terms, position_terms)
+
+
+@pytest.mark.parametrize("label, field", [
+    ("Trade recievables", "currentAssets.TradeAndOtherReceivablesCurrent"),
+    ("Retaned earnings", "equity.AccumulatedProfitsLosses"),
+    ("Profit befor tax", "ProfitLossBeforeTaxation"),
+    ("Other operating expenses", "OtherExpensesByNature"),
+])
+def test_misspelled_labels_match_their_field(deps, label, field):
+    result = lookup_term(deps, label)
+    assert result["resolved_by"] == "fuzzy"
+    assert result["field"] == field
+    assert result["confidence"] < deps.confidence_threshold
+
+
+@pytest.mark.parametrize("label", ["Finance income", "Dividends paid", "Dividend per share", "Interest paid"])
+def test_opposite_or_ambiguous_labels_do_not_fuzzy_match(deps, label):
+    assert deps.fuzzy_match(label.lower()) is None
+    assert lookup_term(deps, label)["resolved_by"] == "guess"
+
+
+def test_gate_match_keeps_fuzzy_field_as_suggestion(deps):
+    gated = gate_match(deps, lookup_term(deps, "Trade recievables"))
+    assert gated["statement_type"] == "unknown"
+    assert gated["resolved_by"] == "guess"
+    assert gated["suggestion"]["field"] == "currentAssets.TradeAndOtherReceivablesCurrent"
+
+
+def test_gate_match_falls_back_to_the_guess(deps):
+    gated = gate_match(deps, lookup_term(deps, "Equity_x"))
+    assert gated["statement_type"] == "financial_position"
+    assert gated["field"] == "Equity_x"
+
+
+def test_gate_match_passes_keyword_matches(deps):
+    result = lookup_term(deps, "Revenue")
+    assert gate_match(deps, result) is result
+
+
+def _tfidf_vector(index, label):
+    vector = {}
+    for gram in char_ngrams(normalize_label(label)):
+        column = index.vocabulary.get(gram)
+        vector[gram] = vector.get(gram, 0) + (index.unseen_idf if column is None else float(index.idf[column]))
+    norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+    return {gram: weight / norm for gram, weight in vector.items()}
+
+
+@pytest.mark.parametrize("label", ["Trade recievables", "Prop., plant & equip.", "Revenue", "zzz"])
+def test_sparse_similarities_equal_the_dense_cosine(deps, label):
+    index = deps.fuzzy_index
+    query = _tfidf_vector(index, label)
+    expected = [
+        sum(weight * _tfidf_vector(index, keyword).get(gram, 0) for gram, weight in query.items())
+        for keyword in index.keywords
+    ]
+    np.testing.assert_allclose(index.similarities(label), expected, atol=1e-5)
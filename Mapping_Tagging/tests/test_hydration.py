@@ -0,0 +1,69 @@
+"""
+Tests for the id-only tagging schema and its hydration from the taxonomy.
+"""
+from typing import List, Optional
+
+from pydantic import Field
+
+from tagging.hydration import PartialXBRLWithTagIds, TaggedIdValue, hydrate_tags, tag_id_model
+from tagging.models import FinancialTag, TaggedValue, TrackedModel
+from tagging.records import TagRecord
+
+
+class EquityWithTags(TrackedModel):
+    """Equity section with tags"""
+    ShareCapital: TaggedValue
+    TreasuryShares: Optional[TaggedValue] = None
+    meta_tags: List[FinancialTag] = Field(default_factory=list, description="Tags for the section")
+
+
+class FilingWithTags(TrackedModel):
+    """Filing with tags"""
+    NameOfCompany: TaggedValue
+    Equity: EquityWithTags
+
+
+ELEMENTS = {
+    "sg-as_ShareCapital": TagRecord("ShareCapital", "sg-as_ShareCapital", balance_type="credit"),
+    "sg-as_Equity": TagRecord("Equity", "sg-as_Equity", abstract=True),
+    "sg-dei_NameOfCompany": FinancialTag(prefix="sg-dei", element_name="NameOfCompany",
+                                         element_id="sg-dei_NameOfCompany", data_type="xbrli:stringItemType")
+}
+
+
+def test_id_model_mirrors_the_tagged_schema():
+    model = tag_id_model(FilingWithTags)
+    assert model.__name__ == "FilingWithTagIds"
+    equity = model.model_fields["Equity"].annotation
+    assert equity.model_fields["ShareCapital"].annotation is TaggedIdValue
+    assert equity.model_fields["ShareCapital"].is_required()
+    assert not equity.model_fields["TreasuryShares"].is_required()
+    assert equity.model_fields["meta_tags"].annotation == List[str]
+
+
+def test_ids_are_hydrated_into_full_tags():
+    model = tag_id_model(FilingWithTags)
+    result = model.model_validate({
+        "NameOfCompany": {"value": "Example Pte. Ltd.", "tag_ids": ["sg-dei_NameOfCompany"]},
+        "Equity": {
+            "ShareCapital": {"value": 400.0, "tag_ids": ["sg-as_ShareCapital", "sg-as_Unknown"]},
+            "meta_tags": ["sg-as_Equity"]
+        }
+    })
+    hydrated, unknown = hydrate_tags(result, ELEMENTS, FilingWithTags)
+    
+    assert isinstance(hydrated, FilingWithTags)
+    assert unknown == ["sg-as_Unknown"]
+    assert hydrated.NameOfCompany.tags[0].data_type == "xbrli:stringItemType"
+    share_capital = hydrated.Equity.ShareCapital
+    assert share_capital.value == 400.0
+    assert [tag.model_dump() for tag in share_capital.tags] == [ELEMENTS["sg-as_ShareCapital"].model_dump()]
+    assert isinstance(share_capital.tags[0], FinancialTag)
+    assert hydrated.Equity.TreasuryShares is None
+    assert hydrated.Equity.meta_tags[0].abstract is True
+
+
+def test_agent_schema_has_no_tag_attributes():
+    schema = PartialXBRLWithTagIds.model_json_schema()
+    assert "FinancialTag" not in schema.get("$defs", {})
+    assert "TaggedIdValue" in schema["$defs"]
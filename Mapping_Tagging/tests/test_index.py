@@ -0,0 +1,43 @@
+"""
+Tests for the taxonomy element name index.
+"""
+import pytest
+
+from tagging.index import TagLookupIndex, name_tokens
+
+KEYS = [
+    "Liabilities", "CurrentLiabilities", "NoncurrentLiabilities", "CurrentFinanceLeaseLiabilities",
+    "NoncurrentFinanceLeaseLiabilities", "TradeAndOtherReceivables", "Revenue", "OtherRevenue"
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return TagLookupIndex(KEYS)
+
+
+def test_name_tokens_join_non_to_the_next_word():
+    assert name_tokens("NonCurrentLeaseLiabilities") == {"noncurrent", "lease", "liabilities"}
+    assert name_tokens("NoncurrentLiabilities") == name_tokens("non_current liabilities")
+
+
+def test_exact_match_ignores_case(index):
+    assert index.best("revenue") == ("Revenue", 1.0)
+
+
+@pytest.mark.parametrize("name, key", [
+    ("NonCurrentLeaseLiabilities", "NoncurrentFinanceLeaseLiabilities"),
+    ("LeaseLiabilities", "CurrentFinanceLeaseLiabilities"),
+    ("TotalNonCurrentLiabilities", "NoncurrentLiabilities"),
+])
+def test_short_contained_keys_do_not_beat_shared_words(index, name, key):
+    assert index.best(name)[0] == key
+
+
+def test_word_overlap_without_containment(index):
+    assert index.candidates("TradeReceivables") == [("TradeAndOtherReceivables", 0.5)]
+    assert index.best("Goodwill") == ("", 0.0)
+
+
+def test_ranking_does_not_depend_on_key_order():
+    assert TagLookupIndex(reversed(KEYS)).candidates("Liabilities") == TagLookupIndex(KEYS).candidates("Liabilities")
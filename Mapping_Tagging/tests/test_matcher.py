@@ -0,0 +1,51 @@
+"""
+Tests for the Aho-Corasick term matcher.
+"""
+import pytest
+
+from mapping.dependencies import income_terms, position_terms
+from mapping.matcher import TermMatcher
+
+INCOME = {"Revenue": ["revenue", "sales"], "FinanceCosts": ["finance costs", "interest expense"]}
+POSITION = {
+    "currentAssets.CashAndBankBalances": ["cash", "bank balances"],
+    "nonCurrentAssets.PropertyPlantAndEquipment": ["property, plant and equipment", "plant"]
+}
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return TermMatcher(INCOME, POSITION)
+
+
+def test_overlapping_keywords_are_all_found(matcher):
+    found = {matcher.keywords[k] for k in matcher.find_keywords("cash and bank balances")}
+    assert found == {"cash", "bank balances"}
+    found = {matcher.keywords[k] for k in matcher.find_keywords("property, plant and equipment")}
+    assert found == {"property, plant and equipment", "plant"}
+
+
+def test_scores_follow_the_keyword_rules(matcher):
+    # "sales": contained, 5 characters -> 1 point; "revenue" equal to the term -> 6
+    assert matcher.score("net sales") == {0: 1}
+    assert matcher.score("revenue") == {0: 6}
+    # "cash" (1) and "bank balances" (3) on the same field
+    assert matcher.score("cash and bank balances") == {2: 4}
+
+
+def test_statement_scope_filters_fields(matcher):
+    assert matcher.best_match("interest expense on cash", "income") == ("income", "FinanceCosts", 3)
+    assert matcher.best_match("interest expense on cash", "position") == ("position", "currentAssets.CashAndBankBalances", 1)
+    assert matcher.best_match("goodwill") is None
+
+
+def test_matches_a_linear_scan_of_the_dictionaries():
+    matcher = TermMatcher(income_terms, position_terms)
+    all_terms = list(income_terms.values()) + list(position_terms.values())
+    for term in ["revenue", "trade and other receivables", "finance lease liabilities", "profit for the year"]:
+        expected = {}
+        for field_idx, keywords in enumerate(all_terms):
+            points = sum(6 if k == term else 3 if len(k) > 5 else 1 for k in keywords if k and k in term)
+            if points:
+                expected[field_idx] = points
+        assert matcher.score(term) == expected, term
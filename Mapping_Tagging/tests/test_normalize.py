@@ -0,0 +1,81 @@
+"""
+Tests for the normalization of formatted amounts in raw documents.
+"""
+import pandas as pd
+import pytest
+
+from mapping.normalize import _copy_containers, normalize_statement_values, parse_amounts
+
+
+@pytest.mark.parametrize("raw, value", [
+    ("1,234", 1234.0),
+    ("(5,000)", -5000.0),
+    ("-", 0.0),
+    ("nil", 0.0),
+    ("\u2212", 0.0),
+    ("\u22125,000", -5000.0),
+    ("S$ 1,200", 1200.0),
+    ("USD 3,000", 3000.0),
+    ("€ 50", 50.0),
+    ("1.2m", 1200000.0),
+])
+def test_amounts_are_parsed(raw, value):
+    assert parse_amounts(pd.Series([raw], dtype=object))["value"].iloc[0] == value
+
+
+@pytest.mark.parametrize("raw", ["no 5", "note 12", "abc", "(5", "None", "none"])
+def test_other_strings_are_not_amounts(raw):
+    assert not parse_amounts(pd.Series([raw], dtype=object))["parsed"].iloc[0]
+
+
+def test_amount_keys_mentioning_a_period_are_parsed():
+    data = {"incomeStatement": {
+        "Profit for the year": "(5,000)",
+        "Profit for the period": "1.2m",
+        "Loss for the financial year": "(300)"
+    }}
+    normalized, summary = normalize_statement_values(data)
+    assert normalized["incomeStatement"] == {
+        "Profit for the year": -5000,
+        "Profit for the period": 1200000,
+        "Loss for the financial year": -300
+    }
+    assert summary["parsed"] == 3
+    assert data["incomeStatement"]["Profit for the year"] == "(5,000)"
+
+
+def test_identifier_keys_are_left_as_text():
+    filing = {"UEN": "201912345K", "FY": "2023", "CurrentPeriodEndDate": "2023", "PhoneNumber": "61234567",
+              "CompanyName": "123", "CurrencyCode": "001"}
+    normalized, _ = normalize_statement_values({"filingInformation": filing})
+    assert normalized["filingInformation"] == filing
+
+
+def test_rounding_level_scales_suffixed_amounts():
+    data = {"filingInformation": {"LevelOfRoundingUsedInFinancialStatements": "Thousands"},
+            "incomeStatement": {"Revenue": "1.2m", "Cost of sales": "(300)"}}
+    normalized, summary = normalize_statement_values(data)
+    assert summary["rounding_level"] == "thousands"
+    assert normalized["incomeStatement"] == {"Revenue": 1200, "Cost of sales": -300}
+
+
+def test_deep_documents_are_copied_without_recursion():
+    data = {}
+    node = data
+    for _ in range(5000):
+        node["child"] = {}
+        node = node["child"]
+    node["leaf"] = [1]
+    copy = _copy_containers(data)
+    
+    node, original = copy, data
+    while "child" in node:
+        assert node is not original
+        node, original = node["child"], original["child"]
+    assert node["leaf"] == [1] and node["leaf"] is not original["leaf"]
+
+
+def test_none_text_is_not_a_zero_amount():
+    normalized, summary = normalize_statement_values({"incomeStatement": {"Dividends": "None", "Revenue": "\u2212"}})
+    assert normalized["incomeStatement"] == {"Dividends": "None", "Revenue": 0}
+    assert summary["zero_markers"] == 1
@@ -0,0 +1,73 @@
+"""
+Tests for the compact records holding the taxonomy tags.
+"""
+import pickle
+
+import pytest
+
+from tagging.dependencies import XBRLTaxonomyDependencies
+from tagging.models import FinancialTag
+from tagging.records import TagRecord, as_records
+
+ATTRIBUTES = {
+    "prefix": "sg-as", "element_name": "Revenue", "element_id": "sg-as_Revenue", "abstract": False,
+    "data_type": "xbrli:monetaryItemType", "balance_type": "credit", "period_type": "duration",
+    "substitution_group": "xbrli:item"
+}
+
+
+def test_records_are_immutable():
+    record = TagRecord(**ATTRIBUTES)
+    with pytest.raises(AttributeError):
+        record.element_name = "Inventories"
+    with pytest.raises(AttributeError):
+        del record.prefix
+    with pytest.raises(AttributeError):
+        record.extra = 1
+    assert record.element_name == "Revenue"
+
+
+def test_records_equal_and_hash_like_the_tag_they_hold():
+    record, tag = TagRecord(**ATTRIBUTES), FinancialTag(**ATTRIBUTES)
+    assert record == tag and tag == record
+    assert record != FinancialTag(**{**ATTRIBUTES, "balance_type": "debit"})
+    assert record == TagRecord.from_tag(tag)
+    assert hash(record) == hash(TagRecord.from_tag(tag))
+    assert len({record, TagRecord(**ATTRIBUTES)}) == 1
+    assert record != "sg-as_Revenue"
+
+
+def test_records_pickle_to_equal_records():
+    record = TagRecord(**ATTRIBUTES)
+    record.to_model()
+    restored = pickle.loads(pickle.dumps(record))
+    assert isinstance(restored, TagRecord)
+    assert restored == record
+    assert restored.values() == record.values()
+
+
+def test_model_dump_matches_the_financial_tag():
+    record = TagRecord(**ATTRIBUTES, description="Revenue from contracts with customers")
+    assert record.model_dump() == FinancialTag(**ATTRIBUTES).model_dump()
+    assert record.dict() == record.model_dump()
+    assert record.to_model() == FinancialTag(**ATTRIBUTES)
+
+
+def test_equal_tags_share_one_record():
+    records = {}
+    first, second = as_records([FinancialTag(**ATTRIBUTES), TagRecord(**ATTRIBUTES)], records)
+    assert first is second
+    assert records == {"sg-as_Revenue": first}
+
+
+def test_refresh_shares_records_between_fields():
+    taxonomy = XBRLTaxonomyDependencies(
+        taxonomy_name="test", entity_name="Example Pte. Ltd.", mandatory_fields={},
+        field_tags={"Revenue": [FinancialTag(**ATTRIBUTES)], "RevenueFromContracts": [TagRecord(**ATTRIBUTES)]},
+        statement_tags=[FinancialTag(**ATTRIBUTES)]
+    )
+    shared = taxonomy.field_tags["Revenue"][0]
+    assert isinstance(shared, TagRecord)
+    assert taxonomy.field_tags["RevenueFromContracts"][0] is shared
+    assert taxonomy.statement_tags[0] is shared
+    assert taxonomy.elements == {"sg-as_Revenue": shared}
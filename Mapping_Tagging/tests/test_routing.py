@@ -0,0 +1,47 @@
+"""
+Tests for the routing of raw leaves between local mapping and the mapping agent.
+"""
+import pytest
+
+from mapping.dependencies import FinancialTermDeps, income_terms, position_terms
+from mapping.routing import partition_by_confidence, section_scope, without_local_fields
+from mapping.synonyms import align_decisions
+
+
+@pytest.fixture(scope="module")
+def deps():
+    return FinancialTermDeps(income_terms, position_terms)
+
+
+def test_confident_leaf_in_its_section_is_mapped_locally(deps):
+    resolved, pending = partition_by_confidence({"currentAssets": {"Trade receivables": 50}}, deps)
+    assert resolved == {"StatementOfFinancialPosition.CurrentAssets.TradeAndOtherReceivablesCurrent": 50.0}
+    assert pending == {}
+
+
+def test_leaf_outside_the_fields_section_goes_to_the_agent(deps):
+    data = {"nonCurrentAssets": {"Trade receivables": 50}}
+    resolved, pending = partition_by_confidence(data, deps)
+    assert resolved == {}
+    assert pending == data
+
+
+@pytest.mark.parametrize("section, scope", [
+    ("statementOfFinancialPosition.nonCurrentAssets", ("position", "financial_position.nonCurrentAssets.")),
+    ("incomeStatement", ("income", "income_statement.")),
+    ("notes.other", ("all", None)),
+])
+def test_section_scope(section, scope):
+    assert section_scope(section) == scope
+
+
+def test_locally_mapped_fields_are_not_learned(deps):
+    raw = {"currentAssets": {"Trade receivables": 50}, "incomeStatement": {"Sales of goods": 120}}
+    resolved, pending = partition_by_confidence(raw, deps)
+    mapped = {
+        "StatementOfFinancialPosition": {"CurrentAssets": {"TradeAndOtherReceivablesCurrent": 50.0}},
+        "IncomeStatement": {"Revenue": 120.0}
+    }
+    decisions = align_decisions(pending, without_local_fields(mapped, resolved))
+    assert decisions == [("Sales of goods", "incomeStatement", "income_statement", "Revenue")]
+    assert mapped["StatementOfFinancialPosition"]["CurrentAssets"]["TradeAndOtherReceivablesCurrent"] == 50.0
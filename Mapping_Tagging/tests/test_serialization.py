@@ -0,0 +1,70 @@
+"""
+Tests for the pre-encoded tag payloads and the response encoder.
+"""
+import json
+from datetime import date
+from typing import List, Optional
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from pydantic import Field
+from starlette.responses import JSONResponse
+
+from tagging.models import FinancialTag, TaggedValue, TrackedModel
+from tagging.records import TagRecord
+from tagging.serialization import TagPayloads
+
+SHARE_CAPITAL = TagRecord("ShareCapital", "sg-as_ShareCapital", balance_type="credit")
+EQUITY = TagRecord("Equity", "sg-as_Equity", abstract=True)
+
+
+class EquityWithTags(TrackedModel):
+    """Equity section with tags"""
+    ShareCapital: TaggedValue
+    TreasuryShares: Optional[TaggedValue] = None
+    meta_tags: List[FinancialTag] = Field(default_factory=list, description="Tags for the section")
+
+
+@pytest.fixture(scope="module")
+def payloads():
+    return TagPayloads([SHARE_CAPITAL, EQUITY])
+
+
+def _content():
+    custom = FinancialTag(element_name="ShareCapital", element_id="sg-as_ShareCapital", period_type="duration")
+    equity = EquityWithTags(
+        ShareCapital=TaggedValue(value=400.0, tags=[SHARE_CAPITAL.to_model(), custom]),
+        meta_tags=[EQUITY.to_model()]
+    )
+    return {"equity": equity, "tags": [SHARE_CAPITAL.to_model()], "as_of": date(2023, 12, 31), "count": 2}
+
+
+def test_encoding_matches_the_json_response(payloads):
+    content = _content()
+    assert payloads.encode(content) == JSONResponse(jsonable_encoder(content)).body
+    content["tags"] = [SHARE_CAPITAL]
+    assert payloads.encode(content) == JSONResponse(jsonable_encoder(_content())).body
+
+
+def test_taxonomy_tag_dicts_are_shared_and_read_only(payloads):
+    tag_dict = payloads.tag_dict(SHARE_CAPITAL)
+    assert tag_dict is payloads.tag_dict(SHARE_CAPITAL.to_model())
+    assert tag_dict == SHARE_CAPITAL.model_dump()
+    with pytest.raises(TypeError):
+        tag_dict["abstract"] = True
+    other = FinancialTag(element_name="Other", element_id="sg-as_Other")
+    assert payloads.tag_dict(other) == other.model_dump()
+
+
+def test_compact_encoding_references_tags_by_id(payloads):
+    body = json.loads(payloads.encode(_content(), compact=True))
+    assert body["equity"]["ShareCapital"] == {"value": 400.0, "tag_ids": ["sg-as_ShareCapital", "sg-as_ShareCapital"]}
+    assert body["equity"]["meta_tags"] == ["sg-as_Equity"]
+    definitions = body["tag_definitions"]
+    assert set(definitions) == {"sg-as_ShareCapital", "sg-as_Equity"}
+    assert definitions["sg-as_Equity"] == {"element_name": "Equity", "element_id": "sg-as_Equity", "abstract": True}
+    assert FinancialTag.model_validate(definitions["sg-as_ShareCapital"]) == SHARE_CAPITAL.to_model()
+
+
+def test_compact_empty_content(payloads):
+    assert json.loads(payloads.encode({}, compact=True)) == {"tag_definitions": {}}
@@ -0,0 +1,85 @@
+"""
+Tests for the streaming categorization of large raw documents.
+"""
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("ijson")
+
+from mapping.dependencies import FinancialTermDeps, income_terms, position_terms
+from mapping.streaming import StreamingCategorizer
+
+
+@pytest.fixture(scope="module")
+def deps():
+    return FinancialTermDeps(income_terms, position_terms)
+
+
+def _categorize(categorizer, body, chunk_size=7):
+    lines = []
+    for start in range(0, len(body), chunk_size):
+        lines.extend(categorizer.feed(body[start:start + chunk_size]))
+    return lines + categorizer.close()
+
+
+def test_sections_wait_for_a_rounding_level_declared_later(deps):
+    body = json.dumps({
+        "incomeStatement": {"Revenue": "1.2m"},
+        "filingInformation": {"LevelOfRoundingUsedInFinancialStatements": "Thousands"}
+    }).encode()
+    lines = _categorize(StreamingCategorizer(deps), body)
+    assert lines[0]["section"] == "incomeStatement"
+    assert lines[0]["categorized"] == {"income_statement": {"Revenue": 1200.0}}
+    assert lines[0]["rounding_level"] == "thousands"
+
+
+def test_sections_are_emitted_once_filing_information_closed(deps):
+    categorizer = StreamingCategorizer(deps)
+    assert categorizer.feed(b'{"incomeStatement": {"Revenue": 5}, ') == []
+    lines = categorizer.feed(b'"filingInformation": {"NameOfCompany": "X"}, ')
+    assert [line["section"] for line in lines] == ["incomeStatement", "filingInformation"]
+    assert lines[0]["rounding_level"] is None
+
+
+def test_held_sections_are_bounded(deps):
+    categorizer = StreamingCategorizer(deps, max_held_leaves=3)
+    lines = categorizer.feed(json.dumps({"a": {"x1": 1, "x2": 2}, "b": {"x3": 3, "x4": 4}, "c": {"x5": 5}}).encode())
+    assert [line["section"] for line in lines] == ["a", "b"]
+    assert lines[0]["rounding_level"] is None
+
+
+def test_endpoint_streams_sections_before_the_upload_ends():
+    import api
+    
+    async def run():
+        requests = asyncio.Queue()
+        first_line = asyncio.Event()
+        sent = []
+        
+        async def receive():
+            return await requests.get()
+        
+        async def send(message):
+            sent.append(message)
+            if message["type"] == "http.response.body" and message.get("body"):
+                first_line.set()
+        
+        scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+                 "scheme": "http", "path": "/api/map/stream", "raw_path": b"/api/map/stream", "query_string": b"",
+                 "headers": [(b"content-type", b"application/json")], "client": ("test", 1), "server": ("test", 80)}
+        app = asyncio.create_task(api.app(scope, receive, send))
+        await requests.put({"type": "http.request", "body": b'{"filingInformation": {"NameOfCompany": "X"}, ', "more_body": True})
+        await requests.put({"type": "http.request", "body": b'"incomeStatement": {"Revenue": 5}, ', "more_body": True})
+        # The upload is still open when the first sections arrive
+        await asyncio.wait_for(first_line.wait(), timeout=10)
+        await requests.put({"type": "http.request", "body": b'"b": [}', "more_body": False})
+        await asyncio.wait_for(app, timeout=10)
+        return sent
+    
+    sent = asyncio.run(run())
+    assert sent[0]["status"] == 200
+    lines = [json.loads(line) for message in sent[1:] for line in message.get("body", b"").splitlines()]
+    assert [line.get("section") for line in lines[:2]] == ["filingInformation", "incomeStatement"]
+    assert "error" in lines[-1]
@@ -0,0 +1,54 @@
+"""
+Tests for the store of learned label decisions.
+"""
+import multiprocessing
+
+from mapping.synonyms import SynonymStore
+
+
+def _record_and_save(path, label, times):
+    store = SynonymStore(path)
+    for _ in range(times):
+        store.record(label, "income_statement", "Revenue")
+        store.save()
+
+
+def test_stores_sharing_a_file_keep_each_others_decisions(tmp_path):
+    path = str(tmp_path / "synonyms.json")
+    first, second = SynonymStore(path), SynonymStore(path)
+    first.record("Sales", "income_statement", "Revenue")
+    second.record("Turnover", "income_statement", "Revenue")
+    first.save()
+    second.save()
+    
+    assert set(second.labels) == {"sales", "turnover"}
+    assert SynonymStore(path).labels == {
+        "sales": {"income_statement.Revenue": 1},
+        "turnover": {"income_statement.Revenue": 1}
+    }
+
+
+def test_saving_twice_does_not_count_decisions_twice(tmp_path):
+    path = str(tmp_path / "synonyms.json")
+    store = SynonymStore(path)
+    store.record("Sales", "income_statement", "Revenue")
+    store.save()
+    store.save()
+    assert SynonymStore(path).labels == {"sales": {"income_statement.Revenue": 1}}
+
+
+def test_concurrent_workers_lose_no_decisions(tmp_path):
+    path = str(tmp_path / "synonyms.json")
+    workers = [
+        multiprocessing.Process(target=_record_and_save, args=(path, f"label {i}", 20))
+        for i in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    
+    labels = SynonymStore(path).labels
+    assert {label: decisions["income_statement.Revenue"] for label, decisions in labels.items()} == {
+        f"label {i}": 20 for i in range(4)
+    }
@@ -0,0 +1,59 @@
+"""
+Tests for the cached tag tables of the tagged models.
+"""
+import pickle
+
+from tagging.models import (CurrentAssetsWithTags, CurrentLiabilitiesWithTags, EquityWithTags, FinancialTag,
+                            NonCurrentAssetsWithTags, NonCurrentLiabilitiesWithTags,
+                            StatementOfFinancialPositionWithTags, TaggedValue)
+
+
+def _value(value, element_name=None):
+    tags = [FinancialTag(element_name=element_name, element_id=f"sg-as_{element_name}")] if element_name else []
+    return TaggedValue(value=value, tags=tags)
+
+
+def _statement():
+    return StatementOfFinancialPositionWithTags(
+        currentAssets=CurrentAssetsWithTags(CurrentAssets=_value(100.0, "CurrentAssets")),
+        nonCurrentAssets=NonCurrentAssetsWithTags(NoncurrentAssets=_value(50.0)),
+        Assets=_value(150.0, "Assets"),
+        currentLiabilities=CurrentLiabilitiesWithTags(CurrentLiabilities=_value(40.0)),
+        nonCurrentLiabilities=NonCurrentLiabilitiesWithTags(NoncurrentLiabilities=_value(10.0)),
+        Liabilities=_value(50.0),
+        equity=EquityWithTags(ShareCapital=_value(60.0), AccumulatedProfitsLosses=_value(40.0), Equity=_value(100.0))
+    )
+
+
+def test_changes_to_one_document_keep_the_cache_of_another():
+    first, second = _statement(), _statement()
+    first.get_all_tags()
+    second.get_all_tags()
+    cached = first._tags_cache
+    
+    second.Liabilities.add_tag(FinancialTag(element_name="Liabilities", element_id="sg-as_Liabilities"))
+    assert first._tags_cache is cached
+    assert "Liabilities" in second.get_all_tags()
+    assert "Liabilities" not in first.get_all_tags()
+
+
+def test_nested_changes_invalidate_the_document():
+    statement = _statement()
+    assert list(statement.get_all_tags()) == ["currentAssets.CurrentAssets", "Assets"]
+    statement.currentAssets.CashAndBankBalances = _value(20.0, "CashAndBankBalances")
+    assert list(statement.get_all_tags()) == ["currentAssets.CashAndBankBalances", "currentAssets.CurrentAssets", "Assets"]
+    statement.add_meta_tag(FinancialTag(element_name="StatementOfFinancialPosition", element_id="sg-as_SOFP"))
+    assert "statement" in statement.get_all_tags()
+
+
+def test_copies_collect_their_own_tags():
+    statement = _statement()
+    statement.get_all_tags()
+    copied = statement.model_copy()
+    copied.currentAssets.Inventories = _value(5.0, "Inventories")
+    assert "currentAssets.Inventories" in copied.get_all_tags()
+    assert "currentAssets.Inventories" in statement.get_all_tags()
+    
+    restored = pickle.loads(pickle.dumps(statement))
+    assert restored == statement
+    assert restored.get_all_tags() == statement.get_all_tags()
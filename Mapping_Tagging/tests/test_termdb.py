@@ -0,0 +1,51 @@
+"""
+Tests for the compiled, memory-mapped term dictionary.
+"""
+import pytest
+
+from mapping import termdb
+from mapping.dependencies import FinancialTermDeps, income_terms, position_terms
+from mapping.tools import lookup_term
+
+TERMS = ["revenue", "trade and other receivables", "finance lease liabilities", "profit for the year", "zzz"]
+
+
+@pytest.fixture(scope="module")
+def deps():
+    return FinancialTermDeps(income_terms, position_terms)
+
+
+@pytest.fixture(scope="module")
+def compiled_path(deps, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("termdb") / "terms.ftdb")
+    termdb.write_term_dictionary(path, deps.income_statement_terms, deps.financial_position_terms, deps.version)
+    return path
+
+
+def test_compiled_matcher_scores_like_the_source(deps, compiled_path):
+    compiled = termdb.CompiledTermMatcher(compiled_path)
+    assert compiled.version == deps.version
+    assert list(compiled.fields) == deps.matcher.fields
+    for term in TERMS:
+        assert compiled.find_keywords(term) == deps.matcher.find_keywords(term), term
+        assert compiled.best_match(term, "position") == deps.matcher.best_match(term, "position"), term
+
+
+def test_term_tables_decode_back_to_the_source(deps, compiled_path):
+    income, position = termdb.CompiledTermMatcher(compiled_path).term_tables()
+    assert income == deps.income_statement_terms
+    assert position == deps.financial_position_terms
+
+
+def test_dependencies_from_a_compiled_file_look_up_the_same(deps, compiled_path):
+    loaded = FinancialTermDeps.from_compiled(compiled_path)
+    for term in TERMS:
+        assert lookup_term(loaded, term) == lookup_term(deps, term), term
+    assert loaded.income_statement_terms == deps.income_statement_terms
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "terms.json"
+    path.write_bytes(b"{" + b" " * 64 + b"}")
+    with pytest.raises(ValueError):
+        termdb.CompiledTermMatcher(str(path))
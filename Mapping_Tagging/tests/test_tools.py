@@ -0,0 +1,39 @@
+"""
+Tests for the bulk mapping tools of the mapping agent.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from mapping.dependencies import FinancialTermDeps, income_terms, position_terms
+from mapping.tools import extract_and_categorize_financial_data, map_financial_document
+
+DOCUMENT = {
+    "balanceSheet": {
+        "currentAssets": {"Trade receivables": 120.0, "Cash and bank balances": 300.0, "Inventories": 80.0},
+        "nonCurrentAssets": {"Plant and equipment": 500.0},
+        "currentLiabilities": {"Trade payables": 90.0, "Borrowings": 50.0},
+        "equity": {"Share capital": 400.0, "Retained earnings": 210.0}
+    },
+    "profitAndLoss": {"Revenue": 1000.0, "Cost of sales": -600.0, "Finance costs": -20.0, "Deferred tax": 5.0,
+                     "Other income": {"2023": 15.0}}
+}
+
+
+@pytest.fixture(scope="module")
+def context():
+    return SimpleNamespace(deps=FinancialTermDeps(income_terms, position_terms))
+
+
+def test_bulk_and_per_leaf_tools_map_leaves_alike(context):
+    mapped = map_financial_document(context, DOCUMENT)
+    extracted = extract_and_categorize_financial_data(context, DOCUMENT)
+    
+    assert mapped["candidates"]
+    conflicts = {(c["statement_type"], c["field"]) for c in mapped["conflicts"]}
+    for candidate in mapped["candidates"]:
+        if (candidate["statement_type"], candidate["field"]) in conflicts:
+            continue
+        assert extracted[candidate["statement_type"]][candidate["field"]] == candidate["value"], candidate["path"]
+    cash = next(c for c in mapped["candidates"] if c["path"].endswith("Cash and bank balances"))
+    assert cash["field"] == "currentAssets.CashAndBankBalances"
@@ -0,0 +1,18 @@
+"""
+Old filing information field names and the model fields they are stored under.
+
+Kept free of Django imports: the mapping service (Mapping_Tagging/mapping/aliases.py) reads
+FIELD_MAPPING from this file too, to accept the same snake_case names as input keys.
+"""
+
+FIELD_MAPPING = {
+    "WhetherTheFinancialStatementsArePreparedOnGoingConcernBasis": "is_going_concern",
+    "WhetherThereAreAnyChangesToComparativeAmounts": "has_comparative_changes",
+    "DescriptionOfPresentationCurrency": "presentation_currency",
+    "DescriptionOfFunctionalCurrency": "functional_currency",
+    "TypeOfXBRLFiling": "xbrl_filing_type",
+    "TypeOfStatementOfFinancialPosition": "financial_position_type",
+    "TypeOfAccountingStandardUsedToPrepareFinancialStatements": "accounting_standard",
+    "NatureOfFinancialStatementsCompanyLevelOrConsolidated": "financial_statement_type",
+    "DateOfAuthorisationForIssueOfFinancialStatements": "authorisation_date"
+}
@@ -11,6 +11,7 @@ import re
 from xbrl_mapping.models import MappingInput, PartialXBRL
 from .serializers import MappingInputSerializer, PartialXBRLSerializer
 from .json_mapper import XBRLJSONMapper
+from .field_names import FIELD_MAPPING
 from rest_framework.views import APIView
 
 class PartialXBRLViewSet(viewsets.ModelViewSet):
@@ -38,18 +39,6 @@ class MappingInputView(APIView):
         #return Response({"id": str(mapping_instance.id), "content": mapping_instance.content})
 
 
-FIELD_MAPPING = {
-    "WhetherTheFinancialStatementsArePreparedOnGoingConcernBasis": "is_going_concern",
-    "WhetherThereAreAnyChangesToComparativeAmounts": "has_comparative_changes",
-    "DescriptionOfPresentationCurrency": "presentation_currency",
-    "DescriptionOfFunctionalCurrency": "functional_currency",
-    "TypeOfXBRLFiling": "xbrl_filing_type",
-    "TypeOfStatementOfFinancialPosition": "financial_position_type",
-    "TypeOfAccountingStandardUsedToPrepareFinancialStatements": "accounting_standard",
-    "NatureOfFinancialStatementsCompanyLevelOrConsolidated": "financial_statement_type",
-    "DateOfAuthorisationForIssueOfFinancialStatements": "authorisation_date"
-}
-
 def normalize_filing_information(data):
     """Renames old field names to match Django model fields."""
     normalized_data = {}